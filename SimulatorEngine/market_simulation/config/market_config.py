@@ -18,15 +18,55 @@
     5. Analytics Config
         How frequently do we dump the metrics, how often
         do we calculate them and etc.
+
+    The loaded config is also compiled into a frozen
+    config (get_config().frozen) for the hot paths.
     ====================================================
 """
 
 from simulator_base.util.printer import printer
+from simulator_base.config.frozen_config import FrozenConfig, with_defaults
 from simulator_base.orchestrator.orchestrator import get_orchestrator
 from simulator_base.config.global_config import get_config as get_global_config
 import yaml
 import os
 
+# fields read on hot paths, checked upon compilation
+REQUIRED_FIELDS = {
+    "user_config.intent_config.peak_age": (int, float),
+    "user_config.intent_config.gender_factor": (int, float),
+    "user_config.intent_config.no_decay_income_price_ratio": (int, float),
+    "user_config.intent_config.event_probability_baseline.conversions": (
+        int, float
+    ),
+    "user_config.intent_config.awareness_improvement": (int, float),
+    "user_config.intent_config.ad_fatigue": (int, float),
+    "delivery_config.auction_config.auction_type": (str,),
+    "delivery_config.pacing_config.adjustment_interval": (int,),
+    "delivery_config.pacing_config.max_bid": (int, float),
+    "delivery_config.pacing_config.starting_pacing_multiplier": (int, float),
+    "delivery_config.pacing_config.alpha": (int, float),
+    "delivery_config.pacing_config.epsilon": (int, float),
+    "delivery_config.model_config.model_noise_factor": (int, float),
+}
+
+# fields read on hot paths that older configs may leave
+# out, with their types and the value they then take
+OPTIONAL_FIELDS = {
+    "delivery_config.pacing_config.pacing_mode": ((str,), "bid_shading"),
+    "delivery_config.pacing_config.throttling_bid_multiplier": (
+        (int, float), 0.001
+    ),
+    "delivery_config.pacing_config.batch_pacing": ((bool,), False),
+    "delivery_config.pacing_config.over_delivery_tolerance": (
+        (int, float), 0
+    ),
+    "delivery_config.ranking_cache_config.enabled": ((bool,), True),
+    "delivery_config.ranking_cache_config.max_entries": ((int,), 100000),
+    "delivery_config.ranking_cache_config.ttl": ((int, float), 60),
+    "delivery_config.ranking_cache_config.track_stats": ((bool,), False),
+}
+
 
 class MarketConfig:
     _instance = None
@@ -74,8 +114,40 @@ class MarketConfig:
                         sort_keys=False,
                         default_flow_style=False
                     )
+        self.compile()
         printer("Loaded Market Config", "LOG")
 
+    def compile(self):
+        """
+            Compile the loaded sections into a frozen config,
+            optional fields left out take their default
+        """
+        frozen = FrozenConfig(with_defaults(
+            {
+                'user_config': self._user_config,
+                'advertiser_config': self._advertiser_config,
+                'environment_config': self._environment_config,
+                'delivery_config': self._delivery_config,
+                'analytics_config': self._analytics_config,
+            },
+            {
+                path: default
+                for path, (_, default) in OPTIONAL_FIELDS.items()
+            }
+        ))
+        frozen.validate(REQUIRED_FIELDS)
+        frozen.validate({
+            path: types for path, (types, _) in OPTIONAL_FIELDS.items()
+        })
+        self._frozen = frozen
+
+    @property
+    def frozen(self) -> FrozenConfig:
+        """
+            Compiled, immutable view of the config
+        """
+        return self._frozen
+
     def get_environment_config(self) -> dict:
         return self._environment_config
 
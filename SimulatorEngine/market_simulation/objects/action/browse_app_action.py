@@ -3,6 +3,11 @@
     This represents the action of determining and performing
     the action of browsing an app. This action is performed
     by the user agent.
+
+    All browses of a tick are collected first, so that
+    the ads of the users browsing the same surface are
+    scored in one batch, and under batch pacing also
+    auctioned in one batch.
     ========================================================
 """
 
@@ -11,7 +16,13 @@ from simulator_base.action.action import Action
 from simulator_base.orchestrator.orchestrator import Orchestrator
 from simulator_base.object_base.object_base import ObjectBase
 from ..state.app_behavior_state import AppBehaviorState
+from ..environment.surface_environment import (
+    PricedAds,
+    ScoredAds,
+    SurfaceEnvironment,
+)
 from datetime import timedelta
+from typing import Optional
 
 
 class BrowseAppAction(Action):
@@ -23,6 +34,9 @@ class BrowseAppAction(Action):
             "BrowseAppAction",
             browsing_interval
         )
+        # surface, browsing time, scored and priced ads
+        # collected ahead of the act when browsing in a batch
+        self._browse_request: Optional[tuple] = None
 
     def evaluate(self) -> bool:
         # delete
@@ -32,6 +46,65 @@ class BrowseAppAction(Action):
         return app_behavior_state.get_is_user_active()
 
     def act(self):
+        request = self._browse_request
+        self._browse_request = None
+        if request is None:
+            request = self._get_browse_request()
+        surface_environment, browsing_time, scored_ads, priced_ads = request
+        surface_environment.browse_surface(
+            self.subject,
+            browsing_time,
+            scored_ads,
+            priced_ads
+        )
+
+    @classmethod
+    def simulate_batch(cls, actions: list["BrowseAppAction"]):
+        """
+            Browse requests of the tick are collected and the
+            ad candidates of all users browsing the same
+            surface are scored in one batch, then auctioned
+            in one batch under batch pacing. The browses are
+            carried out one by one in order, since charges
+            change the budgets of the ads, and without batch
+            pacing every bid moves their pacing.
+        """
+        requests: dict[SurfaceEnvironment, list[BrowseAppAction]] = {}
+        for action in actions:
+            if not action._should_act:
+                continue
+            action._browse_request = action._get_browse_request()
+            surface_environment = action._browse_request[0]
+            if surface_environment not in requests:
+                requests[surface_environment] = []
+            requests[surface_environment].append(action)
+        for surface_environment, surface_actions in requests.items():
+            users = [action.subject for action in surface_actions]
+            scored_ads = surface_environment.score_browses(users)
+            priced_ads = surface_environment.price_browses(users, scored_ads)
+            for action, scored, priced in zip(
+                surface_actions, scored_ads, priced_ads
+            ):
+                environment, browsing_time, _, _ = action._browse_request
+                action._browse_request = (
+                    environment,
+                    browsing_time,
+                    scored,
+                    priced
+                )
+        for action in actions:
+            action.simulate()
+
+    # ============= Private Helper Methods =============
+
+    def _get_browse_request(
+        self
+    ) -> tuple[
+        SurfaceEnvironment,
+        timedelta,
+        Optional[ScoredAds],
+        Optional[PricedAds]
+    ]:
         app_behavior_state: AppBehaviorState = self.subject.get_state(
             "AppBehaviorState"
         )
@@ -48,5 +121,4 @@ class BrowseAppAction(Action):
 
         surface_environment = Orchestrator.get_instance() \
             .get_environment_with_filter(filter_fn=surface_filter_fun)
-
-        surface_environment.browse_surface(self.subject, browsing_time)
+        return surface_environment, browsing_time, None, None
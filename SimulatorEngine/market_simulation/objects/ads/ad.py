@@ -17,16 +17,17 @@
 
 from simulator_base.agent.agent import Agent
 from simulator_base.orchestrator.orchestrator import Orchestrator
+from simulator_base.util.rolling_buffer import RollingBuffer
+from simulator_base.util.timestamp import to_day
 from ..state.ad_outcome_state import AdOutcomeState
 from ..state.advertiser_intent_state import AdvertiserIntentState
 from ..state.ad_budget_state import AdBudgetState
+from ..auction.ad_event_log import get_ad_event_log
 from ..types.types import (
     AdEventType,
     AdEventFields,
-    AdEventList,
     TargetingFilter,
     TargetingFilterFields,
-    AdEvent,
 )
 from ..state.ad_spec_state import AdSpecState
 from datetime import datetime, timedelta
@@ -42,8 +43,8 @@ class Ad(Agent):
 
     @owner.setter
     def owner(self, value: Agent):
-        value.associate("active_ads", self)
         self.associate("owner", value)
+        value.append_ad(self)
 
     @property
     def ad_goal(self) -> str:
@@ -65,7 +66,7 @@ class Ad(Agent):
         return spec_state.ad_category
 
     @property
-    def impressions(self) -> AdEventList:
+    def impressions(self) -> RollingBuffer:
         out_come_state: AdOutcomeState = self.get_state('AdOutcomeState')
         return out_come_state.impressions
 
@@ -75,7 +76,7 @@ class Ad(Agent):
         return budget_state.has_ended
 
     @property
-    def conversions(self) -> AdEventList:
+    def conversions(self) -> RollingBuffer:
         out_come_state: AdOutcomeState = self.get_state('AdOutcomeState')
         return out_come_state.conversions
 
@@ -101,55 +102,60 @@ class Ad(Agent):
         return total_sales * profit_margin
 
     def total_profit_after_date(self, date: datetime = None) -> float:
-        today = Orchestrator.get_current_time(self)
-        total_profit = 0
-        while date < today:
-            total_profit += self.total_profit(date)
-            date += timedelta(days=1)
-        return total_profit
+        total_sales = self.total_sales_after_date(date)
+        profit_margin = self.owner.get_state(
+            'AdvertiserIntentState'
+        ).profit_margin
+        return total_sales * profit_margin
 
     def total_sales(self, date: datetime = None) -> float:
         out_come_state: AdOutcomeState = self.get_state('AdOutcomeState')
-        if out_come_state.goal == AdEventType.CONVERSIONS:
-            conversions_cnt = len(out_come_state.get_optimized_events(date))
-            advertiser_intent: AdvertiserIntentState = self.owner.get_state(
-                'AdvertiserIntentState'
-            )
-            product_price = advertiser_intent.product_price
-            profit_margin = advertiser_intent.profit_margin
-            return conversions_cnt * product_price * profit_margin
-        else:
-            return 0
+        if date is None:
+            return self._get_sales(out_come_state.get_optimized_event_cnt())
+        day = to_day(date)
+        return self._get_sales(
+            out_come_state.get_optimized_event_cnt(day, day + 1)
+        )
 
     def total_sales_after_date(self, date: datetime = None) -> float:
-        today = Orchestrator.get_current_time(self)
-        total_sales = 0
-        while date < today:
-            total_sales += self.total_sales(date)
-            date += timedelta(days=1)
-        return total_sales
+        out_come_state: AdOutcomeState = self.get_state('AdOutcomeState')
+        return self._get_sales(
+            out_come_state.get_optimized_event_cnt(
+                *self._get_days_after_date(date)
+            )
+        )
 
     def total_cost(self, date: datetime = None) -> float:
         budget_state: AdBudgetState = self.get_state('AdBudgetState')
         return budget_state.get_spend(date)
 
     def total_cost_after_date(self, date: datetime = None) -> float:
-        today = Orchestrator.get_current_time(self)
-        total_cost = 0
-        while date < today:
-            total_cost += self.total_cost(date)
-            date += timedelta(days=1)
-        return total_cost
+        budget_state: AdBudgetState = self.get_state('AdBudgetState')
+        return budget_state.get_spend_between(
+            *self._get_days_after_date(date)
+        )
 
-    def apply_event(self, event: AdEvent) -> float:
+    def apply_event(self, offset: int) -> float:
+        """
+            Offset is the offset of the event in the ad
+            event log
+        """
+        event_log = get_ad_event_log()
         cost = 0
-        if event[AdEventFields.EVENT_TYPE] == AdEventType.IMPRESSIONS:
+        event_type = event_log.get_event_type(offset)
+        # if it is impression, also spend the budget
+        if event_type == AdEventType.IMPRESSIONS:
             budget_state: AdBudgetState = self.get_state('AdBudgetState')
-            cost = budget_state.spend(event[AdEventFields.PRICE])
-        event[AdEventFields.COST] = cost
+            cost = budget_state.spend(
+                event_log.get_value(offset, AdEventFields.PRICE)
+            )
+            event_log.set_cost(offset, cost)
         out_come_state: AdOutcomeState = self.get_state('AdOutcomeState')
-        out_come_state.append_outcome(event)
-        # if it is impression, also spend the budget
+        out_come_state.append_outcome(
+            event_type,
+            offset,
+            event_log.get_value(offset, AdEventFields.EVENT_TIME)
+        )
         return cost
 
     def roas(self, date: datetime = None) -> float:
@@ -237,3 +243,33 @@ class Ad(Agent):
         self.owner.remove_ad(self)
         self.owner.append_inactive_ad(self)
         self.pause()
+
+    def destroy(self):
+        # an ad destroyed while running no longer takes
+        # up the budget of the advertiser
+        if self in self.owner.active_ads:
+            self.owner.remove_ad(self)
+        super().destroy()
+
+    # ============= Private Helper Methods =============
+
+    def _get_sales(self, conversions_cnt: int) -> float:
+        if self.ad_goal != AdEventType.CONVERSIONS:
+            return 0
+        advertiser_intent: AdvertiserIntentState = self.owner.get_state(
+            'AdvertiserIntentState'
+        )
+        product_price = advertiser_intent.product_price
+        profit_margin = advertiser_intent.profit_margin
+        return conversions_cnt * product_price * profit_margin
+
+    def _get_days_after_date(self, date: datetime) -> tuple[int, int]:
+        """
+            Days from the day of the date up to, but not
+            including, the end day, one for every whole or
+            partial day between the date and now
+        """
+        today = Orchestrator.get_current_time(self)
+        day_cnt = max(0, -((date - today) // timedelta(days=1)))
+        start_day = to_day(date)
+        return start_day, start_day + day_cnt
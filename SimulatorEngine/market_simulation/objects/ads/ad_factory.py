@@ -39,7 +39,6 @@ def create_ad(
 ):
     ad = Ad()
     ad.associate('owner', advertiser)
-    advertiser.append_ad(ad)
     ad.add_object(AdOutcomeState(ad_outcome))
     ad.add_object(AdBudgetState(
         duration,
@@ -59,4 +58,6 @@ def create_ad(
         ),
     )
     ad.add_object(StopAdAction())
+    # appended once the ad has its budget and goal
+    advertiser.append_ad(ad)
     return ad
@@ -8,8 +8,10 @@
 
 from simulator_base.orchestrator.orchestrator import Orchestrator
 from simulator_base.analytics.metric import Metric
+from simulator_base.util.timestamp import to_duration
 from market_simulation.config.market_config import get_config
 from market_simulation.objects.ads.ad import Ad
+from market_simulation.objects.auction.ad_event_log import get_ad_event_log
 from market_simulation.objects.state.ad_budget_state import AdBudgetState
 from market_simulation.objects.state.ad_spec_state import AdSpecState
 from market_simulation.objects.types.types import (
@@ -17,6 +19,7 @@ from market_simulation.objects.types.types import (
     AdEventType,
 )
 from typing import final
+import numpy as np
 
 
 class AdMetrics(Metric):
@@ -58,8 +61,8 @@ class AdMetrics(Metric):
 
     @final
     def calculate(self):
-        current_time = Orchestrator.get_current_time(self._subject)
-        cutoff_time = current_time - self._aggregation_window
+        current_time = Orchestrator.get_current_timestamp()
+        cutoff_time = current_time - to_duration(self._aggregation_window)
         ad: Ad = self._subject
         if ad.ended:
             self.destroy()
@@ -67,53 +70,43 @@ class AdMetrics(Metric):
         ad_spec_state: AdSpecState = ad.get_state("AdSpecState")
         remaining_total_budget = ad_budget_state.remaining_budget
         remaining_duration = ad_budget_state.remaining_duration
-        all_impressions = ad.impressions
-        all_conversions = ad.conversions
-
-        reached_users = set()
-        total_revenue = 0
+        event_log = get_ad_event_log()
+        impressions = ad.impressions.get_range(cutoff_time)
+        conversions = ad.conversions.get_range(cutoff_time)
         remaining_daily_budget = ad_budget_state.remaining_daily_budget
         daily_budget = ad_budget_state.daily_budget
-        total_conversions = 0
-        total_impressions = 0
-        total_value = 0
-        over_delivery = 0
-        predicted_conversions = 0
-        predicted_value = 0
-        paced_bid_total = 0
 
-        # from back to front
-        start_index = len(all_impressions) - 1
-        while start_index >= 0:
-            impression = all_impressions[start_index]
-            if impression[AdEventFields.EVENT_TIME] < cutoff_time:
-                break
-            start_index -= 1
-            reached_users.add(impression[AdEventFields.USER].id)
-            total_impressions += 1
-            total_revenue += impression[AdEventFields.COST]
-            over_delivery += impression[AdEventFields.PRICE] \
-                - impression[AdEventFields.COST]
-            paced_bid_total += impression[AdEventFields.PACED_BID]
-            if impression[AdEventFields.AD].ad_goal == AdEventType.CONVERSIONS:
-                predicted_conversions += impression[
-                    AdEventFields.PREDICTED_PROBABILITY
-                ]
-                predicted_value += impression[
-                    AdEventFields.PREDICTED_PROBABILITY
-                ] * \
-                    impression[AdEventFields.PACED_BID]
-            else:
-                total_value += impression[AdEventFields.PACED_BID]
-                predicted_value += impression[AdEventFields.BID]
-        start_index = len(all_conversions) - 1
-        while start_index >= 0:
-            conversion = all_conversions[start_index]
-            if conversion[AdEventFields.EVENT_TIME] < cutoff_time:
-                break
-            start_index -= 1
-            total_conversions += 1
-            total_value += conversion[AdEventFields.PACED_BID]
+        costs = event_log.get_column(AdEventFields.COST)[impressions]
+        paced_bids = event_log.get_column(AdEventFields.PACED_BID)
+        impression_paced_bids = paced_bids[impressions]
+        total_impressions = len(impressions)
+        total_conversions = len(conversions)
+        reach = len(np.unique(
+            event_log.get_column(AdEventFields.USER)[impressions]
+        ))
+        total_revenue = self._accumulate(costs)
+        over_delivery = self._accumulate(
+            event_log.get_column(AdEventFields.PRICE)[impressions] - costs
+        )
+        paced_bid_total = self._accumulate(impression_paced_bids)
+        if ad.ad_goal == AdEventType.CONVERSIONS:
+            predicted_probabilities = event_log.get_column(
+                AdEventFields.PREDICTED_PROBABILITY
+            )[impressions]
+            total_value = self._accumulate(paced_bids[conversions])
+            predicted_conversions = self._accumulate(predicted_probabilities)
+            predicted_value = self._accumulate(
+                predicted_probabilities * impression_paced_bids
+            )
+        else:
+            total_value = self._accumulate(
+                impression_paced_bids,
+                paced_bids[conversions]
+            )
+            predicted_conversions = 0
+            predicted_value = self._accumulate(
+                event_log.get_column(AdEventFields.BID)[impressions]
+            )
 
         cpm = total_revenue / total_impressions * 1000 \
             if total_impressions > 0 else 0
@@ -128,7 +121,6 @@ class AdMetrics(Metric):
         )
         value_calibration = predicted_value / total_value \
             if total_value > 0 else 0
-        reach = len(reached_users)
         avg_paced_bid = paced_bid_total / total_impressions \
             if total_impressions > 0 else 0
 
@@ -0,0 +1,45 @@
+"""
+    =========== Ranking Cache Metrics =======================
+    Keeps track of the ranking factor cache of the ranking
+    environment, such as its number of entries, hits,
+    misses, evictions and hit rate since it was set up.
+    All zero when the cache is disabled.
+    =========================================================
+"""
+
+from simulator_base.analytics.metric import Metric
+from market_simulation.config.market_config import get_config
+from market_simulation.objects.auction.ranking_environment import (
+    RankingEnvironment,
+)
+from typing import final
+
+
+class RankingCacheMetrics(Metric):
+    def __init__(self):
+        market_config = get_config().get_analytics_config()
+        super().__init__("RankingCacheMetrics", market_config['ranking'])
+
+    @final
+    def column_names(self) -> list[str]:
+        return [
+            "entries",
+            "hits",
+            "misses",
+            "evictions",
+            "hit_rate",
+        ]
+
+    @final
+    def calculate(self):
+        ranking_environment: RankingEnvironment = self._subject
+        factor_cache = ranking_environment.factor_cache
+        if factor_cache is None:
+            return [0, 0, 0, 0, 0.0]
+        return [
+            len(factor_cache),
+            factor_cache.hits,
+            factor_cache.misses,
+            factor_cache.evictions,
+            factor_cache.hit_rate,
+        ]
@@ -8,7 +8,13 @@
 
 from simulator_base.orchestrator.orchestrator import Orchestrator
 from simulator_base.analytics.metric import Metric
+from simulator_base.util.timestamp import to_duration
 from market_simulation.config.market_config import get_config
+from market_simulation.objects.auction.ad_event_log import (
+    EVENT_TYPE_CODES,
+    GOAL,
+    get_ad_event_log,
+)
 from market_simulation.objects.types.types import (
     AdEventFields,
     AdEventType,
@@ -17,6 +23,7 @@ from market_simulation.objects.environment.surface_environment import (
     SurfaceEnvironment,
 )
 from typing import final
+import numpy as np
 
 
 class SurfaceMetrics(Metric):
@@ -43,55 +50,41 @@ class SurfaceMetrics(Metric):
     @final
     def calculate(self):
         # Removed unused variable assignment
-        current_time = Orchestrator.get_current_time(self._subject)
+        current_time = Orchestrator.get_current_timestamp()
         surface_environment: SurfaceEnvironment = self._subject
         all_visits = surface_environment.visits
-        total_conversions = 0
-        total_impressions = 0
-        predicted_conversions = 0
-        predicted_value = 0
-        total_value = 0
-        total_revenue = 0
         users = set()
 
-        cutoff_time = current_time - self._aggregation_window
-        # from back to front
-        start_index = len(all_visits) - 1
-        while start_index >= 0:
-            organic_event = all_visits[start_index]
-            if organic_event[AdEventFields.EVENT_TIME] >= cutoff_time:
-                users.add(organic_event[AdEventFields.USER].id)
-            start_index -= 1
-        start_index = len(surface_environment.impressions) - 1
-        while start_index >= 0:
-            ad_event = surface_environment.impressions[start_index]
-            if ad_event[AdEventFields.EVENT_TIME] >= cutoff_time:
-                total_impressions += 1
-                total_revenue += ad_event[AdEventFields.COST]
-                if (
-                    ad_event[AdEventFields.AD].ad_goal
-                    == AdEventType.IMPRESSIONS
-                ):
-                    total_value += ad_event[AdEventFields.BID]
-                    predicted_value += ad_event[AdEventFields.BID]
-                else:
-                    predicted_conversions += ad_event[
-                        AdEventFields.PREDICTED_PROBABILITY
-                    ]
-                    predicted_value += ad_event[AdEventFields.PACED_BID] \
-                        * ad_event[AdEventFields.PREDICTED_PROBABILITY]
-            else:
-                break
-            start_index -= 1
-        start_index = len(surface_environment.outcomes) - 1
-        while start_index >= 0:
-            ad_event = surface_environment.outcomes[start_index]
-            if ad_event[AdEventFields.EVENT_TIME] >= cutoff_time:
-                total_value += ad_event[AdEventFields.PACED_BID]
-                total_conversions += 1
-            else:
-                break
-            start_index -= 1
+        cutoff_time = current_time - to_duration(self._aggregation_window)
+        for organic_event in all_visits.get_range(cutoff_time):
+            users.add(organic_event[AdEventFields.USER].id)
+        event_log = get_ad_event_log()
+        impressions = surface_environment.impressions.get_range(cutoff_time)
+        outcomes = surface_environment.outcomes.get_range(cutoff_time)
+        total_impressions = len(impressions)
+        total_conversions = len(outcomes)
+        total_revenue = self._accumulate(
+            event_log.get_column(AdEventFields.COST)[impressions]
+        )
+        paced_bids = event_log.get_column(AdEventFields.PACED_BID)
+        bids = event_log.get_column(AdEventFields.BID)[impressions]
+        predicted_probabilities = event_log.get_column(
+            AdEventFields.PREDICTED_PROBABILITY
+        )[impressions]
+        is_conversion_goal = event_log.get_column(GOAL)[impressions] != \
+            EVENT_TYPE_CODES[AdEventType.IMPRESSIONS]
+        total_value = self._accumulate(
+            bids[~is_conversion_goal],
+            paced_bids[outcomes]
+        )
+        predicted_conversions = self._accumulate(
+            predicted_probabilities[is_conversion_goal]
+        )
+        predicted_value = self._accumulate(np.where(
+            is_conversion_goal,
+            paced_bids[impressions] * predicted_probabilities,
+            bids
+        ))
 
         return [
             len(users),
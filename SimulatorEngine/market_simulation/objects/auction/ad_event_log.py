@@ -0,0 +1,228 @@
+"""
+    ================ Ad Event Log ======================
+    Append-only columnar log of the ad events
+    (impressions and conversions) of the simulation,
+    held by the all ads environment.
+
+    Every event is a row of typed columns, users, ads
+    and advertisers are stored as integer codes rather
+    than references to the agents. Surfaces, ads and
+    users keep the offsets of their events in the log
+    in rolling buffers, instead of sharing a dict per
+    event.
+
+    The columns double their capacity as they fill up,
+    starting from a chunk, and events are never removed.
+    ====================================================
+"""
+
+from simulator_base.agent.agent import Agent
+from simulator_base.orchestrator.orchestrator import get_orchestrator
+from ..types.types import (
+    AdEvent,
+    AdEventFields,
+    AdEventType,
+    AppSurfaceType,
+)
+import numpy as np
+
+EVENT_TYPES = tuple(AdEventType)
+EVENT_TYPE_CODES = {
+    event_type: code for code, event_type in enumerate(EVENT_TYPES)
+}
+SURFACES = tuple(AppSurfaceType)
+SURFACE_CODES = {surface: code for code, surface in enumerate(SURFACES)}
+
+# columns kept along with the fields of the events
+ADVERTISER = "advertiser"
+GOAL = "goal"
+COLUMN_DTYPES = {
+    AdEventFields.USER: np.int32,
+    AdEventFields.AD: np.int32,
+    ADVERTISER: np.int32,
+    AdEventFields.EVENT_TYPE: np.int8,
+    GOAL: np.int8,
+    AdEventFields.SURFACE: np.int8,
+    AdEventFields.BID: np.float64,
+    AdEventFields.PRICE: np.float64,
+    AdEventFields.COST: np.float64,
+    AdEventFields.PACED_BID: np.float64,
+    AdEventFields.TRUE_PROBABILITY: np.float64,
+    AdEventFields.PREDICTED_PROBABILITY: np.float64,
+    AdEventFields.EVENT_TIME: np.int64,
+}
+CHUNK_SIZE = 4096
+
+
+def get_ad_event_log() -> "AdEventLog":
+    return get_orchestrator().get_environment('AllAdsEnvironment').event_log
+
+
+class AdEventLog:
+    def __init__(self):
+        self._size = 0
+        self._columns: dict[str, np.ndarray] = {
+            column: np.zeros(CHUNK_SIZE, dtype=dtype)
+            for column, dtype in COLUMN_DTYPES.items()
+        }
+        # agent id -> code, and the ids of every code
+        self._user_codes: dict[str, int] = {}
+        self._user_ids: list[str] = []
+        self._ad_codes: dict[str, int] = {}
+        self._ads: list[Agent] = []
+        self._advertiser_codes: dict[str, int] = {}
+        self._advertiser_ids: list[str] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_column(self, column: str) -> np.ndarray:
+        """
+            Values of a column for every offset, the
+            array is only valid until the next append
+        """
+        return self._columns[column]
+
+    @property
+    def event_times(self) -> np.ndarray:
+        return self._columns[AdEventFields.EVENT_TIME]
+
+    # ============= System Accessible Public Methods ==============
+
+    def append(
+        self,
+        user: Agent,
+        ad: Agent,
+        event_type: AdEventType,
+        surface: AppSurfaceType,
+        bid: float,
+        price: float,
+        paced_bid: float,
+        true_probability: float,
+        predicted_probability: float,
+        event_time: int,
+    ) -> int:
+        """
+            Add an event, at no cost yet, and return
+            its offset
+        """
+        offset = self._size
+        if offset == len(self._columns[AdEventFields.EVENT_TIME]):
+            self._grow()
+        columns = self._columns
+        columns[AdEventFields.USER][offset] = self._get_user_code(user)
+        ad_code = self._get_ad_code(ad)
+        columns[AdEventFields.AD][offset] = ad_code
+        columns[ADVERTISER][offset] = self._get_advertiser_code(ad.owner)
+        columns[AdEventFields.EVENT_TYPE][offset] = \
+            EVENT_TYPE_CODES[event_type]
+        columns[GOAL][offset] = EVENT_TYPE_CODES[ad.ad_goal]
+        columns[AdEventFields.SURFACE][offset] = SURFACE_CODES[surface]
+        columns[AdEventFields.BID][offset] = bid
+        columns[AdEventFields.PRICE][offset] = price
+        columns[AdEventFields.COST][offset] = 0
+        columns[AdEventFields.PACED_BID][offset] = paced_bid
+        columns[AdEventFields.TRUE_PROBABILITY][offset] = true_probability
+        columns[AdEventFields.PREDICTED_PROBABILITY][offset] = \
+            predicted_probability
+        columns[AdEventFields.EVENT_TIME][offset] = event_time
+        self._size += 1
+        return offset
+
+    def set_cost(self, offset: int, cost: float):
+        self._columns[AdEventFields.COST][offset] = cost
+
+    def get_value(self, offset: int, column: str):
+        return self._columns[column][offset].item()
+
+    def get_event_type(self, offset: int) -> AdEventType:
+        return EVENT_TYPES[self._columns[AdEventFields.EVENT_TYPE][offset]]
+
+    def get_ad(self, offset: int) -> Agent:
+        return self._ads[self._columns[AdEventFields.AD][offset]]
+
+    def get_event(self, offset: int) -> AdEvent:
+        """
+            The event at the offset as a dict, users and
+            ads are given by their id
+        """
+        columns = self._columns
+        return {
+            AdEventFields.USER: self._user_ids[
+                columns[AdEventFields.USER][offset]
+            ],
+            AdEventFields.AD: self._ads[columns[AdEventFields.AD][offset]].id,
+            AdEventFields.EVENT_TYPE: self.get_event_type(offset),
+            AdEventFields.SURFACE: SURFACES[
+                columns[AdEventFields.SURFACE][offset]
+            ],
+            AdEventFields.BID: self.get_value(offset, AdEventFields.BID),
+            AdEventFields.PRICE: self.get_value(offset, AdEventFields.PRICE),
+            AdEventFields.COST: self.get_value(offset, AdEventFields.COST),
+            AdEventFields.PACED_BID: self.get_value(
+                offset,
+                AdEventFields.PACED_BID
+            ),
+            AdEventFields.TRUE_PROBABILITY: self.get_value(
+                offset,
+                AdEventFields.TRUE_PROBABILITY
+            ),
+            AdEventFields.PREDICTED_PROBABILITY: self.get_value(
+                offset,
+                AdEventFields.PREDICTED_PROBABILITY
+            ),
+            AdEventFields.EVENT_TIME: self.get_value(
+                offset,
+                AdEventFields.EVENT_TIME
+            ),
+        }
+
+    def get_ad_code(self, ad: Agent) -> int:
+        """
+            Code of the ad, -1 if it has no events
+        """
+        return self._ad_codes.get(ad.id, -1)
+
+    def get_ad_ids(self, codes: np.ndarray) -> list[str]:
+        ads = self._ads
+        return [ads[code].id for code in codes.tolist()]
+
+    def get_advertiser_code(self, advertiser: Agent) -> int:
+        """
+            Code of the advertiser, -1 if it has no events
+        """
+        return self._advertiser_codes.get(advertiser.id, -1)
+
+    def get_advertiser_ids(self, codes: np.ndarray) -> list[str]:
+        advertiser_ids = self._advertiser_ids
+        return [advertiser_ids[code] for code in codes.tolist()]
+
+    # ============= Private Helper Methods =============
+
+    def _grow(self):
+        for column, values in self._columns.items():
+            grown_values = np.zeros(2 * len(values), dtype=values.dtype)
+            grown_values[:len(values)] = values
+            self._columns[column] = grown_values
+
+    def _get_user_code(self, user: Agent) -> int:
+        code = self._user_codes.get(user.id)
+        if code is None:
+            code = self._user_codes[user.id] = len(self._user_ids)
+            self._user_ids.append(user.id)
+        return code
+
+    def _get_ad_code(self, ad: Agent) -> int:
+        code = self._ad_codes.get(ad.id)
+        if code is None:
+            code = self._ad_codes[ad.id] = len(self._ads)
+            self._ads.append(ad)
+        return code
+
+    def _get_advertiser_code(self, advertiser: Agent) -> int:
+        code = self._advertiser_codes.get(advertiser.id)
+        if code is None:
+            code = self._advertiser_codes[advertiser.id] = \
+                len(self._advertiser_ids)
+            self._advertiser_ids.append(advertiser.id)
+        return code
@@ -0,0 +1,334 @@
+"""
+    ================ Ad Table =======================
+    Columnar copy of the targeting specs of all active
+    ads, held by the all ads environment. Countries,
+    surfaces and genders are stored as bitmasks and
+    ages as min / max columns, so that targeting a
+    request is a single boolean mask over the arrays
+    instead of a spec lookup per ad. Countries meet
+    the target of an ad as in AdSpecState.country_match:
+    a single target country is matched as a substring,
+    a list of them by membership.
+
+    The ad side ranking features (goal, category,
+    format, owner and its product price) are kept in
+    the same table for the batched ranking path.
+
+    The table follows the active ads of the all active
+    ads state, rows of ads that stay active are reused
+    across scans since none of these fields change.
+
+    Ads whose budget is exhausted are flagged in an
+    eligibility column, updated by the budget state of
+    the ad as it changes, and left out of the ranking.
+    The participation probability of throttled ads is
+    kept the same way, as well as the paced bids of the
+    ads under batch pacing. The bid version changes
+    with the eligibility and the paced bids, so that an
+    auction run ahead of a browse can tell if it still
+    holds.
+    =================================================
+"""
+
+from simulator_base.agent.agent import Agent
+from simulator_base.types.types import GenderType
+from ..types.types import (
+    AdCategory,
+    AdEventType,
+    AdFormat,
+    AppSurfaceType,
+    TargetingFilter,
+    TargetingFilterFields,
+)
+from typing import Optional
+import numpy as np
+
+SURFACE_BITS = {
+    surface: 1 << index for index, surface in enumerate(AppSurfaceType)
+}
+GENDER_BITS = {
+    gender: 1 << index for index, gender in enumerate(GenderType)
+}
+# country targets are assigned a bit as they show up
+MAX_COUNTRY_CNT = 63
+GOALS = (AdEventType.IMPRESSIONS, AdEventType.CONVERSIONS)
+GOAL_CODES = {goal: code for code, goal in enumerate(GOALS)}
+CATEGORIES = tuple(AdCategory)
+CATEGORY_CODES = {category: code for code, category in enumerate(CATEGORIES)}
+FORMATS = tuple(AdFormat)
+FORMAT_CODES = {ad_format: code for code, ad_format in enumerate(FORMATS)}
+
+# columns of the table, owners are coded as they show up
+(
+    COUNTRY, SURFACE, GENDER, MIN_AGE, MAX_AGE,
+    GOAL, CATEGORY, FORMAT, OWNER,
+) = range(9)
+COLUMN_CNT = 9
+
+Row = tuple[int, int, int, int, int, int, int, int, int, float]
+
+
+class AdTable:
+    def __init__(self):
+        self._ads: list[Agent] = []
+        # ad id -> encoded row, kept for the active ads only
+        self._rows: dict[str, Row] = {}
+        # (country target, matched as substring) -> bit
+        self._country_bits: dict[tuple[str, bool], int] = {}
+        # country -> mask of the country targets it meets
+        self._country_masks: dict[str, int] = {}
+        # owner id -> owner code
+        self._owner_codes: dict[str, int] = {}
+        self._owner_ids: list[str] = []
+        self._columns = np.zeros((COLUMN_CNT, 0), dtype=np.int64)
+        # product price of the owner of every ad
+        self._prices = np.zeros(0, dtype=np.float64)
+        # ad id -> row in the table
+        self._row_indices: dict[str, int] = {}
+        self._eligible = np.ones(0, dtype=bool)
+        self._ineligible_cnt = 0
+        self._participation_probabilities = np.ones(0, dtype=np.float64)
+        self._paced_bids = np.zeros(0, dtype=np.float64)
+        self._bid_version = 0
+        # version of the active ads the table was built from
+        self._version: Optional[int] = None
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    @property
+    def ads(self) -> list[Agent]:
+        return self._ads
+
+    @property
+    def owner_ids(self) -> list[str]:
+        """
+            Owner id of every owner code
+        """
+        return self._owner_ids
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._prices
+
+    @property
+    def eligible(self) -> np.ndarray:
+        """
+            Whether every ad can take part in auctions
+        """
+        return self._eligible
+
+    @property
+    def ineligible_cnt(self) -> int:
+        return self._ineligible_cnt
+
+    @property
+    def participation_probabilities(self) -> np.ndarray:
+        """
+            Probability of every ad taking part in a
+            request, below 1 for throttled ads only
+        """
+        return self._participation_probabilities
+
+    @property
+    def paced_bids(self) -> np.ndarray:
+        """
+            Paced bid of every ad, as of the last batch
+            pacing adjustment
+        """
+        return self._paced_bids
+
+    @property
+    def bid_version(self) -> int:
+        """
+            Changes whenever the eligibility or the paced
+            bids of the ads change
+        """
+        return self._bid_version
+
+    def __len__(self) -> int:
+        return len(self._ads)
+
+    def get_column(self, column: int) -> np.ndarray:
+        return self._columns[column]
+
+    # ============= System Accessible Public Methods ==============
+
+    def sync(self, ads: list[Agent], version: int):
+        """
+            Rebuild the columns for the given active ads,
+            in the same order.
+        """
+        rows = self._rows
+        synced_rows = {}
+        table = []
+        for ad in ads:
+            row = rows.get(ad.id)
+            if row is None:
+                row = self._encode(ad)
+            synced_rows[ad.id] = row
+            table.append(row)
+        self._rows = synced_rows
+        self._ads = list(ads)
+        self._row_indices = {ad.id: index for index, ad in enumerate(ads)}
+        budget_states = [ad.get_state('AdBudgetState') for ad in ads]
+        self._eligible = np.array(
+            [state.is_eligible for state in budget_states],
+            dtype=bool
+        )
+        self._ineligible_cnt = len(ads) - int(self._eligible.sum())
+        self._participation_probabilities = np.array(
+            [state.participation_probability for state in budget_states],
+            dtype=np.float64
+        )
+        self._paced_bids = np.array(
+            [state.current_paced_bid for state in budget_states],
+            dtype=np.float64
+        )
+        if table:
+            self._columns = np.array(
+                [row[:COLUMN_CNT] for row in table],
+                dtype=np.int64
+            ).T.copy()
+            self._prices = np.array(
+                [row[COLUMN_CNT] for row in table],
+                dtype=np.float64
+            )
+        else:
+            self._columns = np.zeros((COLUMN_CNT, 0), dtype=np.int64)
+            self._prices = np.zeros(0, dtype=np.float64)
+        self._bid_version += 1
+        self._version = version
+
+    def match(self, filters: TargetingFilter) -> np.ndarray:
+        """
+            Boolean mask of the ads that meet the
+            targeting filters
+        """
+        country_mask = self._get_country_mask(
+            filters[TargetingFilterFields.COUNTRY]
+        )
+        surface_bit = SURFACE_BITS.get(filters[TargetingFilterFields.SURFACE])
+        gender_bit = GENDER_BITS.get(filters[TargetingFilterFields.GENDER])
+        if not country_mask or surface_bit is None or gender_bit is None:
+            return np.zeros(len(self._ads), dtype=bool)
+        age = filters[TargetingFilterFields.AGE]
+        columns = self._columns
+        return (
+            ((columns[COUNTRY] & country_mask) != 0)
+            & ((columns[SURFACE] & surface_bit) != 0)
+            & ((columns[GENDER] & gender_bit) != 0)
+            & (columns[MIN_AGE] <= age)
+            & (columns[MAX_AGE] >= age)
+        )
+
+    def get_matching_rows(self, filters: TargetingFilter) -> np.ndarray:
+        """
+            Rows of the ads that meet the targeting
+            filters, in the order of the active ads
+        """
+        return np.flatnonzero(self.match(filters))
+
+    def get_matching_ads(self, filters: TargetingFilter) -> list[Agent]:
+        return self.get_ads(self.get_matching_rows(filters))
+
+    def get_ads(self, rows: np.ndarray) -> list[Agent]:
+        ads = self._ads
+        return [ads[row] for row in rows.tolist()]
+
+    def set_eligible(self, ad_id: str, eligible: bool):
+        """
+            Flag the row of an ad, ads that are not in
+            the table pick up their flag on the next sync
+        """
+        row = self._row_indices.get(ad_id)
+        if row is None or self._eligible[row] == eligible:
+            return
+        self._eligible[row] = eligible
+        self._ineligible_cnt += -1 if eligible else 1
+        self._bid_version += 1
+
+    def set_participation_probability(self, ad_id: str, probability: float):
+        row = self._row_indices.get(ad_id)
+        if row is not None:
+            self._participation_probabilities[row] = probability
+
+    def set_paced_bids(self, paced_bids: np.ndarray):
+        """
+            Paced bids of all the ads, in the order of
+            the table
+        """
+        if len(paced_bids) != len(self._ads):
+            raise Exception("Paced bids do not match the ads of the table")
+        self._paced_bids = paced_bids
+        self._bid_version += 1
+
+    def get_eligible_rows(self, rows: np.ndarray) -> np.ndarray:
+        """
+            The given rows without the ones of ads that
+            cannot take part in auctions
+        """
+        if not self._ineligible_cnt:
+            return rows
+        return rows[self._eligible[rows]]
+
+    # ============= Private Helper Methods =============
+
+    def _encode(self, ad: Agent) -> Row:
+        spec_state = ad.get_state('AdSpecState')
+        countries = spec_state.country
+        # ads are created with a single target country
+        if isinstance(countries, str):
+            country_mask = self._get_country_bit(countries, True)
+        else:
+            country_mask = 0
+            for country in countries:
+                country_mask |= self._get_country_bit(country, False)
+        surface_mask = 0
+        for surface in spec_state.surfaces:
+            surface_mask |= SURFACE_BITS.get(surface, 0)
+        gender_mask = 0
+        for gender in spec_state.gender:
+            gender_mask |= GENDER_BITS.get(gender, 0)
+        owner = ad.owner
+        owner_code = self._owner_codes.get(owner.id)
+        if owner_code is None:
+            owner_code = self._owner_codes[owner.id] = len(self._owner_ids)
+            self._owner_ids.append(owner.id)
+        return (
+            country_mask,
+            surface_mask,
+            gender_mask,
+            spec_state.min_age,
+            spec_state.max_age,
+            GOAL_CODES[ad.ad_goal],
+            CATEGORY_CODES[spec_state.ad_category],
+            FORMAT_CODES[spec_state.ad_format],
+            owner_code,
+            ad.product_price,
+        )
+
+    def _get_country_bit(self, country: str, is_substring: bool) -> int:
+        key = (country, is_substring)
+        bit = self._country_bits.get(key)
+        if bit is None:
+            if len(self._country_bits) == MAX_COUNTRY_CNT:
+                raise Exception(
+                    f"Ad table supports at most {MAX_COUNTRY_CNT} countries"
+                )
+            bit = 1 << len(self._country_bits)
+            self._country_bits[key] = bit
+            self._country_masks = {}
+        return bit
+
+    def _get_country_mask(self, country: str) -> int:
+        mask = self._country_masks.get(country)
+        if mask is None:
+            mask = 0
+            for (target, is_substring), bit in self._country_bits.items():
+                if country == target \
+                   or (is_substring and country in target):
+                    mask |= bit
+            self._country_masks[country] = mask
+        return mask
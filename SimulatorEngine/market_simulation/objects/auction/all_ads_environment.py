@@ -3,15 +3,24 @@
     An environment object that holds and tracks all
     available ads for today. This enables the ads to
     be later fetched for viewing for users.
+
+    The targeting specs of the active ads are also
+    kept in a columnar ad table, and the events of all
+    ads in a columnar ad event log.
     ================================================
 """
 
+from simulator_base.agent.agent import Agent
 from simulator_base.environment.environment import Environment
+from .ad_table import AdTable
+from .ad_event_log import AdEventLog
 
 
 class AllAdsEnvironment(Environment):
     def __init__(self):
         super().__init__("AllAdsEnvironment")
+        self._ad_table = AdTable()
+        self._event_log = AdEventLog()
 
     def destroy(self):
         raise Exception("AllAdsEnvironment object cannot be destroyed")
@@ -25,3 +34,44 @@ class AllAdsEnvironment(Environment):
     @property
     def active_ads(self):
         return self.get_state('AllActiveAdsState').active_ads
+
+    @property
+    def ad_table(self) -> AdTable:
+        """
+            Ad table of the active ads, synced with the
+            last scan of the active ads
+        """
+        all_active_ads_state = self.get_state('AllActiveAdsState')
+        if self._ad_table.version != all_active_ads_state.version:
+            self._ad_table.sync(
+                all_active_ads_state.active_ads,
+                all_active_ads_state.version
+            )
+        return self._ad_table
+
+    @property
+    def event_log(self) -> AdEventLog:
+        return self._event_log
+
+    def set_ad_eligible(self, ad: Agent, eligible: bool):
+        """
+            Called by the budget state of an ad as its
+            budget gets exhausted or refreshed
+        """
+        self._ad_table.set_eligible(ad.id, eligible)
+
+    def set_ad_participation_probability(self, ad: Agent, probability: float):
+        """
+            Called by the budget state of an ad as its
+            participation probability is adjusted in
+            throttling pacing mode
+        """
+        self._ad_table.set_participation_probability(ad.id, probability)
+
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # the ad table is rebuilt from the active ads
+        state = super().__getstate__()
+        state["_ad_table"] = AdTable()
+        return state
@@ -8,9 +8,13 @@ from simulator_base.environment.environment import Environment
 from .auction_environment import AuctionEnvironment
 from .all_ads_environment import AllAdsEnvironment
 from ..state.all_active_ads_state import AllActiveAdsState
+from ..state.all_ads_pacing_state import AllAdsPacingState
 from .ranking_environment import RankingEnvironment
 from .targeting_environment import TargetingEnvironment
+from ..analytics.ranking_cache_metrics import RankingCacheMetrics
 from market_simulation.config.market_config import get_config
+from simulator_base.config.global_config import get_config as \
+    get_global_config
 from datetime import timedelta
 from typing import List
 
@@ -23,7 +27,18 @@ def load_auction_env(start: bool = True) -> List[Environment]:
     period_timedelta = timedelta(minutes=ads_scanning_period)
     all_ads_state = AllActiveAdsState(period_timedelta)
     all_ads_env.add_object(all_ads_state)
+    delivery_config = get_config().frozen.delivery_config
+    pacing_config = delivery_config.pacing_config
+    if pacing_config.batch_pacing:
+        # the adjustment interval counts simulation ticks
+        tick_interval = get_global_config().frozen.tick_interval
+        all_ads_env.add_object(AllAdsPacingState(
+            tick_interval * pacing_config.adjustment_interval
+        ))
     ranking_env = RankingEnvironment()
+    if delivery_config.ranking_cache_config.track_stats:
+        ranking_cache_metrics = RankingCacheMetrics()
+        ranking_cache_metrics.attach(ranking_env)
     targeting_env = TargetingEnvironment()
     if start:
         auction_env.start()
@@ -3,28 +3,66 @@
     Auction environment, this is where the final layer
     of the recommendation system happen. All probability
     are multiplied by the ad's bid to get the final
-    auction ranking. And the second price is calculated
-    here as well.
+    auction ranking. And the price is calculated here
+    as well, for the whole set of candidates at once
+    (see pricing).
+
+    Under batch pacing the paced bids hold until the
+    next adjustment, so the auctions of the users
+    browsing a surface in the same tick are run ahead
+    of the browses, one row of a users x ads matrix
+    per user. These hold for as long as the ads keep
+    their eligibility and paced bids.
     =====================================================
 """
 
 from simulator_base.environment.environment import Environment
 from simulator_base.orchestrator.orchestrator import get_orchestrator
 from simulator_base.agent.agent import Agent
+from simulator_base.config.frozen_config import FrozenConfig
 from market_simulation.config.market_config import get_config
 from .ranking_environment import RankingEnvironment
+from .pricing import get_prices, get_ranked_cnt, get_top_k, get_top_k_rows
 from ..types.types import (
+    AUCTION_RESULT_DTYPE,
     AppSurfaceType,
     AuctionResults,
     AuctionResultFields,
     AuctionType,
 )
+from typing import Optional
+import numpy as np
+
+# ads auctioned ahead of a browse, with the bid version of the
+# ad table they were priced at and the checkpoint of the user
+# stream from before the model noise was drawn
+PricedAds = tuple[AuctionResults, int, tuple]
 
 
 class AuctionEnvironment(Environment):
     def __init__(self):
         super().__init__("AuctionEnvironment")
         self._ad_ranking = []
+        # auction settings of the frozen config they were read from
+        self._config: Optional[FrozenConfig] = None
+        self._auction_type: Optional[AuctionType] = None
+        self._batch_pacing = False
+
+    @property
+    def auction_type(self) -> AuctionType:
+        self._read_config()
+        return self._auction_type
+
+    @property
+    def batch_pacing(self) -> bool:
+        """
+            Whether the paced bids are read from the ad
+            table instead of being paced upon every bid
+        """
+        self._read_config()
+        return self._batch_pacing
+
+    # ============= System Accessible Public Methods ==============
 
     def fetch_and_price_all_ads(
         self,
@@ -34,50 +72,226 @@ class AuctionEnvironment(Environment):
     ) -> AuctionResults:
         """
             Obtaining scored ads from the ranking environment,
-            order them via value of bid, and calculate the price
-            based on the auction type.
+            keep the ad_cnt highest bids, and calculate the price
+            based on the auction type. The ranked ads are
+            returned as a record array of AUCTION_RESULT_DTYPE.
+        """
+        ranking_environment: RankingEnvironment = get_orchestrator() \
+            .get_environment('RankingEnvironment')
+        ads, rows = ranking_environment.fetch_all_ads(user, surface)
+        true_probabilities, predicted_probabilities = \
+            ranking_environment.get_probabilities(
+                user,
+                ads,
+                rows,
+                ranking_environment.ad_table,
+                surface
+            )
+        return self.price_scored_ads(
+            ads,
+            rows,
+            true_probabilities,
+            predicted_probabilities,
+            ad_cnt
+        )
+
+    def price_scored_ads(
+        self,
+        ads: list[Agent],
+        rows: np.ndarray,
+        true_probabilities: np.ndarray,
+        predicted_probabilities: np.ndarray,
+        ad_cnt: int = 0
+    ) -> AuctionResults:
+        """
+            Auction of ads already scored by the ranking
+            environment, rows are the rows of the ads in
+            the ad table, see fetch_and_price_all_ads
+        """
+        paced_bids = self._get_paced_bids(ads, rows)
+        return self._run_auction(
+            ads,
+            paced_bids,
+            paced_bids * predicted_probabilities,
+            true_probabilities,
+            predicted_probabilities,
+            ad_cnt
+        )
+
+    def price_scored_ads_batch(
+        self,
+        users: list[Agent],
+        scored_ads: list[tuple[list[Agent], np.ndarray, np.ndarray]],
+        ad_cnt: int = 0
+    ) -> list[PricedAds]:
+        """
+            price_scored_ads for every user ahead of the
+            browse, under batch pacing only. scored_ads are
+            the ads, rows and "true" probabilities of every
+            user, as fetch_and_score_all_ads_batch returns
+            them. The auctions are run over a users x ads
+            matrix of all the ads scored, the ads a user was
+            not scored on bid -inf. See get_priced_ads for
+            the results.
         """
-        # delete
+        if not users:
+            return []
         ranking_environment: RankingEnvironment = get_orchestrator() \
             .get_environment('RankingEnvironment')
-        scored_ads = ranking_environment.fetch_and_rank_all_ads(
-            user,
-            surface
+        ad_table = ranking_environment.ad_table
+        rows = np.unique(np.concatenate([scored[1] for scored in scored_ads]))
+        ads = ad_table.get_ads(rows)
+        # columns of the ads of every user, rows are in ascending order
+        columns = [np.searchsorted(rows, scored[1]) for scored in scored_ads]
+        checkpoints = [user.random_stream.checkpoint() for user in users]
+        is_scored = np.zeros((len(users), len(rows)), dtype=bool)
+        true_probabilities = np.zeros(
+            (len(users), len(rows)),
+            dtype=np.float64
         )
-        ad_candidates_with_bids = []
-        for ad, prob in scored_ads:
-            paced_bid = ad.paced_bid
-            ad_candidates_with_bids.append(
-                {
-                    AuctionResultFields.AD: ad,
-                    AuctionResultFields.BID: paced_bid * prob[1],
-                    AuctionResultFields.PRICE: 0,
-                    AuctionResultFields.PACED_BID: paced_bid,
-                    AuctionResultFields.TRUE_PROBABILITY: prob[0],
-                    AuctionResultFields.PREDICTED_PROBABILITY: prob[1],
-                }
+        for index, (user_columns, scored) in enumerate(
+            zip(columns, scored_ads)
+        ):
+            is_scored[index, user_columns] = True
+            true_probabilities[index, user_columns] = scored[2]
+        predicted_probabilities = \
+            ranking_environment.predict_probability_matrix(
+                users,
+                rows,
+                ad_table,
+                true_probabilities,
+                columns
             )
-        ranked_ads = sorted(
-            ad_candidates_with_bids,
-            key=lambda x: x[AuctionResultFields.BID],
-            reverse=True
+        paced_bids = ad_table.paced_bids[rows]
+        bids = np.where(
+            is_scored,
+            paced_bids * predicted_probabilities,
+            -np.inf
         )
-        ranked_ads = ranked_ads[:ad_cnt] if ad_cnt > 0 else []
+        ranked = get_top_k_rows(
+            bids,
+            get_ranked_cnt(ad_cnt, self.auction_type)
+        )
+        top = ranked[:, :ad_cnt]
+        ranked_ads = np.empty(top.shape, dtype=AUCTION_RESULT_DTYPE)
+        if top.size:
+            ranked_bids = np.take_along_axis(bids, ranked, axis=1)
+            ranked_ads[AuctionResultFields.AD] = [
+                [ads[column] for column in user_top]
+                for user_top in top.tolist()
+            ]
+            ranked_ads[AuctionResultFields.BID] = ranked_bids[:, :ad_cnt]
+            ranked_ads[AuctionResultFields.PACED_BID] = paced_bids[top]
+            ranked_ads[AuctionResultFields.TRUE_PROBABILITY] = \
+                np.take_along_axis(true_probabilities, top, axis=1)
+            ranked_ads[AuctionResultFields.PREDICTED_PROBABILITY] = \
+                np.take_along_axis(predicted_probabilities, top, axis=1)
+            # the ads a user was not scored on take no part
+            # in its auction, as if they were not bidding
+            ranked_ads[AuctionResultFields.PRICE] = get_prices(
+                np.maximum(ranked_bids, 0),
+                self.auction_type,
+                ad_cnt
+            )
+        bid_version = ad_table.bid_version
+        return [
+            (
+                ranked_ads[index, :min(ad_cnt, len(scored[1]))],
+                bid_version,
+                checkpoint
+            )
+            for index, (scored, checkpoint) in enumerate(
+                zip(scored_ads, checkpoints)
+            )
+        ]
+
+    def get_priced_ads(
+        self,
+        user: Agent,
+        priced_ads: PricedAds
+    ) -> Optional[AuctionResults]:
+        """
+            Ranked ads of an auction run by
+            price_scored_ads_batch, None if the eligibility
+            or the paced bids of the ads changed since. The
+            stream of the user is then rewound to before its
+            model noise was drawn, for the ads to be priced
+            again.
+        """
+        ranking_environment: RankingEnvironment = get_orchestrator() \
+            .get_environment('RankingEnvironment')
+        ranked_ads, bid_version, checkpoint = priced_ads
+        if bid_version == ranking_environment.ad_table.bid_version:
+            return ranked_ads
+        user.random_stream.rewind(checkpoint)
+        return None
+
+    # ============= Private Helper Methods =============
+
+    def _run_auction(
+        self,
+        ads: list[Agent],
+        paced_bids: np.ndarray,
+        bids: np.ndarray,
+        true_probabilities: np.ndarray,
+        predicted_probabilities: np.ndarray,
+        ad_cnt: int
+    ) -> AuctionResults:
+        ranked = get_top_k(bids, get_ranked_cnt(ad_cnt, self.auction_type))
+        top = ranked[:ad_cnt]
+        ranked_ads = np.empty(len(top), dtype=AUCTION_RESULT_DTYPE)
+        if not len(top):
+            return ranked_ads
+        ranked_ads[AuctionResultFields.AD] = [
+            ads[index] for index in top.tolist()
+        ]
+        ranked_ads[AuctionResultFields.BID] = bids[top]
+        ranked_ads[AuctionResultFields.PACED_BID] = paced_bids[top]
+        ranked_ads[AuctionResultFields.TRUE_PROBABILITY] = \
+            true_probabilities[top]
+        ranked_ads[AuctionResultFields.PREDICTED_PROBABILITY] = \
+            predicted_probabilities[top]
 
         # ================== Auction Price Calculation ==================
-        market_config = get_config()
-        delivery_config = market_config.get_delivery_config()
-        auction_type = delivery_config['auction_config']['auction_type']
-        for index, _ in enumerate(ranked_ads):
-            # In GSP auction, every ad pays by the bid amount of the next
-            # ad, and the last ad in the auction pays 0.
-            if auction_type == AuctionType.GENERALIZED_SECOND_PRICE \
-               and index != len(ranked_ads) - 1:
-                price = ranked_ads[index + 1][AuctionResultFields.BID]
-            # In GFP auction, every ad pays the bid amount of itself.
-            elif auction_type == AuctionType.GENERALIZED_FIRST_PRICE:
-                price = ranked_ads[index][AuctionResultFields.BID]
-            else:
-                price = 0
-            ranked_ads[index][AuctionResultFields.PRICE] = price
+        ranked_ads[AuctionResultFields.PRICE] = get_prices(
+            bids[ranked],
+            self.auction_type,
+            ad_cnt
+        )
         return ranked_ads
+
+    def _get_paced_bids(
+        self,
+        ads: list[Agent],
+        rows: np.ndarray
+    ) -> np.ndarray:
+        if self.batch_pacing:
+            ranking_environment: RankingEnvironment = get_orchestrator() \
+                .get_environment('RankingEnvironment')
+            return ranking_environment.ad_table.paced_bids[rows]
+        # pacing is updated on every bid, so every candidate
+        # bids even if it does not make it to the top
+        return np.array([ad.paced_bid for ad in ads], dtype=np.float64)
+
+    def _read_config(self):
+        config = get_config().frozen
+        if config is self._config:
+            return
+        auction_config = config.delivery_config.auction_config
+        if auction_config.auction_type not in tuple(AuctionType):
+            raise Exception(
+                f"Unknown auction type {auction_config.auction_type}"
+            )
+        self._auction_type = AuctionType(auction_config.auction_type)
+        self._batch_pacing = config.delivery_config.pacing_config\
+            .batch_pacing
+        self._config = config
+
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # auction settings are read again from the loaded config
+        state = super().__getstate__()
+        state["_config"] = None
+        state["_auction_type"] = None
+        return state
@@ -0,0 +1,131 @@
+"""
+    Contains the ranking and pricing equations of the
+    auction, applied on arrays of bids. Prices are also
+    calculated for users x ads matrices of ranked bids,
+    one auction per row.
+"""
+
+from market_simulation.objects.types.types import AuctionType
+import numpy as np
+
+"""
+    ================== Ranking Section =====================
+"""
+
+
+def get_top_k(bids: np.ndarray, k: int) -> np.ndarray:
+    """
+        Indices of the k highest bids, highest first.
+
+        Equal bids keep the order of the candidates,
+        as a stable sort of all the bids would, so
+        the cut at the k-th bid only takes the first
+        candidates of a tie.
+    """
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(bids):
+        kth_bid = np.partition(bids, len(bids) - k)[len(bids) - k]
+        above = np.flatnonzero(bids > kth_bid)
+        tied = np.flatnonzero(bids == kth_bid)[:k - len(above)]
+        top = np.concatenate((above, tied))
+    else:
+        top = np.arange(len(bids))
+    return top[np.lexsort((top, -bids[top]))]
+
+
+def get_top_k_rows(bids: np.ndarray, k: int) -> np.ndarray:
+    """
+        get_top_k of every row of a users x ads
+        matrix of bids
+    """
+    k = min(max(k, 0), bids.shape[1])
+    if k == 0:
+        return np.zeros((len(bids), 0), dtype=np.int64)
+    negated = -bids
+    if k == bids.shape[1]:
+        return np.argsort(negated, axis=1, kind='stable')
+    rows = np.arange(len(bids))[:, np.newaxis]
+    top = np.argpartition(negated, k - 1, axis=1)[:, :k]
+    kth_bids = negated[rows, top[:, k - 1:]]
+    # every row has at least k bids up to its k-th one, more
+    # means a tie at the cut, which goes to the first candidates
+    if np.count_nonzero(negated <= kth_bids) > top.size:
+        above = negated < kth_bids
+        tied = negated == kth_bids
+        tied &= np.cumsum(tied, axis=1) \
+            <= k - np.count_nonzero(above, axis=1, keepdims=True)
+        top = np.nonzero(above | tied)[1].reshape(len(bids), k)
+    return top[rows, np.lexsort((top, negated[rows, top]))]
+
+
+"""
+    ================== Pricing Section =====================
+"""
+
+
+def get_ranked_cnt(ad_cnt: int, auction_type: AuctionType) -> int:
+    """
+        Number of ads to rank for an auction of ad_cnt
+        ads, VCG also needs the highest losing bid
+    """
+    if auction_type == AuctionType.VICKREY_CLARKE_GROVES:
+        return ad_cnt + 1
+    return ad_cnt
+
+
+def get_prices(
+    ranked_bids: np.ndarray,
+    auction_type: AuctionType,
+    ad_cnt: int
+) -> np.ndarray:
+    """
+        Price paid by each of the first ad_cnt ranked
+        ads, bids are in ranked order and include the
+        losing bids ranked for the auction type (see
+        get_ranked_cnt). Every row of a matrix of
+        ranked bids is a separate auction.
+    """
+    winning_bids = ranked_bids[..., :ad_cnt]
+    if auction_type == AuctionType.GENERALIZED_SECOND_PRICE:
+        return get_second_prices(winning_bids)
+    if auction_type == AuctionType.GENERALIZED_FIRST_PRICE:
+        return winning_bids.copy()
+    if auction_type == AuctionType.VICKREY_CLARKE_GROVES:
+        return get_vcg_prices(winning_bids, ranked_bids[..., ad_cnt:])
+    raise Exception(f"Unknown auction type {auction_type}")
+
+
+def get_second_prices(ranked_bids: np.ndarray) -> np.ndarray:
+    """
+        In GSP auction, every ad pays by the bid amount
+        of the next ad, and the last ad in the auction
+        pays 0.
+    """
+    prices = np.zeros(ranked_bids.shape, dtype=np.float64)
+    prices[..., :-1] = ranked_bids[..., 1:]
+    return prices
+
+
+def get_vcg_prices(
+    winning_bids: np.ndarray,
+    losing_bids: np.ndarray
+) -> np.ndarray:
+    """
+        In VCG auction, every ad pays the value it takes
+        away from the other ads by being shown.
+
+        This is the uniform-price VCG for unit-demand
+        slots, with the position decay ignored: the
+        surface does weigh outcomes by 0.95 ** position
+        (see SurfaceEnvironment), but the bids do not,
+        so every shown slot is worth the same. Without
+        any one of the winners, the ads below it move
+        up a slot at no gain and the highest losing ad
+        gets shown, hence every winner pays the highest
+        losing bid, or 0 if all the candidates won.
+    """
+    prices = np.zeros(winning_bids.shape, dtype=np.float64)
+    if losing_bids.shape[-1]:
+        prices[...] = losing_bids[..., :1]
+    return prices
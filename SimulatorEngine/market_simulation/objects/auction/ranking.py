@@ -10,7 +10,9 @@ from market_simulation.objects.types.types import (
     AdFormat,
     AppSurfaceType,
 )
+from .ad_table import FORMATS, GOAL_CODES
 import math
+import numpy as np
 
 """
     ================== Ranking Section =====================
@@ -29,9 +31,7 @@ def get_age_factor(user: Agent) -> float:
         age gets to 18 or 65, the
         factor becomes 0.5
     """
-    user_config = get_config().get_user_config()
-    intent_config = user_config['intent_config']
-    peak_age = intent_config['peak_age']
+    peak_age = get_config().frozen.user_config.intent_config.peak_age
     age = user.age
     if age > peak_age:
         return max(math.exp(-0.01 * (age - peak_age) ** 1.2), 0)
@@ -44,9 +44,8 @@ def get_gender_factor(user: Agent) -> float:
         Generally female are slightly more
         likely to convert than male.
     """
-    user_config = get_config().get_user_config()
-    intent_config = user_config['intent_config']
-    gender_factor = intent_config['gender_factor']
+    gender_factor = get_config().frozen.user_config.intent_config\
+        .gender_factor
     if user.gender == GenderType.FEMALE:
         return 1
     else:
@@ -54,13 +53,16 @@ def get_gender_factor(user: Agent) -> float:
 
 
 def get_income_savings_factor(user: Agent, ad: Agent):
-    user_config = get_config().get_user_config()
-    intent_config = user_config['intent_config']
-    no_decay_ratio = intent_config['no_decay_income_price_ratio']
     user_disposable_income_state = user.get_state("DisposableIncomeState")
     total_savings = user_disposable_income_state.disposable_income
     advertiser: Agent = ad.owner
     product_price = advertiser.get_state("AdvertiserIntentState").product_price
+    return _get_income_savings_factor(total_savings, product_price)
+
+
+def _get_income_savings_factor(total_savings: float, product_price: float):
+    no_decay_ratio = get_config().frozen.user_config.intent_config\
+        .no_decay_income_price_ratio
     # Only 20% of savings is considered available for spending.
     effective_income = 0.25 * total_savings
 
@@ -80,9 +82,8 @@ def get_ad_goal_factor(ad: Agent) -> float:
         Different goals have different conversion
         rate
     """
-    user_config = get_config().get_user_config()
-    intent_config = user_config['intent_config']
-    event_probability_baseline = intent_config['event_probability_baseline']
+    event_probability_baseline = get_config().frozen.user_config\
+        .intent_config.event_probability_baseline
     ad_goal = ad.ad_goal
 
     if ad_goal == AdEventType.CONVERSIONS:
@@ -109,7 +110,13 @@ def get_ad_format_surface_factor(
         carousel is best on commerce
     """
     ad_spec_state = ad.get_state("AdSpecState")
-    format = ad_spec_state.ad_format
+    return get_format_surface_factor(ad_spec_state.ad_format, surface)
+
+
+def get_format_surface_factor(
+    format: AdFormat,
+    surface: AppSurfaceType
+):
     if format == AdFormat.SINGLE_IMAGE:
         if surface == AppSurfaceType.CONTENT_FEED:
             return 1
@@ -133,3 +140,52 @@ def get_ad_format_surface_factor(
             return 1
     else:
         raise Exception("Invalid ad format")
+
+
+"""
+    ============== Batched Ranking Section =================
+    The same factors for an array of candidate ads, with
+    the ad side features taken from the ad table. Factors
+    that only depend on the user are taken from above.
+"""
+
+
+def get_income_savings_factors(
+    user: Agent,
+    product_prices: np.ndarray
+) -> np.ndarray:
+    user_disposable_income_state = user.get_state("DisposableIncomeState")
+    total_savings = user_disposable_income_state.disposable_income
+    # there are only a few distinct prices (one per advertiser),
+    # running them through the scalar equation keeps the factors
+    # bit for bit equal to the scalar ones
+    unique_prices, inverse = np.unique(product_prices, return_inverse=True)
+    factors = np.array(
+        [
+            _get_income_savings_factor(total_savings, product_price)
+            for product_price in unique_prices.tolist()
+        ],
+        dtype=np.float64
+    )
+    return factors[inverse]
+
+
+def get_ad_goal_factors(goal_codes: np.ndarray) -> np.ndarray:
+    event_probability_baseline = get_config().frozen.user_config\
+        .intent_config.event_probability_baseline
+    return np.where(
+        goal_codes == GOAL_CODES[AdEventType.CONVERSIONS],
+        event_probability_baseline['conversions'],
+        1.0
+    )
+
+
+def get_ad_format_surface_factors(
+    format_codes: np.ndarray,
+    surface: AppSurfaceType
+) -> np.ndarray:
+    factors = np.array(
+        [get_format_surface_factor(format, surface) for format in FORMATS],
+        dtype=np.float64
+    )
+    return factors[format_codes]
@@ -14,33 +14,85 @@
     3. The surface the ad is being displayed on
     4. Ad's category.
     5. Ads goal (conversion / impression)
+
+    Candidates are scored in a batch, with the ad side
+    features read from the columnar ad table and the
+    model noise drawn in one go. Users of the same
+    targeting segment can be scored together, as a
+    users x ads matrix. get_probability is the scalar
+    reference of the same calculation.
+
+    The factors that only change with the ads scanned
+    or with the user intent, purchases and income are
+    cached per user and surface (see RankingFactorCache).
+
+    Ads whose budget is exhausted, and in throttling
+    pacing mode the ads throttled out of the request,
+    are dropped before they are scored.
     =======================================================
 """
 
 from simulator_base.environment.environment import Environment
 from simulator_base.agent.agent import Agent
-from simulator_base.orchestrator.orchestrator import get_orchestrator
+from simulator_base.orchestrator.orchestrator import (
+    Orchestrator,
+    get_orchestrator,
+)
+from simulator_base.object_base.random_stream import RandomStream
+from simulator_base.config.frozen_config import FrozenConfig
+from simulator_base.util.timestamp import to_duration
 from ...config.market_config import get_config
 from .targeting_environment import TargetingEnvironment
+from .ranking_factor_cache import RankingFactorCache
+from .all_ads_environment import AllAdsEnvironment
+from .ad_table import (
+    AdTable,
+    CATEGORIES,
+    CATEGORY,
+    FORMAT,
+    GOAL,
+    GOAL_CODES,
+    OWNER,
+)
 from .ranking import (
     get_age_factor,
     get_gender_factor,
     get_income_savings_factor,
+    get_income_savings_factors,
     get_ad_goal_factor,
+    get_ad_goal_factors,
     get_ad_format_surface_factor,
+    get_ad_format_surface_factors,
 )
 from ..types.types import (
     AdEventType,
     AppSurfaceType,
+    PacingMode,
     TargetingFilterFields,
     TargetingFilter
 )
+from datetime import timedelta
+from typing import Optional
 import numpy as np
 
 
 class RankingEnvironment(Environment):
     def __init__(self):
         super().__init__("RankingEnvironment")
+        self._factor_cache: Optional[RankingFactorCache] = None
+        # config the factor cache was set up from
+        self._factor_cache_config: Optional[FrozenConfig] = None
+
+    @property
+    def factor_cache(self) -> Optional[RankingFactorCache]:
+        """
+            Cache of the static ranking factors, None when
+            disabled in the ranking cache config
+        """
+        config = get_config().frozen
+        if config is not self._factor_cache_config:
+            self._setup_factor_cache(config)
+        return self._factor_cache
 
     def fetch_and_rank_all_ads(
         self,
@@ -51,21 +103,297 @@ class RankingEnvironment(Environment):
             return a list of ad candidates with their
             respective "true" and "predicted" probability
         """
-        targeting_filter: TargetingFilter = {
-            TargetingFilterFields.COUNTRY: user.country,
-            TargetingFilterFields.AGE: user.age,
-            TargetingFilterFields.GENDER: user.gender,
-            TargetingFilterFields.SURFACE: surface,
-        }
+        ads, true_probabilities, predicted_probabilities = \
+            self.fetch_and_score_all_ads(user, surface)
+        return list(zip(
+            ads,
+            zip(true_probabilities.tolist(), predicted_probabilities.tolist())
+        ))
+
+    def fetch_and_score_all_ads(
+        self,
+        user: Agent,
+        surface: AppSurfaceType
+    ) -> tuple[list[Agent], np.ndarray, np.ndarray]:
+        """
+            Return the ad candidates along with arrays of
+            their "true" and "predicted" probability
+        """
+        ads, rows = self.fetch_all_ads(user, surface)
+        true_probabilities, predicted_probabilities = self.get_probabilities(
+            user,
+            ads,
+            rows,
+            self.ad_table,
+            surface
+        )
+        return ads, true_probabilities, predicted_probabilities
+
+    def fetch_all_ads(
+        self,
+        user: Agent,
+        surface: AppSurfaceType
+    ) -> tuple[list[Agent], np.ndarray]:
+        """
+            Return the ad candidates along with their
+            rows in the ad table
+        """
+        targeting_filter = self._get_targeting_filter(user, surface)
         targeting_environment: TargetingEnvironment = get_orchestrator()\
             .get_environment('TargetingEnvironment')
-        all_available_ads = targeting_environment.get_ads_with_filters(
-            targeting_filter
+        ad_table = self.ad_table
+        participating = self._draw_participation(
+            user,
+            targeting_environment.get_rows_with_filters(targeting_filter),
+            ad_table
+        )
+        return self._fetch_eligible_ads(
+            targeting_environment,
+            targeting_filter,
+            ad_table,
+            participating
         )
-        return [
-            (ad, self.get_probability(user, ad, surface))
-            for ad in all_available_ads
-        ]
+
+    @property
+    def ad_table(self) -> AdTable:
+        all_ads_environment: AllAdsEnvironment = get_orchestrator()\
+            .get_environment('AllAdsEnvironment')
+        return all_ads_environment.ad_table
+
+    def fetch_and_score_all_ads_batch(
+        self,
+        users: list[Agent],
+        surface: AppSurfaceType
+    ) -> list[tuple[list[Agent], np.ndarray, np.ndarray]]:
+        """
+            fetch_all_ads for every user along with the
+            "true" probability of the ads, users of the
+            same targeting segment are scored together as
+            a users x ads matrix. The predicted probability
+            is drawn upon the browse by predict_scored_ads,
+            as ads may run out of budget in between, or
+            right away under batch pacing (see
+            AuctionEnvironment.price_scored_ads_batch).
+        """
+        targeting_environment: TargetingEnvironment = get_orchestrator()\
+            .get_environment('TargetingEnvironment')
+        ad_table = self.ad_table
+        # segment -> targeting filter and indices of its users
+        segments: dict[tuple, tuple[TargetingFilter, list[int]]] = {}
+        for index, user in enumerate(users):
+            targeting_filter = self._get_targeting_filter(user, surface)
+            segment = targeting_environment.get_segment(targeting_filter)
+            if segment not in segments:
+                segments[segment] = (targeting_filter, [])
+            segments[segment][1].append(index)
+        results = [None] * len(users)
+        for targeting_filter, indices in segments.values():
+            segment_users = [users[index] for index in indices]
+            targeted_rows = targeting_environment.get_rows_with_filters(
+                targeting_filter
+            )
+            participations = [
+                self._draw_participation(user, targeted_rows, ad_table)
+                for user in segment_users
+            ]
+            # throttling only depends on the rows, so either
+            # every user of the segment is throttled or none
+            participating = None
+            if participations and participations[0] is not None:
+                participating = np.logical_or.reduce(participations)
+            ads, rows = self._fetch_eligible_ads(
+                targeting_environment,
+                targeting_filter,
+                ad_table,
+                participating
+            )
+            true_probabilities = self.get_true_probability_matrix(
+                segment_users,
+                ads,
+                rows,
+                ad_table,
+                surface
+            )
+            if participating is None:
+                for row, index in enumerate(indices):
+                    results[index] = (ads, rows, true_probabilities[row])
+                continue
+            positions = np.searchsorted(targeted_rows, rows)
+            for row, (index, participation) in enumerate(
+                zip(indices, participations)
+            ):
+                columns = np.flatnonzero(participation[positions])
+                results[index] = (
+                    [ads[column] for column in columns.tolist()],
+                    rows[columns],
+                    true_probabilities[row, columns]
+                )
+        return results
+
+    def predict_scored_ads(
+        self,
+        user: Agent,
+        ads: list[Agent],
+        rows: np.ndarray,
+        true_probabilities: np.ndarray
+    ) -> tuple[list[Agent], np.ndarray, np.ndarray, np.ndarray]:
+        """
+            Ads scored by fetch_and_score_all_ads_batch
+            that are still eligible, with their rows and
+            their "true" and "predicted" probability, as
+            fetch_all_ads and get_probabilities would
+            return them at this point.
+        """
+        ad_table = self.ad_table
+        if ad_table.ineligible_cnt:
+            eligible = ad_table.eligible[rows]
+            if not eligible.all():
+                indices = np.flatnonzero(eligible)
+                ads = [ads[index] for index in indices.tolist()]
+                rows = rows[indices]
+                true_probabilities = true_probabilities[indices]
+        predicted_probabilities = np.ones(len(rows), dtype=np.float64)
+        is_conversion = ad_table.get_column(GOAL)[rows] \
+            == GOAL_CODES[AdEventType.CONVERSIONS]
+        if is_conversion.any():
+            conversion_indices = np.flatnonzero(is_conversion)
+            predicted_probabilities[conversion_indices] = \
+                self._get_predicted_probabilities(
+                    true_probabilities[conversion_indices],
+                    user.random_stream
+                )
+        return ads, rows, true_probabilities, predicted_probabilities
+
+    def get_probabilities(
+        self,
+        user: Agent,
+        ads: list[Agent],
+        rows: np.ndarray,
+        ad_table: AdTable,
+        surface: AppSurfaceType
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+            get_probability for every ad, rows are the
+            rows of the ads in the ad table. Model noise
+            is drawn in the same order as the scalar path.
+        """
+        true_probabilities, predicted_probabilities = \
+            self.get_probability_matrix([user], ads, rows, ad_table, surface)
+        return true_probabilities[0], predicted_probabilities[0]
+
+    def get_probability_matrix(
+        self,
+        users: list[Agent],
+        ads: list[Agent],
+        rows: np.ndarray,
+        ad_table: AdTable,
+        surface: AppSurfaceType
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+            get_probabilities for every user as users x ads
+            matrices, every row draws its model noise from
+            the stream of its user.
+        """
+        true_probabilities = self.get_true_probability_matrix(
+            users,
+            ads,
+            rows,
+            ad_table,
+            surface
+        )
+        return true_probabilities, self.predict_probability_matrix(
+            users,
+            rows,
+            ad_table,
+            true_probabilities
+        )
+
+    def predict_probability_matrix(
+        self,
+        users: list[Agent],
+        rows: np.ndarray,
+        ad_table: AdTable,
+        true_probabilities: np.ndarray,
+        columns: Optional[list[np.ndarray]] = None
+    ) -> np.ndarray:
+        """
+            "Predicted" probability of a users x ads matrix
+            of "true" probabilities, every row draws its
+            model noise from the stream of its user. When
+            the users are not scored on every ad, columns
+            are the columns of the ads of every user, the
+            others draw no noise.
+        """
+        predicted_probabilities = np.ones(
+            (len(users), len(rows)),
+            dtype=np.float64
+        )
+        is_conversion = ad_table.get_column(GOAL)[rows] \
+            == GOAL_CODES[AdEventType.CONVERSIONS]
+        if not is_conversion.any():
+            return predicted_probabilities
+        if columns is None:
+            conversion_cnt = int(is_conversion.sum())
+            normals = np.array(
+                [
+                    user.random_stream.standard_normals(conversion_cnt)
+                    for user in users
+                ],
+                dtype=np.float64
+            )
+        else:
+            normals = np.zeros((len(users), len(rows)), dtype=np.float64)
+            for index, (user, user_columns) in enumerate(
+                zip(users, columns)
+            ):
+                conversion_columns = user_columns[
+                    is_conversion[user_columns]
+                ]
+                normals[index, conversion_columns] = \
+                    user.random_stream.standard_normals(
+                        len(conversion_columns)
+                    )
+            normals = normals[:, is_conversion]
+        conversion_indices = np.flatnonzero(is_conversion)
+        predicted_probabilities[:, conversion_indices] = \
+            self._apply_model_noise(
+                true_probabilities[:, conversion_indices],
+                normals
+            )
+        return predicted_probabilities
+
+    def get_true_probability_matrix(
+        self,
+        users: list[Agent],
+        ads: list[Agent],
+        rows: np.ndarray,
+        ad_table: AdTable,
+        surface: AppSurfaceType
+    ) -> np.ndarray:
+        """
+            "True" probability of every user on every ad
+            as a users x ads matrix, no noise is drawn.
+        """
+        true_probabilities = np.ones(
+            (len(users), len(rows)),
+            dtype=np.float64
+        )
+        is_conversion = ad_table.get_column(GOAL)[rows] \
+            == GOAL_CODES[AdEventType.CONVERSIONS]
+        # if impression is delivered it will 100% be seen
+        if not is_conversion.any():
+            return true_probabilities
+        conversion_indices = np.flatnonzero(is_conversion)
+        conversion_ads = [ads[index] for index in conversion_indices.tolist()]
+        true_probabilities[:, conversion_indices] = \
+            self._get_true_probability_matrix(
+                users,
+                conversion_ads,
+                rows[conversion_indices],
+                ad_table,
+                surface
+            )
+        return true_probabilities
 
     def get_probability(
         self,
@@ -86,27 +414,279 @@ class RankingEnvironment(Environment):
             return 1, 1
         true_probability = self._get_true_probability(user, ad, surface)
         predicted_probability = self._get_predicted_probability(
-            true_probability
+            true_probability,
+            user.random_stream
         )
         return true_probability, predicted_probability
 
     def _get_predicted_probability(
         self,
         true_probability: float,
+        random_stream: RandomStream,
     ) -> float:
         """
             Apply gaussian noise to the true probability
             to simulate the predicted probability where
-            model can be inaccurate
+            model can be inaccurate, noise is drawn
+            from the stream of the user
         """
-        delivery_config = get_config().get_delivery_config()
-        model_config = delivery_config['model_config']
-        model_noise_factor = model_config['model_noise_factor']
+        model_noise_factor = get_config().frozen.delivery_config\
+            .model_config.model_noise_factor
         noise_std = true_probability * model_noise_factor
-        return max(min(true_probability + np.random.normal(
+        return max(min(true_probability + random_stream.normal(
             0, noise_std
         ), 1), 0)
 
+    def _get_targeting_filter(
+        self,
+        user: Agent,
+        surface: AppSurfaceType
+    ) -> TargetingFilter:
+        return {
+            TargetingFilterFields.COUNTRY: user.country,
+            TargetingFilterFields.AGE: user.age,
+            TargetingFilterFields.GENDER: user.gender,
+            TargetingFilterFields.SURFACE: surface,
+        }
+
+    def _draw_participation(
+        self,
+        user: Agent,
+        rows: np.ndarray,
+        ad_table: AdTable
+    ) -> Optional[np.ndarray]:
+        """
+            In throttling pacing mode, whether the ads of
+            the targeted rows take part in the request of
+            the user, drawn from the stream of the user.
+            None when every ad takes part.
+
+            Draws are made for every targeted ad, including
+            those whose budget is exhausted, so the stream
+            of the user does not move with the eligibility
+            of the ads.
+        """
+        pacing_mode = get_config().frozen.delivery_config\
+            .pacing_config.pacing_mode
+        if pacing_mode != PacingMode.THROTTLING:
+            return None
+        probabilities = ad_table.participation_probabilities[rows]
+        if (probabilities >= 1).all():
+            return None
+        return user.random_stream.randoms(len(rows)) < probabilities
+
+    def _fetch_eligible_ads(
+        self,
+        targeting_environment: TargetingEnvironment,
+        targeting_filter: TargetingFilter,
+        ad_table: AdTable,
+        participating: Optional[np.ndarray] = None
+    ) -> tuple[list[Agent], np.ndarray]:
+        """
+            Targeted ads and their rows, without the ads
+            whose budget is exhausted and, when given, the
+            ads not participating in the request
+        """
+        rows = targeting_environment.get_rows_with_filters(targeting_filter)
+        if participating is not None:
+            rows = ad_table.get_eligible_rows(rows[participating])
+            return ad_table.get_ads(rows), rows
+        eligible_rows = ad_table.get_eligible_rows(rows)
+        if len(eligible_rows) < len(rows):
+            return ad_table.get_ads(eligible_rows), eligible_rows
+        ads = targeting_environment.get_ads_with_filters(targeting_filter)
+        return ads, rows
+
+    def _get_predicted_probabilities(
+        self,
+        true_probabilities: np.ndarray,
+        random_stream: RandomStream,
+    ) -> np.ndarray:
+        return self._apply_model_noise(
+            true_probabilities,
+            random_stream.standard_normals(len(true_probabilities))
+        )
+
+    def _apply_model_noise(
+        self,
+        true_probabilities: np.ndarray,
+        normals: np.ndarray,
+    ) -> np.ndarray:
+        model_noise_factor = get_config().frozen.delivery_config\
+            .model_config.model_noise_factor
+        noise_std = true_probabilities * model_noise_factor
+        noise = noise_std * normals
+        return np.maximum(np.minimum(true_probabilities + noise, 1), 0)
+
+    def _get_true_probability_matrix(
+        self,
+        users: list[Agent],
+        ads: list[Agent],
+        rows: np.ndarray,
+        ad_table: AdTable,
+        surface: AppSurfaceType
+    ) -> np.ndarray:
+        """
+            _get_true_probability for every user and
+            conversion ad, factors are multiplied in
+            the same order
+        """
+        owner_codes = ad_table.get_column(OWNER)[rows]
+        static_factors = np.empty((len(users), len(rows)), dtype=np.float64)
+        ad_view_history_factors = np.empty_like(static_factors)
+        factor_cache = self.factor_cache
+        current_time = Orchestrator.get_current_timestamp()
+        for index, user in enumerate(users):
+            factors = None
+            if factor_cache is not None:
+                factors = self._get_cached_static_factors(
+                    factor_cache,
+                    user,
+                    rows,
+                    ad_table,
+                    surface,
+                    current_time
+                )
+            if factors is None:
+                factors = self._get_static_factors(
+                    user,
+                    rows,
+                    ad_table,
+                    surface
+                )
+            static_factors[index] = factors
+            ad_view_history_factors[index] = user.get_state(
+                'UserAdViewHistoryState'
+            ).get_ad_view_history_factors(
+                ads,
+                owner_codes,
+                ad_table.owner_ids
+            )
+        calibration_factors = self._get_calibration_factors(ads)
+        return (
+            static_factors
+            * ad_view_history_factors
+            * calibration_factors
+        )
+
+    def _get_static_factors(
+        self,
+        user: Agent,
+        rows: np.ndarray,
+        ad_table: AdTable,
+        surface: AppSurfaceType
+    ) -> np.ndarray:
+        """
+            Factors of the "true" probability of the user
+            on the conversion ads of the rows that do not
+            change between browses
+        """
+        return (
+            self._get_category_intents(user)[
+                ad_table.get_column(CATEGORY)[rows]
+            ]
+            * get_age_factor(user)
+            * get_gender_factor(user)
+            * get_income_savings_factors(user, ad_table.prices[rows])
+            * get_ad_goal_factors(ad_table.get_column(GOAL)[rows])
+            * get_ad_format_surface_factors(
+                ad_table.get_column(FORMAT)[rows],
+                surface
+            )
+        )
+
+    def _get_cached_static_factors(
+        self,
+        factor_cache: RankingFactorCache,
+        user: Agent,
+        rows: np.ndarray,
+        ad_table: AdTable,
+        surface: AppSurfaceType,
+        current_time: int
+    ) -> Optional[np.ndarray]:
+        """
+            _get_static_factors of the rows out of the
+            factor cache. Upon a miss the factors of every
+            conversion ad targeted to the user are cached,
+            before the ads are throttled out or run out of
+            budget. None if the rows are not targeted.
+        """
+        key = (user.id, surface)
+        token = self._get_factor_cache_token(user, ad_table)
+        factors = factor_cache.get(key, token, rows, current_time)
+        if factors is not None:
+            return factors
+        targeting_environment: TargetingEnvironment = get_orchestrator()\
+            .get_environment('TargetingEnvironment')
+        targeted_rows = targeting_environment.get_rows_with_filters(
+            self._get_targeting_filter(user, surface)
+        )
+        targeted_rows = targeted_rows[
+            ad_table.get_column(GOAL)[targeted_rows]
+            == GOAL_CODES[AdEventType.CONVERSIONS]
+        ]
+        targeted_factors = self._get_static_factors(
+            user,
+            targeted_rows,
+            ad_table,
+            surface
+        )
+        factor_cache.put(
+            key,
+            token,
+            targeted_rows,
+            current_time,
+            targeted_factors
+        )
+        return RankingFactorCache.select(targeted_rows, targeted_factors, rows)
+
+    def _get_factor_cache_token(self, user: Agent, ad_table: AdTable) -> tuple:
+        """
+            Cached factors hold until the ads are scanned
+            again, the user states they depend on change or
+            the user gets a year older
+        """
+        return (
+            ad_table.version,
+            user.age,
+            user.get_state('UserIntentState').version,
+            user.get_state('PurchasesState').version,
+            user.get_state('DisposableIncomeState').version,
+        )
+
+    def _get_category_intents(self, user: Agent) -> np.ndarray:
+        """
+            Intent of the user for every category
+        """
+        user_intent_state = user.get_state('UserIntentState')
+        return np.array(
+            [
+                user_intent_state.get_intent(category)
+                for category in CATEGORIES
+            ],
+            dtype=np.float64
+        )
+
+    def _get_calibration_factors(self, ads: list[Agent]) -> np.ndarray:
+        calibration_factor = 1
+        env_over_calibration_effect = self.get_effect('OverCalibrationEffect')
+        if env_over_calibration_effect \
+           and env_over_calibration_effect.can_apply():
+            calibration_factor = (
+                calibration_factor +
+                env_over_calibration_effect.over_calibration
+            )
+        # effects come and go at any time, they are
+        # looked up on the ads themselves
+        ad_over_calibrations = np.zeros(len(ads), dtype=np.float64)
+        for index, ad in enumerate(ads):
+            ad_over_calibration_effect = ad.get_effect('OverCalibrationEffect')
+            if ad_over_calibration_effect \
+               and ad_over_calibration_effect.can_apply():
+                ad_over_calibrations[index] = \
+                    ad_over_calibration_effect.over_calibration
+        return calibration_factor + ad_over_calibrations
+
     def _get_true_probability(
         self,
         user: Agent,
@@ -161,3 +741,24 @@ class RankingEnvironment(Environment):
             * ad_view_history_factor
             * calibration_factor
         )
+
+    def _setup_factor_cache(self, config: FrozenConfig):
+        cache_config = config.delivery_config.ranking_cache_config
+        self._factor_cache_config = config
+        if not cache_config.enabled:
+            self._factor_cache = None
+            return
+        self._factor_cache = RankingFactorCache(
+            cache_config.max_entries,
+            to_duration(timedelta(minutes=cache_config.ttl)),
+            cache_config.track_stats
+        )
+
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # cached factors are computed again upon loading
+        state = super().__getstate__()
+        state["_factor_cache"] = None
+        state["_factor_cache_config"] = None
+        return state
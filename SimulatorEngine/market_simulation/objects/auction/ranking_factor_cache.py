@@ -0,0 +1,151 @@
+"""
+    ============== Ranking Factor Cache ================
+    Least recently used cache of the static part of the
+    "true" probability of a user on the ads of a surface
+    (category intent, age, gender, income savings, goal
+    and format factors), so that only the view history
+    and calibration factors are computed on every browse.
+
+    Entries hold the factors of every conversion ad
+    targeted to the user on the surface, so that the
+    rows of any request, whichever ads are throttled
+    out or run out of budget, are looked up from them.
+    They are only valid for the token
+    they were stored with (versions of the ad table and
+    of the user states the factors depend upon) and for
+    a limited time.
+    ====================================================
+"""
+
+from collections import OrderedDict
+from typing import Hashable, Optional
+import numpy as np
+
+
+class RankingFactorCache:
+    def __init__(self, max_entries: int, ttl: int, track_stats: bool = True):
+        """
+            max_entries is the number of (user, surface)
+            entries kept, ttl in microseconds
+        """
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._track_stats = track_stats
+        # (user id, surface) -> token, expiry, rows, factors
+        self._entries: OrderedDict[
+            tuple, tuple[Hashable, int, np.ndarray, np.ndarray]
+        ] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ============= System Accessible Public Methods ==============
+
+    def get(
+        self,
+        key: tuple,
+        token: Hashable,
+        rows: np.ndarray,
+        current_time: int
+    ) -> Optional[np.ndarray]:
+        """
+            Factors of the given rows, None if the entry
+            is missing, stale or does not cover the rows
+        """
+        factors = self._lookup(key, token, rows, current_time)
+        if self._track_stats:
+            if factors is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return factors
+
+    def put(
+        self,
+        key: tuple,
+        token: Hashable,
+        rows: np.ndarray,
+        current_time: int,
+        factors: np.ndarray
+    ):
+        """
+            Store the factors of the rows, replacing the
+            entry of the key
+        """
+        self._entries[key] = (token, current_time + self._ttl, rows, factors)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            if self._track_stats:
+                self._evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    @staticmethod
+    def select(
+        entry_rows: np.ndarray,
+        factors: np.ndarray,
+        rows: np.ndarray
+    ) -> Optional[np.ndarray]:
+        """
+            Factors of the rows out of the factors of the
+            entry rows, None if the rows are not a subset.
+            Both are in ascending order.
+        """
+        if rows is entry_rows or np.array_equal(rows, entry_rows):
+            return factors
+        positions = np.searchsorted(entry_rows, rows)
+        if (positions >= len(entry_rows)).any():
+            return None
+        if not np.array_equal(entry_rows[positions], rows):
+            return None
+        return factors[positions]
+
+    # ============= Private Helper Methods =============
+
+    def _lookup(
+        self,
+        key: tuple,
+        token: Hashable,
+        rows: np.ndarray,
+        current_time: int
+    ) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not self._is_valid(entry, token, current_time):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        _, _, entry_rows, factors = entry
+        return self.select(entry_rows, factors, rows)
+
+    def _is_valid(
+        self,
+        entry: tuple,
+        token: Hashable,
+        current_time: int
+    ) -> bool:
+        entry_token, expiry, _, _ = entry
+        return entry_token == token and current_time < expiry
@@ -9,43 +9,110 @@
     User side would send a request for ads with
     information such as country, age, gender and surface,
     the goal of the targeting filter stage is to find
-    all available ads that meets the user's criteria.
+    all available ads that meets the user's criteria,
+    which is matched against the columnar ad table of
+    the all ads environment.
+
+    Since the result only depends on that segment and
+    the active ads only change upon a scan, results
+    are cached per segment until the ad table moves
+    on to a new version.
     =====================================================
 """
 
 from simulator_base.environment.environment import Environment
 from simulator_base.orchestrator.orchestrator import get_orchestrator
-from simulator_base.object_base.object_base import ObjectBase
+from simulator_base.agent.agent import Agent
 from .all_ads_environment import AllAdsEnvironment
-from ..types.types import TargetingFilter
+from ..types.types import TargetingFilter, TargetingFilterFields
+from typing import Optional
+import numpy as np
 
 
 class TargetingEnvironment(Environment):
     def __init__(self):
         super().__init__("TargetingEnvironment")
+        self._setup_cache()
+
+    @property
+    def cache_hits(self) -> int:
+        return self._cache_hits
+
+    @property
+    def cache_misses(self) -> int:
+        return self._cache_misses
 
     def get_ads_with_filters(
         self,
         filters: TargetingFilter
-    ):
+    ) -> list[Agent]:
         """
-            Get all ads that meets the user's criteria
+            Get all ads that meets the user's criteria,
+            the returned list is shared by every request
+            of the segment and must not be modified
         """
-        all_ads_environment: AllAdsEnvironment = (
-            get_orchestrator().get_environment('AllAdsEnvironment')
-        )
-        all_ads = all_ads_environment.active_ads
-        return [
-            ad for ad in all_ads
-            if self._ad_meets_filters(ad, filters)
-        ]
+        return self._get_targeting_result(filters)[1]
 
-    def _ad_meets_filters(
+    def get_rows_with_filters(
         self,
-        ad: ObjectBase,
         filters: TargetingFilter
-    ):
+    ) -> np.ndarray:
+        """
+            Same as get_ads_with_filters, but returns the
+            rows of the ads in the ad table
         """
-            Check if the ad meets the user's criteria
+        return self._get_targeting_result(filters)[0]
+
+    @staticmethod
+    def get_segment(filters: TargetingFilter) -> tuple:
         """
-        return ad.matches_target(filters)
+            Requests of the same segment are given the
+            same ads
+        """
+        return (
+            filters[TargetingFilterFields.COUNTRY],
+            filters[TargetingFilterFields.AGE],
+            filters[TargetingFilterFields.GENDER],
+            filters[TargetingFilterFields.SURFACE],
+        )
+
+    # ============= Private Helper Methods =============
+
+    def _get_targeting_result(
+        self,
+        filters: TargetingFilter
+    ) -> tuple[np.ndarray, list[Agent]]:
+        all_ads_environment: AllAdsEnvironment = (
+            get_orchestrator().get_environment('AllAdsEnvironment')
+        )
+        ad_table = all_ads_environment.ad_table
+        if ad_table.version != self._cache_version:
+            self._cache.clear()
+            self._cache_version = ad_table.version
+        segment = self.get_segment(filters)
+        result = self._cache.get(segment)
+        if result is None:
+            self._cache_misses += 1
+            rows = ad_table.get_matching_rows(filters)
+            result = (rows, ad_table.get_ads(rows))
+            self._cache[segment] = result
+        else:
+            self._cache_hits += 1
+        return result
+
+    def _setup_cache(self):
+        # (country, age, gender, surface) -> rows and matching ads
+        self._cache: dict[tuple, tuple[np.ndarray, list[Agent]]] = {}
+        # version of the ad table the cache was filled from
+        self._cache_version: Optional[int] = None
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # cached results are refilled upon loading
+        state = super().__getstate__()
+        state["_cache"] = {}
+        state["_cache_version"] = None
+        return state
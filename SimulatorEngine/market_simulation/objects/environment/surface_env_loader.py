@@ -10,6 +10,7 @@ from market_simulation.objects.environment.surface_environment import (
 )
 from market_simulation.objects.analytics.surface_metrics import SurfaceMetrics
 from market_simulation.config.market_config import get_config
+from datetime import timedelta
 from typing import List
 
 
@@ -25,11 +26,13 @@ def load_surface_env(
     enabled_surfaces = env_config['enabled_surfaces']
     ad_load = env_config['per_surface_ad_load']
     ad_fetch_cnt = env_config['per_surface_fetch_cnt']
+    retention = timedelta(days=env_config['surface_retention_days'])
     for surface in enabled_surfaces:
         new_surface = SurfaceEnvironment(
             surface,
             ad_load[surface],
-            ad_fetch_cnt[surface]
+            ad_fetch_cnt[surface],
+            retention
         )
         surface_metrics = SurfaceMetrics()
         surface_metrics.attach(new_surface)
@@ -2,6 +2,10 @@
     ================ Surface Environment =================
     Surface environment, contains basic information around
     the surface type, the ad load on the surface and etc.
+
+    Impressions and outcomes on the surface are kept as
+    offsets into the ad event log. Impressions, outcomes
+    and visits are kept for the retention of the surface.
     =====================================================
 """
 
@@ -9,25 +13,33 @@ from simulator_base.environment.environment import Environment
 from simulator_base.orchestrator.orchestrator import (
     get_orchestrator
 )
+from simulator_base.util.timestamp import to_duration
+from simulator_base.util.rolling_buffer import RollingBuffer
 from simulator_base.agent.agent import Agent
 from market_simulation.objects.auction.auction_environment import (
-    AuctionEnvironment
+    AuctionEnvironment,
+    PricedAds,
+)
+from market_simulation.objects.auction.ranking_environment import (
+    RankingEnvironment
 )
+from market_simulation.objects.auction.ad_event_log import get_ad_event_log
 from ..types.types import (
     AppSurfaceType,
-    AdEventList,
-    AdEventFields,
     AuctionResults,
     AuctionResultFields,
     AdEventType,
     OrganicEventType,
     OrganicEventFields,
     OrganicEvent,
-    OrganicEventList
 )
-from datetime import timedelta, datetime
-from copy import deepcopy
-from random import random
+from datetime import timedelta
+from typing import Optional
+import numpy as np
+
+# ad candidates with their rows in the ad table
+# and their "true" probabilities
+ScoredAds = tuple[list[Agent], np.ndarray, np.ndarray]
 
 
 class SurfaceEnvironment(Environment):
@@ -36,28 +48,30 @@ class SurfaceEnvironment(Environment):
         surface_type: AppSurfaceType,
         ad_load: float,  # Impressions Per Seconds
         fetch_cnt: int = 0,
+        retention: timedelta = timedelta(days=7),
     ):
         super().__init__("SurfaceEnvironment")
         self._surface_type = surface_type
         # this is described as number of ads viewed
         # per second on the surface
         self._ad_load = ad_load
-        self._impressions: AdEventList = []
-        self._outcomes: AdEventList = []
-        self._visits: OrganicEventList = []
+        # offsets of the events in the ad event log
+        self._impressions = RollingBuffer(retention, np.int64)
+        self._outcomes = RollingBuffer(retention, np.int64)
+        self._visits = RollingBuffer(retention)
         self._fetch_cnt = fetch_cnt
         self.simulation_interval = timedelta(hours=12)
 
     @property
-    def visits(self) -> OrganicEventList:
+    def visits(self) -> RollingBuffer:
         return self._visits
 
     @property
-    def impressions(self) -> AdEventList:
+    def impressions(self) -> RollingBuffer:
         return self._impressions
 
     @property
-    def outcomes(self) -> AdEventList:
+    def outcomes(self) -> RollingBuffer:
         return self._outcomes
 
     @property
@@ -70,147 +84,207 @@ class SurfaceEnvironment(Environment):
     ) -> float:
         return 0.95 ** position
 
+    @property
+    def is_surface_down(self) -> bool:
+        surface_down_effect = self.get_effect('SurfaceDownEffect')
+        return bool(
+            surface_down_effect
+            and surface_down_effect.can_apply()
+            and surface_down_effect.is_surface_down
+        )
+
+    def score_browses(
+        self,
+        users: list[Agent]
+    ) -> list[Optional[ScoredAds]]:
+        """
+            Score the ad candidates of every user about to
+            browse the surface in one batch, to be passed
+            on to browse_surface in the same tick. Nothing
+            is scored while the surface is down.
+        """
+        if self.is_surface_down:
+            return [None] * len(users)
+        ranking_environment: RankingEnvironment = get_orchestrator() \
+            .get_environment('RankingEnvironment')
+        return ranking_environment.fetch_and_score_all_ads_batch(
+            users,
+            self._surface_type
+        )
+
+    def price_browses(
+        self,
+        users: list[Agent],
+        scored_ads: list[Optional[ScoredAds]]
+    ) -> list[Optional[PricedAds]]:
+        """
+            Under batch pacing, run the auctions of the
+            users scored by score_browses in one batch as
+            well. Otherwise every bid moves the pacing of
+            the ads, and the auctions are run one by one
+            upon the browse.
+        """
+        auction_environment: AuctionEnvironment = get_orchestrator() \
+            .get_environment('AuctionEnvironment')
+        priced_ads = [None] * len(users)
+        if not auction_environment.batch_pacing:
+            return priced_ads
+        indices = [
+            index for index, scored in enumerate(scored_ads)
+            if scored is not None
+        ]
+        for index, priced in zip(
+            indices,
+            auction_environment.price_scored_ads_batch(
+                [users[index] for index in indices],
+                [scored_ads[index] for index in indices],
+                ad_cnt=self._fetch_cnt
+            )
+        ):
+            priced_ads[index] = priced
+        return priced_ads
+
     def browse_surface(
         self,
         user: Agent,
-        time: timedelta
+        time: timedelta,
+        scored_ads: Optional[ScoredAds] = None,
+        priced_ads: Optional[PricedAds] = None
     ):
         orchestrator = get_orchestrator()
-        user_time = orchestrator.get_current_time(user)
+        user_time = orchestrator.get_current_timestamp()
         organic_event: OrganicEvent = {
             OrganicEventFields.USER: user,
             OrganicEventFields.EVENT_TYPE: OrganicEventType.SURFACE_ENTER,
             OrganicEventFields.SURFACE: self._surface_type,
             OrganicEventFields.EVENT_TIME: user_time
         }
-        self._visits.append(organic_event)
-        surface_down_effect = self.get_effect('SurfaceDownEffect')
-        if surface_down_effect \
-           and surface_down_effect.can_apply() \
-           and surface_down_effect.is_surface_down:
+        self._visits.append(user_time, organic_event)
+        if self.is_surface_down:
             return
         total_impressions = int(self._ad_load * time.total_seconds())
         auction_environment: AuctionEnvironment = orchestrator.get_environment(
             'AuctionEnvironment'
         )
-        ranked_ads = auction_environment.fetch_and_price_all_ads(
-            user,
-            self._surface_type,
-            ad_cnt=self._fetch_cnt
-        )
+        ranked_ads = None
+        if priced_ads is not None:
+            # None if the bids changed since the batch
+            ranked_ads = auction_environment.get_priced_ads(user, priced_ads)
+        if ranked_ads is None and scored_ads is None:
+            ranked_ads = auction_environment.fetch_and_price_all_ads(
+                user,
+                self._surface_type,
+                ad_cnt=self._fetch_cnt
+            )
+        elif ranked_ads is None:
+            ranking_environment: RankingEnvironment = orchestrator \
+                .get_environment('RankingEnvironment')
+            ranked_ads = auction_environment.price_scored_ads(
+                *ranking_environment.predict_scored_ads(user, *scored_ads),
+                ad_cnt=self._fetch_cnt
+            )
         viewed_ads = ranked_ads[:total_impressions]
-        event_base: AdEventList = {
-            AdEventFields.USER: None,
-            AdEventFields.AD: None,
-            AdEventFields.EVENT_TYPE: None,
-            AdEventFields.SURFACE: self._surface_type,
-            AdEventFields.BID: None,
-            AdEventFields.COST: None,
-            AdEventFields.TRUE_PROBABILITY: None,
-            AdEventFields.PREDICTED_PROBABILITY: None,
-            AdEventFields.EVENT_TIME: None
-        }
-        self.view_ads(user, event_base, viewed_ads, user_time, time)
-        self.convert(user, event_base, viewed_ads, user_time, time)
+        self.view_ads(user, viewed_ads, user_time, time)
+        self.convert(user, viewed_ads, user_time, time)
 
     def view_ads(
         self,
         user: Agent,
-        event_base: AdEventList,
         ranked_ads: AuctionResults,
-        start_time: datetime,
+        start_time: int,
         duration: timedelta
-    ) -> float:
+    ):
         if len(ranked_ads) == 0:
             return
         individual_interval_float = duration.total_seconds() / len(ranked_ads)
-        individual_interval_timedelta = timedelta(
-            seconds=individual_interval_float
+        individual_interval = to_duration(
+            timedelta(seconds=individual_interval_float)
         )
-        for index, item in enumerate(ranked_ads):
-            event = deepcopy(event_base)
-            event[AdEventFields.USER] = user
-            event[AdEventFields.AD] = item[AuctionResultFields.AD]
-            event[AdEventFields.EVENT_TYPE] = AdEventType.IMPRESSIONS
-            event[AdEventFields.BID] = item[AuctionResultFields.BID]
-            event[AdEventFields.PACED_BID] = item[
-                AuctionResultFields.PACED_BID
-            ]
-            event[AdEventFields.PRICE] = item[AuctionResultFields.PRICE]
-            event[AdEventFields.COST] = 0
-            event[AdEventFields.TRUE_PROBABILITY] = item[
-                AuctionResultFields.TRUE_PROBABILITY]
-            event[AdEventFields.PREDICTED_PROBABILITY] = item[
-                AuctionResultFields.PREDICTED_PROBABILITY
-            ]
-            event[AdEventFields.EVENT_TIME] = start_time + index * \
-                individual_interval_timedelta
-            cost = item[AuctionResultFields.AD].apply_event(event)
-            event[AdEventFields.COST] = cost
-            self._impressions.append(event)
-            user.view_ad(event)
+        event_log = get_ad_event_log()
+        ads = ranked_ads[AuctionResultFields.AD].tolist()
+        bids = ranked_ads[AuctionResultFields.BID].tolist()
+        paced_bids = ranked_ads[AuctionResultFields.PACED_BID].tolist()
+        prices = ranked_ads[AuctionResultFields.PRICE].tolist()
+        true_probabilities = ranked_ads[
+            AuctionResultFields.TRUE_PROBABILITY
+        ].tolist()
+        predicted_probabilities = ranked_ads[
+            AuctionResultFields.PREDICTED_PROBABILITY
+        ].tolist()
+        for index, ad in enumerate(ads):
+            event_time = start_time + index * individual_interval
+            offset = event_log.append(
+                user,
+                ad,
+                AdEventType.IMPRESSIONS,
+                self._surface_type,
+                bids[index],
+                prices[index],
+                paced_bids[index],
+                true_probabilities[index],
+                predicted_probabilities[index],
+                event_time
+            )
+            ad.apply_event(offset)
+            self._impressions.append(event_time, offset)
+            user.view_ad(offset)
 
     def convert(
         self,
         user: Agent,
-        event_base: AdEventList,
         ranked_ads: AuctionResults,
-        start_time: datetime,
+        start_time: int,
         duration: timedelta
     ):
         if len(ranked_ads) == 0:
             return
         individual_interval_float = duration.total_seconds() / len(ranked_ads)
-        individual_interval_timedelta = timedelta(
-            seconds=individual_interval_float
+        individual_interval = to_duration(
+            timedelta(seconds=individual_interval_float)
         )
-        for index, item in enumerate(ranked_ads):
-            if item[AuctionResultFields.AD].ad_goal == AdEventType.IMPRESSIONS:
+        event_log = get_ad_event_log()
+        ads = ranked_ads[AuctionResultFields.AD].tolist()
+        bids = ranked_ads[AuctionResultFields.BID].tolist()
+        paced_bids = ranked_ads[AuctionResultFields.PACED_BID].tolist()
+        prices = ranked_ads[AuctionResultFields.PRICE].tolist()
+        true_probabilities = ranked_ads[
+            AuctionResultFields.TRUE_PROBABILITY
+        ].tolist()
+        predicted_probabilities = ranked_ads[
+            AuctionResultFields.PREDICTED_PROBABILITY
+        ].tolist()
+        for index, ad in enumerate(ads):
+            if ad.ad_goal == AdEventType.IMPRESSIONS:
                 continue
-            event = deepcopy(event_base)
-            event[AdEventFields.USER] = user
-            event[AdEventFields.AD] = item[AuctionResultFields.AD]
-            event[AdEventFields.EVENT_TYPE] = AdEventType.CONVERSIONS
-            event[AdEventFields.BID] = item[AuctionResultFields.BID]
-            event[AdEventFields.PRICE] = item[AuctionResultFields.PRICE]
-            event[AdEventFields.COST] = 0
-            event[AdEventFields.PACED_BID] = item[
-                AuctionResultFields.PACED_BID
-            ]
-            event[AdEventFields.TRUE_PROBABILITY] = item[
-                AuctionResultFields.TRUE_PROBABILITY]
-            event[AdEventFields.PREDICTED_PROBABILITY] = item[
-                AuctionResultFields.PREDICTED_PROBABILITY
-            ]
-            event[AdEventFields.EVENT_TIME] = start_time + index * \
-                individual_interval_timedelta
-
             # simulate the conversion
-            success = random() < item[AuctionResultFields.TRUE_PROBABILITY]
+            success = user.random_stream.random() < true_probabilities[index]
             if success:
-                user.convert_ad(event)
-                self._outcomes.append(event)
-                item[AuctionResultFields.AD].apply_event(event)
+                event_time = start_time + index * individual_interval
+                offset = event_log.append(
+                    user,
+                    ad,
+                    AdEventType.CONVERSIONS,
+                    self._surface_type,
+                    bids[index],
+                    prices[index],
+                    paced_bids[index],
+                    true_probabilities[index],
+                    predicted_probabilities[index],
+                    event_time
+                )
+                user.convert_ad(offset)
+                self._outcomes.append(event_time, offset)
+                ad.apply_event(offset)
 
     def simulate(self):
         """
-            Remove impressions and outcomes that are older than
-            7 days.
+            Remove impressions, outcomes and visits that are
+            older than the retention.
         """
-        today = get_orchestrator().get_current_time(self)
-        # from front to back
-        while self._impressions and \
-                (today - self._impressions[0][AdEventFields.EVENT_TIME]) > \
-                timedelta(days=7):
-            self._impressions.pop(0)
-        while self._outcomes and \
-                (today - self._outcomes[0][AdEventFields.EVENT_TIME]) > \
-                timedelta(days=7):
-            self._outcomes.pop(0)
-        while self._visits and \
-                (today - self._visits[0][OrganicEventFields.EVENT_TIME]) > \
-                timedelta(days=7):
-            self._visits.pop(0)
+        today = get_orchestrator().get_current_timestamp()
+        self._impressions.expire(today)
+        self._outcomes.expire(today)
+        self._visits.expire(today)
 
     @property
     def ad_load(self):
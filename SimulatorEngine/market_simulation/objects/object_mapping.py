@@ -43,6 +43,9 @@ from market_simulation.objects.state.ad_outcome_state import AdOutcomeState
 from market_simulation.objects.state.all_active_ads_state import (
     AllActiveAdsState
 )
+from market_simulation.objects.state.all_ads_pacing_state import (
+    AllAdsPacingState
+)
 from market_simulation.objects.effect.over_calibration.\
     over_calibration_effect import OverCalibrationEffect
 from market_simulation.objects.effect.surface_down.surface_down_effect import (
@@ -54,6 +57,9 @@ from market_simulation.objects.person.advertiser import Advertiser
 from market_simulation.objects.person.user import User
 from market_simulation.objects.analytics.ad_metrics import AdMetrics
 from market_simulation.objects.analytics.surface_metrics import SurfaceMetrics
+from market_simulation.objects.analytics.ranking_cache_metrics import (
+    RankingCacheMetrics,
+)
 from market_simulation.objects.environment.surface_environment import (
     SurfaceEnvironment,
 )
@@ -129,6 +135,8 @@ def get_mapped_obj_cls(
                 return AdOutcomeState
             case ObjectSubType.ALL_ACTIVE_ADS_STATE:
                 return AllActiveAdsState
+            case ObjectSubType.ALL_ADS_PACING_STATE:
+                return AllAdsPacingState
             case ObjectSubType.OVER_CALIBRATION_EFFECT:
                 return OverCalibrationEffect
             case ObjectSubType.SURFACE_DOWN_EFFECT:
@@ -145,6 +153,8 @@ def get_mapped_obj_cls(
                 return AdMetrics
             case ObjectSubType.SURFACE_METRICS:
                 return SurfaceMetrics
+            case ObjectSubType.RANKING_CACHE_METRICS:
+                return RankingCacheMetrics
             case ObjectSubType.SURFACE_ENVIRONMENT:
                 return SurfaceEnvironment
             case ObjectSubType.ALL_ADS_ENVIRONMENT:
@@ -9,6 +9,10 @@
     performance improvement via increasing ads
     budget, and periodically adds money to his / her
     account to track newer ad.
+
+    The budget utilized by the active ads and the
+    number of active ads per goal are kept up to
+    date as ads are appended and removed.
     ================================================
 """
 
@@ -23,6 +27,9 @@ from typing import List
 class Advertiser(Person):
     def __init__(self):
         super().__init__("Advertiser")
+        # sum of the daily budgets of the active ads
+        self._utilized_budget = 0
+        self._active_ad_cnt_by_goal: dict[AdEventType, int] = {}
 
     @property
     def active_ads(self) -> List[Ad]:
@@ -36,17 +43,28 @@ class Advertiser(Person):
     def active_ad_cnt(self) -> int:
         return len(self.active_ads)
 
+    def get_active_ad_cnt(self, goal: AdEventType) -> int:
+        return self._active_ad_cnt_by_goal.get(goal, 0)
+
     def has_active_ad_outcome(self, event_type: AdEventType) -> bool:
-        return any([
-            ad.get_state('AdOutcomeState').goal == event_type
-            for ad in self.active_ads
-        ])
+        return self.get_active_ad_cnt(event_type) > 0
 
     def append_ad(self, ad: Ad):
         self.active_ads.append(ad)
+        self._utilized_budget += ad.get_state('AdBudgetState').daily_budget
+        self._active_ad_cnt_by_goal[ad.ad_goal] = \
+            self.get_active_ad_cnt(ad.ad_goal) + 1
 
     def remove_ad(self, ad: Ad):
         self.active_ads.remove(ad)
+        if self.active_ads:
+            self._utilized_budget -= \
+                ad.get_state('AdBudgetState').daily_budget
+        else:
+            # no rounding error is left over once the last
+            # active ad is gone
+            self._utilized_budget = 0
+        self._active_ad_cnt_by_goal[ad.ad_goal] -= 1
 
     def append_inactive_ad(self, ad: Ad):
         self.inactive_ads.append(ad)
@@ -60,10 +78,7 @@ class Advertiser(Person):
 
     @property
     def utilized_budget(self) -> float:
-        ads = self.active_ads
-        return sum([
-            ad.get_state('AdBudgetState').daily_budget for ad in ads
-        ])
+        return self._utilized_budget
 
     def ads_after_date(self, date: datetime) -> List[Ad]:
         all_ads = self.active_ads + self.inactive_ads
@@ -100,7 +115,8 @@ class Advertiser(Person):
         ]
 
     def destroy(self):
-        for ad in self.active_ads:
+        # destroying an active ad removes it from the active ads
+        for ad in list(self.active_ads):
             ad.destroy()
         for ad in self.inactive_ads:
             ad.destroy()
@@ -24,7 +24,6 @@ from ..types.types import (
     BiddingStrategy,
     AdCategory,
 )
-import random
 from scipy import stats
 from datetime import timedelta
 import numpy as np
@@ -57,7 +56,8 @@ class AdvertiserFactory:
             gets refreshed every day and consumed every day.
         """
         budget_config = adv_config['budget_config']
-        budget = np.random.lognormal(
+        stream = advertiser.random_stream
+        budget = stream.lognormal(
             mean=budget_config['budget_mu'],
             sigma=budget_config['budget_sigma'],
         )
@@ -114,48 +114,49 @@ class AdvertiserFactory:
         """
         intent_config = adv_config['intent_config']
         budget_config = adv_config['budget_config']
+        stream = advertiser.random_stream
         outcomes: List[AdEventType] = intent_config[
             'allowed_ad_goal'
-        ] if random.random() > intent_config[
+        ] if stream.random() > intent_config[
             'percent_adv_enabling_awareness_ads'
         ] else [AdEventType.CONVERSIONS]
         # can be only one, or two or three of the formats
-        formats: List[AdFormat] = random.sample(
+        formats: List[AdFormat] = stream.sample(
             intent_config['allowed_formats'],
-            k=random.randint(1, len(intent_config['allowed_formats'])),
+            k=stream.randint(1, len(intent_config['allowed_formats'])),
         )
         # surfaces are randomly selected from all possible
         # surfaces
-        surfaces: List[AppSurfaceType] = random.sample(
+        surfaces: List[AppSurfaceType] = stream.sample(
             env_config['enabled_surfaces'],
-            k=random.randint(1, len(env_config['enabled_surfaces'])),
+            k=stream.randint(1, len(env_config['enabled_surfaces'])),
         )
         # product price is from a lognormal distribution
         # with mean and sigma from the intent_config
-        product_price = np.random.lognormal(
+        product_price = stream.lognormal(
             mean=intent_config['price_mu'],
             sigma=intent_config['price_sigma'],
         )
         # profit margin is from a normal distribution
-        profit_margin = np.random.normal(
+        profit_margin = stream.normal(
             loc=intent_config['profit_margin_mean'],
             scale=intent_config['profit_margin_std'],
         )
         # target roi is from a uniform distribution
-        target_roi = np.random.normal(
+        target_roi = stream.normal(
             loc=intent_config['target_roi_mean'],
             scale=intent_config['target_roi_std'],
         )
         # bidding strategy could be MAX_OUTCOME_WITHOUT_COST_CAP
         # MAX_OUTCOME_WITH_COST_CAP or COST_CAP
-        bidding_strategy = random.choice(
+        bidding_strategy = stream.choice(
             intent_config['allowed_bidding_strategies']
         )
         # if bidding strategy is cost cap or max outcome with cost cap
         # then cost cap is from a uniform distribution from 50% of
         # product profit to 100% of product profit
         profit = product_price * profit_margin
-        cost_cap = random.uniform(
+        cost_cap = stream.uniform(
             profit * 0.5,
             profit,
         ) if bidding_strategy in [
@@ -164,13 +165,13 @@ class AdvertiserFactory:
         ] else None
         # category is randomly selected from all possible
         # categories
-        category = random.choice(list(AdCategory))
+        category = stream.choice(list(AdCategory))
         # country is same as this factory
 
         all_countries: dict[str, float] = adv_config[
             'per_country_advertiser_proportion'
         ]
-        adv_country = random.choices(
+        adv_country = stream.choices(
             list(all_countries.keys()),
             weights=list(all_countries.values()),
             k=1
@@ -182,42 +183,42 @@ class AdvertiserFactory:
         )
         # min age is from a uniform distribution
         # from 18 to 30
-        min_age = random.randint(
+        min_age = stream.randint(
             user_config['min_age'],
             intent_config['age_threshold']
         )
         # max age is from a uniform distribution
         # from 40 to 65
-        max_age = random.randint(
+        max_age = stream.randint(
             intent_config['age_threshold'],
             user_config['max_age']
         )
         # target gender is randomly selected from all possible
-        genders: List[GenderType] = random.sample(
+        genders: List[GenderType] = stream.sample(
             list(GenderType),
-            k=random.randint(1, len(GenderType)),
+            k=stream.randint(1, len(GenderType)),
         )
         # max ads per day is from a uniform distribution
         # from 1 to 10
-        max_ads_per_day = random.randint(1, 10)
+        max_ads_per_day = stream.randint(1, 10)
         # max_budget_percent_per_ad is from a uniform distribution
         # from 0.1 to 0.5 if max ads per day is higher than 1
         if max_ads_per_day == 1:
             max_budget_percent_per_ad = 1
             min_budget_percent_per_ad = 1
         else:
-            max_budget_percent_per_ad = random.uniform(0.1, 0.5)
-            min_budget_percent_per_ad = random.uniform(
+            max_budget_percent_per_ad = stream.uniform(0.1, 0.5)
+            min_budget_percent_per_ad = stream.uniform(
                 0.1,
                 max_budget_percent_per_ad,
             )
         # max duration is from a uniform distribution
         # from 1 to 30 days
-        max_duration = timedelta(days=random.randint(1, 30))
+        max_duration = timedelta(days=stream.randint(1, 30))
         # min duration is from a uniform distribution
         # from 1 to max duration
         min_duration = timedelta(
-            days=random.randint(1, max_duration.days),
+            days=stream.randint(1, max_duration.days),
         )
         performance_incremental = budget_config['performance_incremental']
         intent_state = AdvertiserIntentState(
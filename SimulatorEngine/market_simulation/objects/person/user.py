@@ -13,7 +13,8 @@
 """
 
 from simulator_base.person.person import Person
-from ..types.types import AdEvent, AdEventFields
+from ..auction.ad_event_log import get_ad_event_log
+from ..types.types import AdEventFields
 from typing import final
 
 
@@ -35,17 +36,18 @@ class User(Person):
             'PersonalInfoState'
         ]
 
-    def view_ad(self, ad_event: AdEvent):
+    def view_ad(self, offset: int):
         """
             Adding an impression event to user's view history
             so that it can be used to calculate the impact
             of awareness ad's lift on ad performance and
-            ad fatigue from conversion ad.
+            ad fatigue from conversion ad. Offset is the
+            offset of the event in the ad event log.
         """
         view_state = self.get_state('UserAdViewHistoryState')
-        view_state.view_ad(ad_event)
+        view_state.view_ad(offset)
 
-    def convert_ad(self, ad_event: AdEvent):
+    def convert_ad(self, offset: int):
         """
             Adding a conversion event to user's conversion history
             every conversion on the same category would reduce
@@ -53,12 +55,13 @@ class User(Person):
             same category again.
         """
         convert_state = self.get_state('UserAdConversionHistoryState')
-        convert_state.convert_ad(ad_event)
+        convert_state.convert_ad(offset)
         purchase_state = self.get_state('PurchasesState')
-        ad_category = ad_event[AdEventFields.AD].category
+        event_log = get_ad_event_log()
+        ad_category = event_log.get_ad(offset).category
         purchase_state.add_purchase(
             ad_category,
-            ad_event[AdEventFields.EVENT_TIME]
+            event_log.get_value(offset, AdEventFields.EVENT_TIME)
         )
 
     def __str__(self):
@@ -27,8 +27,6 @@ from ..effect.income_effect import IncomeEffect
 from ..action.browse_app_action import BrowseAppAction
 from datetime import datetime, timedelta
 from typing import List
-import numpy as np
-import random
 
 
 @final
@@ -41,10 +39,11 @@ class UserFactory:
         user: User,
         user_config: dict
     ):
-        gender = random.choice(
+        stream = user.random_stream
+        gender = stream.choice(
             list(GenderType)
         )
-        age = random.randint(
+        age = stream.randint(
             user_config['min_age'],
             user_config['max_age']
         )
@@ -52,7 +51,7 @@ class UserFactory:
         per_country_probability: dict[str, float] = user_config[
             'per_country_user_proportion'
         ]
-        user_country = random.choices(
+        user_country = stream.choices(
             list(per_country_probability.keys()),
             weights=list(per_country_probability.values()),
             k=1
@@ -61,24 +60,24 @@ class UserFactory:
         # generate a birth day that is in the past
         # consider the possibility between year - age, and year - age - 1
         # based on selected birth month
-        birth_month = random.randint(1, 12)
+        birth_month = stream.randint(1, 12)
         if birth_month > current_time.month:
             birth_year = current_time.year - age - 1
         else:
             birth_year = current_time.year - age
         if birth_month in [1, 3, 5, 7, 8, 10, 12]:
-            birth_day = random.randint(1, 31)
+            birth_day = stream.randint(1, 31)
         elif birth_month in [4, 6, 9, 11]:
-            birth_day = random.randint(1, 30)
+            birth_day = stream.randint(1, 30)
         else:
             if (
                 birth_year % 4 == 0
                 and (birth_year % 100 != 0 or birth_year % 400 == 0)
             ):
                 # leap year
-                birth_day = random.randint(1, 29)
+                birth_day = stream.randint(1, 29)
             else:
-                birth_day = random.randint(1, 28)
+                birth_day = stream.randint(1, 28)
         birth_day = datetime(
             birth_year,
             birth_month,
@@ -117,7 +116,8 @@ class UserFactory:
         user_config: dict
     ):
         income_config = user_config['income_config']
-        monthly_income = np.random.lognormal(
+        stream = user.random_stream
+        monthly_income = stream.lognormal(
             mean=income_config['income_mu'],
             sigma=income_config['income_sigma'],
         )
@@ -128,8 +128,9 @@ class UserFactory:
     def _apply_user_intent(self, user: User, user_config: dict):
         intent_config = user_config['intent_config']
         intent_baseline = get_user_intents_baseline()
+        stream = user.random_stream
         for intent, value in intent_baseline.items():
-            intent_value = random.gauss(
+            intent_value = stream.gauss(
                 intent_config['intent_mean'],
                 intent_config['intent_std']
             )
@@ -145,7 +146,8 @@ class UserFactory:
         env_config: dict
     ):
         browsing_config = user_config['browsing_config']
-        daily_active_cnt = random.gauss(
+        stream = user.random_stream
+        daily_active_cnt = stream.gauss(
             browsing_config['daily_active_cnt_mean'],
             browsing_config['daily_active_cnt_std']
         )
@@ -159,7 +161,7 @@ class UserFactory:
         consideration_cnt = twenty_four_hours / user_simulation_interval
         active_probability = daily_active_cnt / consideration_cnt
 
-        session_length = random.gauss(
+        session_length = stream.gauss(
             browsing_config['session_length_mean'],
             browsing_config['session_length_std']
         )
@@ -167,7 +169,7 @@ class UserFactory:
         # per surface probability should add up to 1
         all_surfaces = env_config['enabled_surfaces']
         per_surface_probability = {
-            surface: random.uniform(0, 1)
+            surface: stream.uniform(0, 1)
             for surface in all_surfaces
         }
         prob_sum = sum(per_surface_probability.values())
@@ -6,16 +6,28 @@
     as the calculated paced bid and pacing
     multipliers, to help the ad achieve its
     maximal outcome.
+
+    In throttling pacing mode the bid is fixed
+    and the ad is paced by the probability of
+    taking part in a request instead.
     ============================================
 """
 
 
 from simulator_base.state.active_state import ActiveState
-from simulator_base.orchestrator.orchestrator import Orchestrator
+from simulator_base.orchestrator.orchestrator import (
+    Orchestrator,
+    get_orchestrator,
+)
+from simulator_base.util.timestamp import to_day, to_timestamp
+from simulator_base.util.daily_ledger import DailyLedger
 from ...config.market_config import get_config
-from ..types.types import BiddingStrategy
-from datetime import timedelta, datetime, date
+from ..types.types import BiddingStrategy, PacingMode
+from datetime import timedelta, datetime
 from typing import final, Optional
+import numpy as np
+
+MICROSECONDS_PER_HOUR = 3600 * 10 ** 6
 
 
 class AdBudgetState(ActiveState):
@@ -35,6 +47,9 @@ class AdBudgetState(ActiveState):
         self._daily_budget = daily_budget
         self._remaining_daily_budget = daily_budget
         self._over_delivery = 0
+        # over delivery of the current pacing period
+        self._period_over_delivery = 0
+        self._is_eligible = True
         market_config = get_config()
         delivery_config = market_config.get_delivery_config()
         pacing_config = delivery_config["pacing_config"]
@@ -42,13 +57,17 @@ class AdBudgetState(ActiveState):
             "starting_pacing_multiplier"
         ]
         self._current_pacing_multiplier = starting_pacing_multiplier
+        # every ad starts out taking part in every request
+        self._participation_probability = 1.0
         self._bidding_strategy = bidding_strategy
         self._cost_cap = cost_cap
-        self._daily_spent: dict[date, float] = {}
+        # spend by the day it was spent on
+        self._daily_spent = DailyLedger()
         self._end_date = None
         self._pacing_adjustment_counter = 0
         self._start_pacing_time = None
         self._target_end_time = None
+        self._target_end_timestamp = None
         self._last_pacing_period_start_time = None
 
     # ============= User Accessible Public Methods ==============
@@ -105,15 +124,33 @@ class AdBudgetState(ActiveState):
         """
         return self._over_delivery
 
+    @property
+    def is_eligible(self) -> bool:
+        """
+            Whether the ad can still take part in
+            auctions, ads are dropped from the candidates
+            once their budget is exhausted and come back
+            when the daily budget is refreshed.
+        """
+        return self._is_eligible
+
+    @property
+    def participation_probability(self) -> float:
+        """
+            Probability of the ad taking part in a
+            request, in throttling pacing mode.
+        """
+        return self._participation_probability
+
     @property
     def has_ended(self) -> bool:
         """
             Whether the ad has finished.
         """
-        if self._target_end_time is None:
+        if self._target_end_timestamp is None:
             return False
-        current_time = Orchestrator.get_current_time(self.subject)
-        return current_time > self._target_end_time
+        return Orchestrator.get_current_timestamp() > \
+            self._target_end_timestamp
 
     @property
     def end_date(self) -> Optional[datetime]:
@@ -127,6 +164,7 @@ class AdBudgetState(ActiveState):
         self._start_pacing_time = current_time
         self._last_pacing_period_start_time = current_time
         self._target_end_time = current_time + self._duration
+        self._target_end_timestamp = to_timestamp(self._target_end_time)
 
     def can_spend(self, amount: float):
         return (not self.has_ended
@@ -134,28 +172,35 @@ class AdBudgetState(ActiveState):
                 and self._remaining_budget >= amount)
 
     def spend(self, amount: float) -> float:
-        current_date = Orchestrator.get_current_time(self).date()
-        if current_date not in self._daily_spent:
-            self._daily_spent[current_date] = 0
+        # the day of the ad, as the outcomes are counted
+        current_date = Orchestrator.get_current_date(self.subject)
         proposed_spending = 0
         if self._remaining_daily_budget < amount:
             proposed_spending = self._remaining_daily_budget
             self._over_delivery += amount - self._remaining_daily_budget
+            self._period_over_delivery += \
+                amount - self._remaining_daily_budget
             self._remaining_daily_budget = 0
             self._remaining_budget = max(0, self._remaining_budget - amount)
         else:
             proposed_spending = amount
             self._remaining_daily_budget -= amount
             self._remaining_budget -= amount
-        self._daily_spent[current_date] += proposed_spending
+        self._daily_spent.add(to_day(current_date), proposed_spending)
+        self._update_eligibility()
         return proposed_spending
 
     def get_spend(self, date: datetime = None) -> float:
         if date is None:
             return self._budget - self._remaining_budget
-        if date not in self._daily_spent:
-            return 0
-        return self._daily_spent[date]
+        return self._daily_spent.get(to_day(date))
+
+    def get_spend_between(self, start_day: int, end_day: int) -> float:
+        """
+            Spend from the start day up to, but not including,
+            the end day, days are given by timestamp.to_day
+        """
+        return self._daily_spent.get_range(start_day, end_day)
 
     @property
     def paced_bid(self):
@@ -164,18 +209,32 @@ class AdBudgetState(ActiveState):
             in the market, and participate in auction for all conversions
             below this price.
         """
-        pacing_config = get_config().get_delivery_config()['pacing_config']
-        adjustment_interval = pacing_config["adjustment_interval"]
-        max_bid = pacing_config["max_bid"]
+        pacing_config = get_config().frozen.delivery_config.pacing_config
+        adjustment_interval = pacing_config.adjustment_interval
         if self._bidding_strategy == BiddingStrategy.COST_CAP:
             return self._cost_cap
-        proposed_paced_bid = None
-        if self._pacing_adjustment_counter < adjustment_interval:
-            self._pacing_adjustment_counter += 1
-            proposed_paced_bid = self._current_pacing_multiplier
+        if pacing_config.pacing_mode != PacingMode.THROTTLING:
+            if self._pacing_adjustment_counter < adjustment_interval:
+                self._pacing_adjustment_counter += 1
+            else:
+                self._current_pacing_multiplier = \
+                    self._pacing_multiplier_readonly()
+        return self.current_paced_bid
+
+    @property
+    def current_paced_bid(self) -> float:
+        """
+            The bid at the current pacing multiplier,
+            without adjusting it.
+        """
+        if self._bidding_strategy == BiddingStrategy.COST_CAP:
+            return self._cost_cap
+        pacing_config = get_config().frozen.delivery_config.pacing_config
+        if pacing_config.pacing_mode == PacingMode.THROTTLING:
+            multiplier = pacing_config.throttling_bid_multiplier
         else:
-            proposed_paced_bid = self.pacing_multiplier
-        calculated_bid = max_bid * proposed_paced_bid
+            multiplier = self._current_pacing_multiplier
+        calculated_bid = pacing_config.max_bid * multiplier
         if self._bidding_strategy == \
                 BiddingStrategy.MAX_OUTCOME_WITH_COST_CAP:
             return min(self._cost_cap, calculated_bid)
@@ -214,10 +273,90 @@ class AdBudgetState(ActiveState):
         # the daily budget
         if current_time > self._target_end_time:
             self.subject.pause()
-        elif current_time - self._last_pacing_period_start_time > \
+            return
+        is_throttling = get_config().frozen.delivery_config\
+            .pacing_config.pacing_mode == PacingMode.THROTTLING
+        if current_time - self._last_pacing_period_start_time > \
                 timedelta(days=1):
             self._last_pacing_period_start_time = current_time
             self._remaining_daily_budget = self._daily_budget
+            self._period_over_delivery = 0
+            self._update_eligibility()
+            if is_throttling:
+                self._set_participation_probability(1.0)
+        elif is_throttling:
+            self._set_participation_probability(
+                self._get_adjusted_pacing_value(
+                    self._participation_probability
+                )
+            )
+
+    @classmethod
+    def simulate_batch(cls, states: list["AdBudgetState"]):
+        """
+            Most due budget states are neither ending nor
+            starting a new pacing period, only those that
+            are get the full update. In throttling pacing
+            mode every due state adjusts its participation
+            probability.
+        """
+        current_timestamp = Orchestrator.get_current_timestamp()
+        is_throttling = get_config().frozen.delivery_config\
+            .pacing_config.pacing_mode == PacingMode.THROTTLING
+        period_end_timestamps = {}
+        for state in states:
+            if state._start_pacing_time is None \
+               or not state.should_update():
+                continue
+            if is_throttling \
+               or current_timestamp > state._target_end_timestamp:
+                state.update()
+                continue
+            period_start = state._last_pacing_period_start_time
+            period_end_timestamp = period_end_timestamps.get(period_start)
+            if period_end_timestamp is None:
+                period_end_timestamp = to_timestamp(
+                    period_start + timedelta(days=1)
+                )
+                period_end_timestamps[period_start] = period_end_timestamp
+            if current_timestamp > period_end_timestamp:
+                state.update()
+
+    @classmethod
+    def adjust_pacing_batch(
+        cls,
+        states: list["AdBudgetState"]
+    ) -> np.ndarray:
+        """
+            Batch pacing, adjusts the pacing multiplier of
+            every running ad in one vectorized step, the
+            same adjustment as pacing_multiplier. Returns
+            the paced bid of every state, which the auction
+            reads instead of paced_bid.
+        """
+        pacing_config = get_config().frozen.delivery_config.pacing_config
+        if pacing_config.pacing_mode != PacingMode.THROTTLING:
+            running_states = [
+                state for state in states
+                if state._start_pacing_time is not None
+                and not state.has_ended
+            ]
+            multipliers = cls._get_adjusted_pacing_values(
+                running_states,
+                np.array(
+                    [state._current_pacing_multiplier
+                     for state in running_states],
+                    dtype=np.float64
+                )
+            )
+            for state, multiplier in zip(
+                running_states, multipliers.tolist()
+            ):
+                state._current_pacing_multiplier = multiplier
+        return np.array(
+            [state.current_paced_bid for state in states],
+            dtype=np.float64
+        )
 
     def validate_object(self):
         """
@@ -228,6 +367,10 @@ class AdBudgetState(ActiveState):
             0 and divisible by duration.
         """
         super().validate_object()
+        pacing_mode = get_config().frozen.delivery_config\
+            .pacing_config.pacing_mode
+        if pacing_mode not in tuple(PacingMode):
+            raise Exception(f"Unknown pacing mode {pacing_mode}")
         if self._bidding_strategy != \
                 BiddingStrategy.MAX_OUTCOME_WITHOUT_COST_CAP:
             if self._cost_cap is None:
@@ -241,12 +384,45 @@ class AdBudgetState(ActiveState):
 
     # ================= Private Helper Methods ==================
 
+    def _update_eligibility(self):
+        """
+            Budget is exhausted once the daily or total
+            budget is used up and the over delivery of
+            the period reaches the tolerance, a fraction
+            of the daily budget that simulates charges
+            arriving with delivery delay. Changes are
+            pushed to the ad table of the all ads
+            environment.
+        """
+        tolerance = get_config().frozen.delivery_config\
+            .pacing_config.over_delivery_tolerance
+        is_eligible = not (
+            min(self._remaining_daily_budget, self._remaining_budget) <= 0
+            and self._period_over_delivery >= tolerance * self._daily_budget
+        )
+        if is_eligible == self._is_eligible:
+            return
+        self._is_eligible = is_eligible
+        get_orchestrator().get_environment('AllAdsEnvironment')\
+            .set_ad_eligible(self.subject, self._is_eligible)
+
     def _pacing_multiplier_readonly(self):
         """
             This calculates pacing multiplier
             without modify the current pacing multiplier
             for debugging purposes only.
         """
+        return self._get_adjusted_pacing_value(
+            self._current_pacing_multiplier
+        )
+
+    def _get_adjusted_pacing_value(self, value: float) -> float:
+        """
+            Moves a pacing value between 0 and 1 up when
+            the ad spends slower than the time passed in
+            the pacing period and down when it spends
+            faster.
+        """
         expected_hourly_spend = self._daily_budget / 24
         current_time = Orchestrator.get_current_time(self)
         hours_passed = (
@@ -256,14 +432,61 @@ class AdBudgetState(ActiveState):
         if remaining_hours == 0:
             return 0
         expected_remaining_budget = remaining_hours * expected_hourly_spend
-        pacing_config = get_config().get_delivery_config()['pacing_config']
-        alpha = pacing_config["alpha"]
-        epsilon = pacing_config["epsilon"]
+        pacing_config = get_config().frozen.delivery_config.pacing_config
+        alpha = pacing_config.alpha
+        epsilon = pacing_config.epsilon
         factor = self._remaining_daily_budget / expected_remaining_budget - 1
-        delta = self._current_pacing_multiplier * alpha * factor + epsilon
-        return max(min(self._current_pacing_multiplier + delta, 1), 0)
+        delta = value * alpha * factor + epsilon
+        return max(min(value + delta, 1), 0)
+
+    @classmethod
+    def _get_adjusted_pacing_values(
+        cls,
+        states: list["AdBudgetState"],
+        values: np.ndarray
+    ) -> np.ndarray:
+        """
+            _get_adjusted_pacing_value over arrays, one
+            value per state
+        """
+        if not states:
+            return values
+        current_timestamp = Orchestrator.get_current_timestamp()
+        period_start_timestamps = np.array(
+            [
+                to_timestamp(state._last_pacing_period_start_time)
+                for state in states
+            ],
+            dtype=np.float64
+        )
+        daily_budgets = np.array(
+            [state._daily_budget for state in states],
+            dtype=np.float64
+        )
+        remaining_daily_budgets = np.array(
+            [state._remaining_daily_budget for state in states],
+            dtype=np.float64
+        )
+        hours_passed = (
+            current_timestamp - period_start_timestamps
+        ) / MICROSECONDS_PER_HOUR
+        remaining_hours = 24 - hours_passed
+        expected_remaining_budgets = remaining_hours * daily_budgets / 24
+        pacing_config = get_config().frozen.delivery_config.pacing_config
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors = remaining_daily_budgets / expected_remaining_budgets - 1
+        deltas = values * pacing_config.alpha * factors + pacing_config.epsilon
+        adjusted_values = np.clip(values + deltas, 0, 1)
+        adjusted_values[remaining_hours == 0] = 0
+        return adjusted_values
+
+    def _set_participation_probability(self, probability: float):
+        if probability == self._participation_probability:
+            return
+        self._participation_probability = probability
+        get_orchestrator().get_environment('AllAdsEnvironment')\
+            .set_ad_participation_probability(self.subject, probability)
 
     def _get_paced_bid_readonly(self) -> float:
-        pacing_config = get_config().get_delivery_config()['pacing_config']
-        max_bid = pacing_config["max_bid"]
+        max_bid = get_config().frozen.delivery_config.pacing_config.max_bid
         return max_bid * self._pacing_multiplier_readonly()
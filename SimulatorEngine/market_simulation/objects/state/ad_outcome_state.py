@@ -4,12 +4,22 @@
     outcome of the ad, and allows for easy
     aggregation of the ad's performance by
     different axis.
+
+    Outcomes are kept as offsets into the ad
+    event log, and counted by day in daily
+    ledgers.
     ==========================================
 """
 
 from simulator_base.state.passive_state import PassiveState
-from ..types.types import AdEvent, AdEventList, AdEventType, AdEventFields
-from datetime import timedelta, datetime
+from simulator_base.orchestrator.orchestrator import Orchestrator
+from simulator_base.util.timestamp import to_day, to_timestamp
+from simulator_base.util.rolling_buffer import RollingBuffer
+from simulator_base.util.daily_ledger import DailyLedger
+from ..auction.ad_event_log import get_ad_event_log
+from ..types.types import AdEventType
+from datetime import timedelta, datetime, time
+import numpy as np
 
 
 class AdOutcomeState(PassiveState):
@@ -22,70 +32,124 @@ class AdOutcomeState(PassiveState):
             "AdOutcomeState",
             # calculate current outcome every 6 hours
         )
-        self._impressions: AdEventList = []
-        self._conversions: AdEventList = []
+        # offsets of the events in the ad event log
+        self._impressions = RollingBuffer(dtype=np.int64)
+        self._conversions = RollingBuffer(dtype=np.int64)
+        # number of events by the local day of their event time
+        self._daily_impressions = DailyLedger()
+        self._daily_conversions = DailyLedger()
         self._goal = goal
         self.simulation_interval = aggregation_frequency
 
     @property
-    def impressions(self) -> AdEventList:
+    def impressions(self) -> RollingBuffer:
         return self._impressions
 
     @property
-    def conversions(self) -> AdEventList:
+    def conversions(self) -> RollingBuffer:
         return self._conversions
 
     @property
     def goal(self) -> AdEventType:
         return self._goal
 
-    def append_outcome(self, event: AdEvent):
-        if event[AdEventFields.EVENT_TYPE] == AdEventType.IMPRESSIONS:
-            self._impressions.append(event)
-        elif event[AdEventFields.EVENT_TYPE] == AdEventType.CONVERSIONS:
-            self._conversions.append(event)
+    def append_outcome(
+        self,
+        event_type: AdEventType,
+        offset: int,
+        event_time: int
+    ):
+        # counted on the local day of the ad, as its spend
+        day = to_day(Orchestrator.get_date(self.subject, event_time))
+        if event_type == AdEventType.IMPRESSIONS:
+            self._impressions.append(event_time, offset)
+            self._daily_impressions.add(day, 1)
+        elif event_type == AdEventType.CONVERSIONS:
+            self._conversions.append(event_time, offset)
+            self._daily_conversions.add(day, 1)
 
     def get_outcomes(
         self,
         event_type: AdEventType = None,
-        filter_fn: callable = None
-    ) -> AdEventList:
-        if filter_fn:
-            if event_type == AdEventType.IMPRESSIONS:
-                return list(filter(filter_fn, self._impressions))
-            if event_type == AdEventType.CONVERSIONS:
-                return list(filter(filter_fn, self._conversions))
+        date: datetime = None
+    ) -> np.ndarray:
+        """
+            Offsets of the events of the type, if date is
+            provided, only of the events that happen within
+            the same local day as the date.
+        """
+        if event_type == AdEventType.IMPRESSIONS:
+            offsets = self._impressions.items
+        elif event_type == AdEventType.CONVERSIONS:
+            offsets = self._conversions.items
         else:
-            if event_type == AdEventType.IMPRESSIONS:
-                return self._impressions
-            if event_type == AdEventType.CONVERSIONS:
-                return self._conversions
-
-    def _event_date_match(self, event: AdEvent, date: datetime = None) -> bool:
+            return None
         if date is None:
-            return True
-        return event[AdEventFields.EVENT_TIME].date() == date.date()
+            return offsets
+        # bounds of the local day of the ad, as the ledgers
+        time_zone = Orchestrator.get_timezone(self.subject)
+        day_start = to_timestamp(
+            datetime.combine(date.date(), time.min, time_zone)
+        )
+        day_end = to_timestamp(datetime.combine(
+            date.date() + timedelta(days=1),
+            time.min,
+            time_zone
+        ))
+        event_times = get_ad_event_log().event_times[offsets]
+        return offsets[(day_start <= event_times) & (event_times < day_end)]
 
-    def get_optimized_events(self, date: datetime = None) -> AdEventList:
+    def get_optimized_events(self, date: datetime = None) -> np.ndarray:
         """
             Get all outcomes that match the desired goal
             if date is provided, only get outcomes that happen
             within the same day as the date.
         """
-        return self.get_outcomes(
-            self._goal,
-            filter_fn=lambda event: self._event_date_match(event, date)
-        )
+        return self.get_outcomes(self._goal, date)
 
-    def get_impressions(self, date: datetime = None) -> AdEventList:
-        return self.get_outcomes(
-            AdEventType.IMPRESSIONS,
-            filter_fn=lambda event: self._event_date_match(event, date)
-        )
+    def get_impressions(self, date: datetime = None) -> np.ndarray:
+        return self.get_outcomes(AdEventType.IMPRESSIONS, date)
+
+    def get_outcome_cnt(
+        self,
+        event_type: AdEventType = None,
+        start_day: int = None,
+        end_day: int = None
+    ) -> int:
+        """
+            Number of events of the type, if the days are
+            provided, only of the events from the start day
+            up to, but not including, the end day.
+        """
+        if event_type == AdEventType.IMPRESSIONS:
+            daily_outcomes = self._daily_impressions
+        elif event_type == AdEventType.CONVERSIONS:
+            daily_outcomes = self._daily_conversions
+        else:
+            return 0
+        if start_day is None:
+            return int(daily_outcomes.get_total())
+        return int(daily_outcomes.get_range(start_day, end_day))
+
+    def get_optimized_event_cnt(
+        self,
+        start_day: int = None,
+        end_day: int = None
+    ) -> int:
+        return self.get_outcome_cnt(self._goal, start_day, end_day)
 
     def get_conversions_rate(self, date: datetime = None) -> float:
-        impressions = len(self.get_impressions(date))
-        conversions = len(self.get_optimized_events(date))
+        if date is None:
+            impressions = self.get_outcome_cnt(AdEventType.IMPRESSIONS)
+            conversions = self.get_optimized_event_cnt()
+        else:
+            day = to_day(date)
+            impressions = self.get_outcome_cnt(
+                AdEventType.IMPRESSIONS,
+                day,
+                day + 1
+            )
+            conversions = self.get_optimized_event_cnt(day, day + 1)
         if impressions == 0:
             return 0
         return conversions / impressions
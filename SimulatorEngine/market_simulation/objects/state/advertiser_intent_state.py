@@ -18,7 +18,6 @@ from ..types.types import (
 )
 from typing import List
 from datetime import timedelta
-import random
 
 
 class AdvertiserIntentState(PassiveState):
@@ -134,17 +133,17 @@ class AdvertiserIntentState(PassiveState):
         )
         if not active_ads:
             return AdEventType.CONVERSIONS
-        return random.choice(self._outcome)
+        return self.random_stream.choice(self._outcome)
 
     def get_format(self) -> AdFormat:
-        return random.choice(self._format)
+        return self.random_stream.choice(self._format)
 
     def get_duration(self) -> timedelta:
         """
             Exact integer number of days
         """
         return timedelta(
-            days=random.randint(
+            days=self.random_stream.randint(
                 self._min_duration_per_ad.days,
                 self._max_duration_per_ad.days
             )
@@ -154,7 +153,7 @@ class AdvertiserIntentState(PassiveState):
         return self._surface
 
     def get_ad_daily_budget(self) -> float:
-        proposed_budget_percent = random.uniform(
+        proposed_budget_percent = self.random_stream.uniform(
             self._min_budget_percent_per_ad,
             self._max_budget_percent_per_ad
         )
@@ -20,21 +20,28 @@ class AllActiveAdsState(ActiveState):
     ):
         super().__init__("AllActiveAdsState")
         self._active_ads: List[Agent] = []
+        # bumped whenever the active ads change
+        self._version = 0
         self.simulation_interval = ad_scan_interval
 
     @property
     def active_ads(self) -> List[Agent]:
         return self._active_ads
 
+    @property
+    def version(self) -> int:
+        return self._version
+
     def update(self):
         """
             Find all ads that are available and active
             and set to active ads field
         """
-        all_agents = get_orchestrator().get_all_agents()
+        # stopped ads are paused, no need to scan them
         active_ads = [
-            agent for agent in all_agents
-            if agent.object_subtype == "Ad"
-            and not agent.get_state("AdBudgetState").has_ended
+            ad for ad in get_orchestrator().get_active_agents("Ad")
+            if not ad.get_state("AdBudgetState").has_ended
         ]
-        self._active_ads = active_ads
+        if active_ads != self._active_ads:
+            self._active_ads = active_ads
+            self._version += 1
@@ -0,0 +1,38 @@
+"""
+    =========== All Ads Pacing State ============
+    This is part of the all ads environment that
+    paces all active ads at once, when batch pacing
+    is enabled. Every adjustment interval, the
+    pacing multipliers of the ads are adjusted in
+    one vectorized step and the resulting paced bids
+    are stored in the ad table, from which the
+    auction reads them.
+
+    Pacing then moves with time instead of with the
+    number of auctions the ads take part in.
+    =============================================
+"""
+
+from simulator_base.state.active_state import ActiveState
+from .ad_budget_state import AdBudgetState
+from datetime import timedelta
+
+
+class AllAdsPacingState(ActiveState):
+    def __init__(
+        self,
+        adjustment_interval: timedelta = timedelta(minutes=1),
+    ):
+        super().__init__("AllAdsPacingState")
+        self.simulation_interval = adjustment_interval
+
+    def update(self):
+        """
+            Adjust the pacing of the ads of the ad table
+            and store their paced bids
+        """
+        ad_table = self.subject.ad_table
+        paced_bids = AdBudgetState.adjust_pacing_batch(
+            [ad.get_state('AdBudgetState') for ad in ad_table.ads]
+        )
+        ad_table.set_paced_bids(paced_bids)
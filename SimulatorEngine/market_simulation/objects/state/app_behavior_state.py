@@ -9,7 +9,6 @@
 
 from simulator_base.state.passive_state import PassiveState
 from ...objects.types.types import AppBehaviorFieldState, AppSurfaceType
-import random
 from datetime import timedelta
 from typing import Any
 
@@ -40,18 +39,18 @@ class AppBehaviorState(PassiveState):
             This function can only be called at most once
             per an hour
         """
-        return random.random() < self._hourly_active_probability
+        return self.random_stream.random() < self._hourly_active_probability
 
     def get_user_active_duration(self) -> timedelta:
-        total_seconds = random.gauss(
+        total_seconds = self.random_stream.gauss(
             self._hourly_active_duration_mean,
             self._hourly_active_duration_stdev
         )
         return timedelta(seconds=total_seconds)
 
     def get_user_active_surface(self) -> AppSurfaceType:
-        return random.choices(
+        return self.random_stream.choices(
             list(self._per_surface_probability.keys()),
-            weights=self._per_surface_probability.values(),
+            weights=list(self._per_surface_probability.values()),
             k=1
         )[0]
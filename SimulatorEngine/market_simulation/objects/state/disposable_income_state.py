@@ -17,6 +17,12 @@ class DisposableIncomeState(PassiveState):
     ):
         super().__init__("DisposableIncomeState")
         self._disposable_income = disposable_income
+        # bumped whenever the disposable income changes
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
 
     @property
     def disposable_income(self) -> float:
@@ -31,6 +37,8 @@ class DisposableIncomeState(PassiveState):
                 "User does not have enough money to purchase"
             )
         self._disposable_income -= amount
+        self._version += 1
 
     def increase(self, amount: float):
         self._disposable_income += amount
+        self._version += 1
@@ -10,8 +10,10 @@
 from simulator_base.state.active_state import ActiveState
 from ..types.types import AdCategory, PurchaseHistory
 from simulator_base.orchestrator.orchestrator import Orchestrator
-from typing import List, final
-from datetime import datetime, timedelta
+from simulator_base.util.rolling_buffer import RollingBuffer
+from typing import final
+from datetime import timedelta
+import numpy as np
 
 
 @final
@@ -28,26 +30,49 @@ class PurchasesState(ActiveState):
         else:
             self._purchases = {}
             for category in AdCategory:
-                self._purchases[category] = []
+                self._purchases[category] = RollingBuffer(
+                    memory_duration,
+                    np.int64
+                )
+        # bumped whenever purchases are added or expire
+        self._version = 0
 
-    def add_purchase(self, category: AdCategory, purchase_time: datetime):
-        self._purchases[category].append(purchase_time)
+    def add_purchase(self, category: AdCategory, purchase_time: int):
+        """
+            Purchase time is the timestamp of the
+            conversion event
+        """
+        self._purchases[category].append(purchase_time, purchase_time)
+        self._version += 1
 
-    def get_purchases(self, category: AdCategory) -> List[datetime]:
+    def get_purchases(self, category: AdCategory) -> RollingBuffer:
         return self._purchases[category]
 
     @property
     def purchases(self) -> PurchaseHistory:
         return self._purchases
 
-    def _remove_old_purchases(self):
-        today = Orchestrator.get_current_time(self)
-        time_threshold = today - self._memory_duration
-        # since purchases are stored in order of time
-        # we can remove purchases until we reach a
-        # purchase that is within the memory duration
-        while self._purchases and self._purchases[0] < time_threshold:
-            self._purchases.pop(0)
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @classmethod
+    def simulate_batch(cls, states: list["PurchasesState"]):
+        """
+            Prune the purchases of every due state
+            against a single read of the clock
+        """
+        current_time = Orchestrator.get_current_timestamp()
+        for state in states:
+            if state.should_update():
+                state._remove_old_purchases(current_time)
+
+    def _remove_old_purchases(self, current_time: int = None):
+        if current_time is None:
+            current_time = Orchestrator.get_current_timestamp()
+        for purchases in self._purchases.values():
+            if purchases.expire(current_time):
+                self._version += 1
 
     def update(self):
         super().update()
@@ -9,8 +9,11 @@
 
 from simulator_base.orchestrator.orchestrator import Orchestrator
 from simulator_base.state.active_state import ActiveState
-from ..types.types import AdEvent, AdEventFields, AdEventType
+from simulator_base.util.rolling_buffer import RollingBuffer
+from ..auction.ad_event_log import get_ad_event_log
+from ..types.types import AdEventFields, AdEventType
 from datetime import timedelta
+import numpy as np
 
 
 class UserAdConversionHistoryState(ActiveState):
@@ -19,25 +22,44 @@ class UserAdConversionHistoryState(ActiveState):
         memory_duration: timedelta = timedelta(days=14),
     ):
         super().__init__("UserAdConversionHistoryState")
-        self._ad_conversion_history = []
+        # offsets of the conversions in the ad event log
+        self._ad_conversion_history = RollingBuffer(
+            memory_duration,
+            np.int64
+        )
         self._memory_duration = memory_duration
 
-    def convert_ad(self, ad_event: AdEvent):
-        if ad_event[AdEventFields.EVENT_TYPE] != AdEventType.CONVERSIONS:
+    def convert_ad(self, offset: int):
+        event_log = get_ad_event_log()
+        if event_log.get_event_type(offset) != AdEventType.CONVERSIONS:
             raise ValueError(
                 "AdEventType must be CONVERSIONS to be converted in "
                 "UserAdConversionHistoryState"
             )
-        self._ad_conversion_history.append(ad_event)
+        self._ad_conversion_history.append(
+            event_log.get_value(offset, AdEventFields.EVENT_TIME),
+            offset
+        )
 
-    def _remove_old_conversions(self):
+    @classmethod
+    def simulate_batch(
+        cls,
+        states: list["UserAdConversionHistoryState"]
+    ):
+        """
+            Prune the conversion history of every due
+            state against a single read of the clock
+        """
+        current_time = Orchestrator.get_current_timestamp()
+        for state in states:
+            if state.should_update():
+                state._remove_old_conversions(current_time)
+
+    def _remove_old_conversions(self, current_time: int = None):
         # remove conversions that are older than memory duration
-        current_time = Orchestrator.get_current_time(self.subject)
-        earliest_time = current_time - self._memory_duration
-        while self._ad_conversion_history and self._ad_conversion_history[0][
-            AdEventFields.EVENT_TIME
-        ] < earliest_time:
-            self._ad_conversion_history.pop(0)
+        if current_time is None:
+            current_time = Orchestrator.get_current_timestamp()
+        self._ad_conversion_history.expire(current_time)
 
     def update(self):
         super().update()
@@ -6,15 +6,27 @@
     And if the ad is a conversion ad, then user
     intent would be reduced instead due to ad
     fatigue.
+
+    Views are kept as offsets into the ad event log,
+    along with the number of views by advertiser and
+    by ad, which are counted upon the view and upon
+    the expiry of the view.
     ==============================================
 """
 
 from simulator_base.state.active_state import ActiveState
 from simulator_base.agent.agent import Agent
 from simulator_base.orchestrator.orchestrator import Orchestrator
+from simulator_base.util.rolling_buffer import RollingBuffer
 from ...config.market_config import get_config
-from ..types.types import AdEventList, AdEvent, AdEventFields, AdEventType
+from ..auction.ad_event_log import (
+    ADVERTISER,
+    EVENT_TYPES,
+    get_ad_event_log,
+)
+from ..types.types import AdEventFields, AdEventType
 from datetime import timedelta
+import numpy as np
 
 
 class UserAdViewHistoryState(ActiveState):
@@ -23,46 +35,46 @@ class UserAdViewHistoryState(ActiveState):
         memory_duration: timedelta = timedelta(days=7),
     ):
         super().__init__("UserAdViewHistoryState")
-        self._ad_view_history: AdEventList = []
+        self._ad_view_history = RollingBuffer(memory_duration, np.int64)
         self._memory_duration = memory_duration
+        # event type -> number of events within the memory
+        # duration by advertiser id and by ad id
+        self._event_cnt_by_advertiser: dict[AdEventType, dict[str, int]] = {
+            event_type: {} for event_type in AdEventType
+        }
+        self._event_cnt_by_ad: dict[AdEventType, dict[str, int]] = {
+            event_type: {} for event_type in AdEventType
+        }
 
-    def view_ad(self, ad_event: AdEvent):
-        if ad_event[AdEventFields.EVENT_TYPE] != AdEventType.IMPRESSIONS:
+    def view_ad(self, offset: int):
+        event_log = get_ad_event_log()
+        if event_log.get_event_type(offset) != AdEventType.IMPRESSIONS:
             raise ValueError(
                 (
                     "AdEventType must be IMPRESSIONS to be viewed in "
                     "UserAdViewHistoryState"
                 )
             )
-        self._ad_view_history.append(ad_event)
+        self._ad_view_history.append(
+            event_log.get_value(offset, AdEventFields.EVENT_TIME),
+            offset
+        )
+        ad = event_log.get_ad(offset)
+        self._add_event_cnt(AdEventType.IMPRESSIONS, ad.owner.id, ad.id, 1)
 
     def get_event_cnt_on_advertiser(
         self,
         event_type: AdEventType,
         advertiser: Agent
     ) -> int:
-        cnt = 0
-        for event in self._ad_view_history:
-            if (
-                event[AdEventFields.AD].owner == advertiser
-                and event[AdEventFields.EVENT_TYPE] == event_type
-            ):
-                cnt += 1
-        return cnt
+        return self._event_cnt_by_advertiser[event_type].get(advertiser.id, 0)
 
     def get_event_cnt_on_ad(
         self,
         event_type: AdEventType,
         ad: Agent
     ) -> int:
-        cnt = 0
-        for event in self._ad_view_history:
-            if (
-                event[AdEventFields.AD] == ad
-                and event[AdEventFields.EVENT_TYPE] == event_type
-            ):
-                cnt += 1
-        return cnt
+        return self._event_cnt_by_ad[event_type].get(ad.id, 0)
 
     def get_ad_view_history_factor(self, ad: Agent) -> float:
         """
@@ -70,10 +82,9 @@ class UserAdViewHistoryState(ActiveState):
             whereas conversion ads reduce user sentiment to the particular
             ad.
         """
-        user_config = get_config().get_user_config()
-        intent_config = user_config["intent_config"]
-        awareness_improvement = intent_config["awareness_improvement"]
-        ad_fatigue = intent_config["ad_fatigue"]
+        intent_config = get_config().frozen.user_config.intent_config
+        awareness_improvement = intent_config.awareness_improvement
+        ad_fatigue = intent_config.ad_fatigue
         awareness_cnt = self.get_event_cnt_on_advertiser(
             AdEventType.IMPRESSIONS,
             ad.owner
@@ -85,16 +96,122 @@ class UserAdViewHistoryState(ActiveState):
         conversion_factor = max(0.5, 1 - conversions_cnt * ad_fatigue)
         return awareness_factor * conversion_factor
 
-    def _remove_old_ad_views(self):
-        today = Orchestrator.get_current_time(self)
-        time_threshold = today - self._memory_duration
-        # since ad views are stored in order of time
-        # we can remove ad views until we reach a
-        # view that is within the memory duration
-        while self._ad_view_history and self._ad_view_history[0][
-            AdEventFields.EVENT_TIME
-        ] < time_threshold:
-            self._ad_view_history.pop(0)
+    def get_event_cnt_by_advertiser(
+        self,
+        event_type: AdEventType
+    ) -> dict[str, int]:
+        """
+            Number of events per advertiser id, the dict
+            is kept up to date and is not to be modified
+        """
+        return self._event_cnt_by_advertiser[event_type]
+
+    def get_event_cnt_by_ad(self, event_type: AdEventType) -> dict[str, int]:
+        """
+            Number of events per ad id, the dict is kept
+            up to date and is not to be modified
+        """
+        return self._event_cnt_by_ad[event_type]
+
+    def get_ad_view_history_factors(
+        self,
+        ads: list[Agent],
+        owner_codes: np.ndarray,
+        owner_ids: list[str]
+    ) -> np.ndarray:
+        """
+            get_ad_view_history_factor for every ad, owner
+            codes are the codes of the owners of the ads
+            and owner ids the id of every owner code.
+        """
+        intent_config = get_config().frozen.user_config.intent_config
+        awareness_improvement = intent_config.awareness_improvement
+        ad_fatigue = intent_config.ad_fatigue
+        awareness_cnt_by_advertiser = self.get_event_cnt_by_advertiser(
+            AdEventType.IMPRESSIONS
+        )
+        awareness_cnt = np.array(
+            [
+                awareness_cnt_by_advertiser.get(owner_id, 0)
+                for owner_id in owner_ids
+            ],
+            dtype=np.int64
+        )[owner_codes]
+        conversions_cnt_by_ad = self.get_event_cnt_by_ad(
+            AdEventType.CONVERSIONS
+        )
+        if conversions_cnt_by_ad:
+            conversions_cnt = np.array(
+                [conversions_cnt_by_ad.get(ad.id, 0) for ad in ads],
+                dtype=np.int64
+            )
+        else:
+            conversions_cnt = np.zeros(len(ads), dtype=np.int64)
+        awareness_factor = np.minimum(
+            1.5,
+            1 + awareness_cnt * awareness_improvement
+        )
+        conversion_factor = np.maximum(
+            0.5,
+            1 - conversions_cnt * ad_fatigue
+        )
+        return awareness_factor * conversion_factor
+
+    @classmethod
+    def simulate_batch(cls, states: list["UserAdViewHistoryState"]):
+        """
+            Prune the view history of every due state
+            against a single read of the clock
+        """
+        current_time = Orchestrator.get_current_timestamp()
+        for state in states:
+            if state.should_update():
+                state._remove_old_ad_views(current_time)
+
+    def _remove_old_ad_views(self, current_time: int = None):
+        if current_time is None:
+            current_time = Orchestrator.get_current_timestamp()
+        expired_offsets = self._ad_view_history.pop_expired(current_time)
+        if len(expired_offsets) == 0:
+            return
+        event_log = get_ad_event_log()
+        event_type_codes = event_log.get_column(AdEventFields.EVENT_TYPE)[
+            expired_offsets
+        ]
+        advertiser_ids = event_log.get_advertiser_ids(
+            event_log.get_column(ADVERTISER)[expired_offsets]
+        )
+        ad_ids = event_log.get_ad_ids(
+            event_log.get_column(AdEventFields.AD)[expired_offsets]
+        )
+        for event_type_code, advertiser_id, ad_id in zip(
+            event_type_codes.tolist(), advertiser_ids, ad_ids
+        ):
+            self._add_event_cnt(
+                EVENT_TYPES[event_type_code],
+                advertiser_id,
+                ad_id,
+                -1
+            )
+
+    def _add_event_cnt(
+        self,
+        event_type: AdEventType,
+        advertiser_id: str,
+        ad_id: str,
+        cnt: int
+    ):
+        # ids without events are dropped, as if counted
+        # from the view history
+        for event_cnt, object_id in (
+            (self._event_cnt_by_advertiser[event_type], advertiser_id),
+            (self._event_cnt_by_ad[event_type], ad_id),
+        ):
+            object_cnt = event_cnt.get(object_id, 0) + cnt
+            if object_cnt:
+                event_cnt[object_id] = object_cnt
+            else:
+                del event_cnt[object_id]
 
     def update(self):
         super().update()
@@ -38,6 +38,8 @@ class UserIntentState(PassiveState):
                 AdCategory.EDUCATION: 0.1,
                 AdCategory.OTHER: 0.1,
             }
+        # bumped whenever the intents are set
+        self._version = 0
 
     def _validate_intent(self, category: AdCategory, intent: float):
         if intent < 0 or intent > 1:
@@ -62,6 +64,7 @@ class UserIntentState(PassiveState):
     def set_intent(self, category: AdCategory, intent: float):
         self._validate_intent(category, intent)
         self._intents[category] = intent
+        self._version += 1
 
     def get_intent(self, category: AdCategory) -> float:
         purchases = self._get_subject_purchases()
@@ -71,6 +74,14 @@ class UserIntentState(PassiveState):
         )
         return self._intents[category] * modifier
 
+    @property
+    def version(self) -> int:
+        """
+            Version of the set intents, purchases also
+            change the intents (see PurchasesState)
+        """
+        return self._version
+
     @property
     def intents(self) -> IntentValues:
         existing_intents = self._intents.copy()
@@ -80,6 +91,7 @@ class UserIntentState(PassiveState):
     def intents(self, intents: IntentValues):
         self._validate_intents(intents)
         self._intents = intents
+        self._version += 1
 
 
 def get_user_intents_baseline() -> IntentValues:
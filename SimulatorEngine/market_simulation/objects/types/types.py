@@ -2,9 +2,10 @@
     This file contains the definition of the types used in the simulation.
 """
 
+from simulator_base.util.rolling_buffer import RollingBuffer
 from enum import StrEnum
-from datetime import datetime
 from typing import Any
+import numpy as np
 
 
 class TargetingFilterFields(StrEnum):
@@ -32,7 +33,9 @@ class AdCategory(StrEnum):
 
 
 IntentValues = dict[AdCategory, float]
-PurchaseHistory = dict[AdCategory, list[datetime]]
+# purchase times are timestamps of the conversion events,
+# kept in rolling buffers as both the times and the items
+PurchaseHistory = dict[AdCategory, RollingBuffer]
 
 
 class AppBehaviorFieldState(StrEnum):
@@ -65,6 +68,11 @@ class BiddingStrategy(StrEnum):
     COST_CAP = "cost_cap"
 
 
+class PacingMode(StrEnum):
+    BID_SHADING = "bid_shading"
+    THROTTLING = "throttling"
+
+
 class AuctionType(StrEnum):
     GENERALIZED_FIRST_PRICE = "generalized_first_price"
     GENERALIZED_SECOND_PRICE = "generalized_second_price"
@@ -114,7 +122,17 @@ class AuctionResultFields(StrEnum):
     PREDICTED_PROBABILITY = "predicted_probability"
 
 
-AuctionResults = dict[AuctionResultFields, any]
+# auction results are a record array of the ranked ads
+AUCTION_RESULT_DTYPE = np.dtype([
+    (AuctionResultFields.AD.value, object),
+    (AuctionResultFields.BID.value, np.float64),
+    (AuctionResultFields.PRICE.value, np.float64),
+    (AuctionResultFields.PACED_BID.value, np.float64),
+    (AuctionResultFields.TRUE_PROBABILITY.value, np.float64),
+    (AuctionResultFields.PREDICTED_PROBABILITY.value, np.float64),
+])
+
+AuctionResults = np.ndarray
 
 
 class ObjectSubType(StrEnum):
@@ -142,6 +160,7 @@ class ObjectSubType(StrEnum):
     AD_OUTCOME_STATE = "AdOutcomeState"
     # State - Env
     ALL_ACTIVE_ADS_STATE = "AllActiveAdsState"
+    ALL_ADS_PACING_STATE = "AllAdsPacingState"
     # Effect - env
     OVER_CALIBRATION_EFFECT = "OverCalibrationEffect"
     SURFACE_DOWN_EFFECT = "SurfaceDownEffect"
@@ -157,6 +176,7 @@ class ObjectSubType(StrEnum):
     AD_METRICS = "AdMetrics"
     # Metrics - environment
     SURFACE_METRICS = "SurfaceMetrics"
+    RANKING_CACHE_METRICS = "RankingCacheMetrics"
     # Environment - Surface
     SURFACE_ENVIRONMENT = "SurfaceEnvironment"
     ALL_ADS_ENVIRONMENT = "AllAdsEnvironment"
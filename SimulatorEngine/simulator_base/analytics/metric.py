@@ -13,6 +13,7 @@
 
 from simulator_base.config.global_config import get_config
 from simulator_base.object_base.simulation_object import SimulationObject
+from simulator_base.object_base.independent_object import IndependentObject
 from simulator_base.orchestrator.orchestrator import (
     Orchestrator,
     get_orchestrator,
@@ -20,9 +21,9 @@ from simulator_base.orchestrator.orchestrator import (
 from abc import abstractmethod
 from typing import final, List
 from datetime import timedelta
+import numpy as np
 import pandas as pd
 import os
-import random
 
 
 class Metric(SimulationObject):
@@ -61,10 +62,16 @@ class Metric(SimulationObject):
     @final
     def attach(self, obj: SimulationObject):
         """
-            Attach the metric to an object.
+            Attach the metric to an object. The metric
+            is paused and unpaused along with agents and
+            environments.
         """
         self._subject = obj
+        if isinstance(obj, IndependentObject):
+            obj.associate('metrics', self)
         self.start()
+        if obj.paused:
+            self.pause()
 
     # ================= System Accessible Public Methods ==================
 
@@ -117,7 +124,7 @@ class Metric(SimulationObject):
 
     def _setup_metric(self, computation_config: dict):
         calculation_rate = computation_config['calculation_rate']
-        if random.random() < calculation_rate:
+        if self.random_stream.random() < calculation_rate:
             self._should_calculate = True
         else:
             self._should_calculate = False
@@ -142,6 +149,21 @@ class Metric(SimulationObject):
             minutes=aggregation_window_raw_min
         )
 
+    @staticmethod
+    def _accumulate(*values: np.ndarray):
+        """
+            Sum of the values added one at a time, each
+            array from its last value to its first, in the
+            order of the arrays. This is how the events are
+            summed walking back from the latest one, so the
+            metrics are written the same, 0 if nothing is
+            summed.
+        """
+        values = np.concatenate([array[::-1] for array in values])
+        if not len(values):
+            return 0
+        return np.cumsum(values)[-1].item()
+
     def _calculate(self):
         results = [
             self._aggregation_window
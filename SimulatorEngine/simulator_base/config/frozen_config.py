@@ -0,0 +1,122 @@
+"""
+    ============== Frozen Config =======================
+    Immutable, attribute accessed view of a loaded
+    yaml config. Configs are compiled into a frozen
+    config once upon setup (and upon snapshot load)
+    so that hot paths read plain attributes instead
+    of walking nested dicts and rebuilding values.
+
+    Dict style access (config['key'], config.get)
+    is still supported for compatibility.
+    ====================================================
+"""
+
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+
+class ConfigError(Exception):
+    """
+        A config field is missing or of the wrong type
+    """
+
+
+class FrozenConfig(Mapping):
+    __slots__ = ("_values",)
+
+    def __init__(self, values: Mapping):
+        object.__setattr__(
+            self,
+            "_values",
+            {key: freeze(value) for key, value in values.items()}
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Config field {name} not found")
+
+    def __setattr__(self, name: str, value: Any):
+        raise Exception(f"Config is immutable, cannot set {name}")
+
+    def __delattr__(self, name: str):
+        raise Exception(f"Config is immutable, cannot delete {name}")
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"FrozenConfig({self._values!r})"
+
+    def __reduce__(self):
+        return (FrozenConfig, (thaw(self),))
+
+    def validate(self, required_fields: dict[str, tuple]):
+        """
+            Check that every dotted path in required
+            fields exists and is of one of the types
+        """
+        for path, types in required_fields.items():
+            value = self
+            for key in path.split("."):
+                if not isinstance(value, Mapping) or key not in value:
+                    raise ConfigError(f"Config field {path} is missing")
+                value = value[key]
+            # bool is an int, only accept it when asked for
+            if not isinstance(value, types) \
+               or (isinstance(value, bool) and bool not in types):
+                raise ConfigError(
+                    f"Config field {path} should be of type "
+                    f"{' or '.join(t.__name__ for t in types)}, "
+                    f"got {value!r}"
+                )
+
+
+def with_defaults(values: Mapping, defaults: dict[str, Any]) -> dict:
+    """
+        Copy of the nested values with every dotted
+        path of defaults they leave out filled in,
+        the values themselves are not modified
+    """
+    values = dict(values)
+    for path, default in defaults.items():
+        section = values
+        *keys, field = path.split(".")
+        for key in keys:
+            subsection = section.get(key, {})
+            if not isinstance(subsection, Mapping):
+                break
+            section[key] = dict(subsection)
+            section = section[key]
+        else:
+            section.setdefault(field, default)
+    return values
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, FrozenConfig):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenConfig(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """
+        Turn a frozen config back into plain dicts
+        and lists
+    """
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
@@ -4,14 +4,23 @@
 
 
 import yaml
+from .frozen_config import FrozenConfig
 from datetime import date, timedelta, datetime
 from uuid import uuid4
 import random
 import numpy as np
 from typing import Optional
+import math
 import os
 import pickle
 
+# fields read on hot paths, checked upon compilation
+REQUIRED_FIELDS = {
+    "simulation_config.tick_interval_seconds": (int, float),
+    "simulation_config.start_date": (str,),
+    "debug_config.output_warning_level": (str,),
+}
+
 
 class GlobalConfig:
     _instance = None
@@ -102,11 +111,14 @@ class GlobalConfig:
             )
         with open(global_config_pickle_path, 'rb') as f:
             cls._instance = pickle.load(f)
+        cls._instance.compile()
         cls._instance.load_random_state(global_config_path)
 
     def save_random_state(self, path):
         # This is to ensure that random numbers are continuously
-        # generated from the same sequence
+        # generated from the same sequence. Objects draw from their
+        # own random streams which are saved along with them, this
+        # covers code still using the global random modules
         random_state = random.getstate()
         np_random_state = np.random.get_state()
         random_state_path = os.path.join(path, 'random_state.pkl')
@@ -154,6 +166,38 @@ class GlobalConfig:
                         sort_keys=False,
                         default_flow_style=False
                     )
+                self.compile()
+
+    def compile(self):
+        """
+            Compile the loaded sections and the values
+            derived from them into a frozen config
+        """
+        debug_config = self._debug_config
+        tick_interval = timedelta(
+            seconds=self._simulation_config['tick_interval_seconds']
+        )
+        print_interval = timedelta(
+            hours=debug_config.get('time_indicator_print_interval', 1)
+        )
+        frozen = FrozenConfig({
+            'simulation_config': self._simulation_config,
+            'analytics_config': self._analytics_config,
+            'command_config': self._command_config,
+            'snapshot_config': self._snapshot_config,
+            'debug_config': debug_config,
+            'tick_interval': tick_interval,
+            'ticks_per_print': math.ceil(print_interval / tick_interval),
+        })
+        frozen.validate(REQUIRED_FIELDS)
+        self._frozen = frozen
+
+    @property
+    def frozen(self) -> FrozenConfig:
+        """
+            Compiled, immutable view of the config
+        """
+        return self._frozen
 
     @property
     def simulation_config(self) -> dict:
@@ -186,11 +230,10 @@ class GlobalConfig:
         return self._simulation_config.get(field, '')
 
     def get_tick_interval_seconds(self) -> timedelta:
-        tick_interval = self.return_str_field('tick_interval_seconds')
-        return timedelta(seconds=tick_interval)
+        return self._frozen.tick_interval
 
     def get_output_warning_level(self) -> str:
-        return self._debug_config['output_warning_level']
+        return self._frozen.debug_config.output_warning_level
 
     def get_start_date(self) -> datetime:
         date_str = self.return_str_field('start_date')
@@ -208,6 +251,14 @@ class GlobalConfig:
             return self._analytics_config[field]
         return None
 
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # compiled again upon loading
+        state = self.__dict__.copy()
+        state.pop('_frozen', None)
+        return state
+
 
 def get_config() -> GlobalConfig:
     """
@@ -17,6 +17,7 @@
 
 from .effect_base import EffectBase
 from ..orchestrator.orchestrator import Orchestrator
+from ..util.timestamp import to_duration
 from abc import abstractmethod
 from datetime import timedelta
 from typing import final
@@ -32,6 +33,7 @@ class ActiveEffect(EffectBase):
         super().__init__(effect_type, application_time_interval)
         self._duration = duration
         self._target_end_time = None
+        self._target_end_timestamp = None
         self._simulate_on_first_tick = True
 
     @final
@@ -40,12 +42,15 @@ class ActiveEffect(EffectBase):
         if self._duration is not None:
             current_time = Orchestrator.get_current_time(self.subject)
             self._target_end_time = current_time + self._duration
+            self._target_end_timestamp = \
+                Orchestrator.get_current_timestamp() \
+                + to_duration(self._duration)
 
     @final
     def should_remove(self) -> bool:
-        if self._target_end_time is not None:
-            if Orchestrator.get_current_time(self) > \
-               self._target_end_time:
+        if self._target_end_timestamp is not None:
+            if Orchestrator.get_current_timestamp() > \
+               self._target_end_timestamp:
                 return True
         return False
 
@@ -16,6 +16,7 @@
 """
 
 from simulator_base.orchestrator.orchestrator import Orchestrator
+from simulator_base.util.timestamp import to_timestamp
 from .effect_base import EffectBase
 from datetime import datetime, timedelta
 from typing import final
@@ -32,6 +33,9 @@ class PassiveEffect(EffectBase):
         self._effect_start_time = effect_start_time
         self._effect_end_time = effect_start_time + duration \
             if duration else None
+        self._effect_start_timestamp = to_timestamp(effect_start_time)
+        self._effect_end_timestamp = to_timestamp(self._effect_end_time) \
+            if self._effect_end_time else None
         self._simulate_on_first_tick = True
 
     # Custom Evaluation function would be required
@@ -40,10 +44,10 @@ class PassiveEffect(EffectBase):
             Check if the effect can be applied
             to the object.
         """
-        current_time = Orchestrator.get_current_time(self.subject)
-        if current_time > self._effect_start_time and \
-                (self._effect_end_time is None or
-                    current_time < self._effect_end_time):
+        current_time = Orchestrator.get_current_timestamp()
+        if current_time > self._effect_start_timestamp and \
+                (self._effect_end_timestamp is None or
+                    current_time < self._effect_end_timestamp):
             return True
         return False
 
@@ -7,14 +7,19 @@
     =======================================
 """
 
-import numpy as np
+from ..config.global_config import GlobalConfig
+from .random_stream import RandomStream
 
 
 class IDGenerator:
     def __init__(self):
         self._id_counter = 0
+        self._random_stream = RandomStream(
+            GlobalConfig.get_random_seed(),
+            "IDGenerator"
+        )
 
     def next_id(self, prefix: str = "") -> str:
         self._id_counter += 1
-        base = np.random.randint(1e9)
-        return f"{prefix}_{base}_{self._id_counter}"
\ No newline at end of file
+        base = self._random_stream.randint(0, 10 ** 9 - 1)
+        return f"{prefix}_{base}_{self._id_counter}"
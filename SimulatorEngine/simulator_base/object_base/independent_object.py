@@ -124,12 +124,18 @@ class IndependentObject(SimulationObject):
         for _, items in self._objects.items():
             for _, item in items.items():
                 item.pause()
+        # attached metrics have nothing to compute while
+        # the object is paused, they are not scheduled either
+        for metric in self.get_associated_objects('metrics'):
+            metric.pause()
 
     @final
     def before_unpause(self):
         for _, items in self._objects.items():
             for _, item in items.items():
                 item.unpause()
+        for metric in self.get_associated_objects('metrics'):
+            metric.unpause()
 
     @final
     def validate_object(self):
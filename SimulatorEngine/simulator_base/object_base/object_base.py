@@ -16,6 +16,7 @@
 """
 
 from ..config.global_config import GlobalConfig
+from .random_stream import RandomStream
 from abc import abstractmethod, ABC
 from typing import final
 from datetime import timedelta, timezone
@@ -35,7 +36,7 @@ class ObjectBase(ABC):
             paused=True,
             tick_count=0,
             simulation_count=0,
-            tick_since_last_simulation=None,
+            last_simulation_tick_count=None,
             simulation_interval_ticks=1,
             object_timezone=None,
             simulate_on_first_tick=False,
@@ -121,6 +122,19 @@ class ObjectBase(ABC):
     def object_subtype(self) -> str:
         return self._object_subtype
 
+    @property
+    def random_stream(self) -> RandomStream:
+        """
+            Random number stream of this object, derived
+            from the simulation seed and the object id
+        """
+        if self._random_stream is None:
+            self._random_stream = RandomStream(
+                GlobalConfig.get_random_seed(),
+                self.id
+            )
+        return self._random_stream
+
     @property
     def paused(self) -> bool:
         """
@@ -135,8 +149,7 @@ class ObjectBase(ABC):
             cycle for current object, can be different
             than global default.
         """
-        global_config = GlobalConfig.get_instance()
-        tick_interval = global_config.get_tick_interval_seconds()
+        tick_interval = GlobalConfig.get_instance().frozen.tick_interval
         return tick_interval * self._simulation_interval_ticks
 
     @simulation_interval.setter
@@ -146,11 +159,19 @@ class ObjectBase(ABC):
             simulation frequency. Since most objects do not
             make decision on the smallest time interval.
         """
-        global_config = GlobalConfig.get_instance()
-        tick_interval = global_config.get_tick_interval_seconds()
+        tick_interval = GlobalConfig.get_instance().frozen.tick_interval
         self._simulation_interval_ticks = math.ceil(
             time_interval.total_seconds() / tick_interval.total_seconds()
         )
+        self.reschedule()
+
+    @property
+    def tick_count(self) -> int:
+        """
+            Number of ticks this object has been
+            active for, paused ticks are not counted.
+        """
+        return self._tick_count
 
     @property
     def object_lifetime(self) -> timedelta:
@@ -158,9 +179,8 @@ class ObjectBase(ABC):
             How long this object has been active in
             the simulation, paused time is not counted.
         """
-        global_config = GlobalConfig.get_instance()
-        tick_interval = global_config.get_tick_interval_seconds()
-        return tick_interval * self._tick_count
+        tick_interval = GlobalConfig.get_instance().frozen.tick_interval
+        return tick_interval * self.tick_count
 
     @property
     def object_timezone(self) -> timezone:
@@ -199,6 +219,7 @@ class ObjectBase(ABC):
         """
         self.before_pause()
         self._paused = True
+        self.reschedule()
 
     @final
     def unpause(self):
@@ -207,6 +228,7 @@ class ObjectBase(ABC):
         """
         self.before_unpause()
         self._paused = False
+        self.reschedule()
 
     def destroy(self):
         """
@@ -220,31 +242,78 @@ class ObjectBase(ABC):
 
     # ============= System Accessible Public Functions ============
 
+    @property
+    def next_simulation_tick_count(self) -> int:
+        """
+            The tick count at which this object
+            simulates next.
+        """
+        interval_ticks = max(self._simulation_interval_ticks, 1)
+        if self._last_simulation_tick_count is None:
+            if self._simulate_on_first_tick:
+                return self._tick_count
+            return self._tick_count + interval_ticks
+        return self._last_simulation_tick_count + interval_ticks
+
+    @classmethod
+    def simulate_batch(cls, objects: list["ObjectBase"]):
+        """
+            ======== May Override ============
+            Simulate every object of this class that
+            is due on the current tick in one call, in
+            round robin order. Classes that override it
+            are simulated as a single group instead of
+            one object at a time, which lets them hoist
+            shared lookups out of the loop.
+
+            The group runs at the position of its first
+            due object. Overrides must behave as calling
+            simulate on each object in turn, and should
+            not pause other objects of the same class.
+            ==================================
+        """
+        for obj in objects:
+            obj.simulate()
+
+    def reschedule(self):
+        """
+            Called whenever the object gets paused,
+            unpaused or has its simulation interval
+            changed, so that whoever drives the ticks
+            can move the next due time of the object.
+        """
+        pass
+
     @final
     def tick(self):
         """
-            This function is called by the orchestrator
-            to tick on the object.
+            Tick on the object once, used for objects
+            that are not driven by the orchestrator
+            scheduler and need to be ticked every time.
         """
         if not self._paused:
-            if (
-                self._tick_since_last_simulation is None
-                and self._simulate_on_first_tick
-            ) or (
-                self._tick_since_last_simulation is not None
-                and self._tick_since_last_simulation >=
-                    self._simulation_interval_ticks
-            ):
+            if self._tick_count >= self.next_simulation_tick_count:
+                self._last_simulation_tick_count = self._tick_count
                 self.simulate()
                 self._simulation_count += 1
-                self._tick_since_last_simulation = 1
-            else:
-                if self._tick_since_last_simulation is None:
-                    self._tick_since_last_simulation = 1
-                else:
-                    self._tick_since_last_simulation += 1
+            elif self._last_simulation_tick_count is None:
+                self._last_simulation_tick_count = self._tick_count
             self._tick_count += 1
 
+    @final
+    def skip_ticks(self, tick_cnt: int):
+        """
+            Count ticks that were skipped over by the
+            orchestrator without simulating, keeps the
+            lifetime of objects ticked through tick()
+            in line with the clock.
+        """
+        if not self._paused and tick_cnt > 0:
+            if self._last_simulation_tick_count is None \
+               and not self._simulate_on_first_tick:
+                self._last_simulation_tick_count = self._tick_count
+            self._tick_count += tick_cnt
+
     # ============= Private Helper Methods =================
 
     @final
@@ -253,7 +322,7 @@ class ObjectBase(ABC):
         paused: bool = True,
         tick_count: int = 0,
         simulation_count: int = 0,
-        tick_since_last_simulation: int = None,
+        last_simulation_tick_count: int = None,
         simulation_interval_ticks: int = 1,
         object_timezone: timezone = None,
         simulate_on_first_tick: bool = False,
@@ -261,7 +330,13 @@ class ObjectBase(ABC):
         self._paused = paused
         self._tick_count = tick_count
         self._simulation_count = simulation_count
-        self._tick_since_last_simulation = tick_since_last_simulation
+        self._last_simulation_tick_count = last_simulation_tick_count
         self._simulation_interval_ticks = simulation_interval_ticks
         self._timezone = object_timezone
         self._simulate_on_first_tick = simulate_on_first_tick
+        self._random_stream = None
+        # bookkeeping of the orchestrator scheduler
+        self._due_tick = None
+        self._last_counted_tick = None
+        self._last_simulated_tick = None
+        self._schedule_order = None
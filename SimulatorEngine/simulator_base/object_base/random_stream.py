@@ -0,0 +1,193 @@
+"""
+    =========== Random Stream ==============
+    Every object draws its random numbers
+    from its own numpy Generator, seeded
+    from the simulation seed and the id
+    of the object. Draws no longer depend
+    on the order in which objects are
+    simulated, and the state of a stream
+    is saved along with its object.
+
+    Uniform and normal draws are generated
+    in blocks and handed out one at a time
+    to avoid a numpy call per draw.
+    ========================================
+"""
+
+from bisect import bisect
+from itertools import accumulate
+from typing import Any, Optional, Sequence
+import hashlib
+import math
+import numpy as np
+
+# number of uniform / normal draws generated at once
+BLOCK_SIZE = 64
+
+
+def _key_to_int(key: str) -> int:
+    # stable across processes, unlike hash()
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class RandomStream:
+    def __init__(self, seed: int, key: str):
+        seed_sequence = np.random.SeedSequence(
+            entropy=seed,
+            spawn_key=(_key_to_int(key),)
+        )
+        self._generator = np.random.Generator(np.random.PCG64(seed_sequence))
+        self._uniform_block: list[float] = []
+        self._uniform_index = 0
+        self._normal_block: list[float] = []
+        self._normal_index = 0
+
+    @property
+    def generator(self) -> np.random.Generator:
+        """
+            The underlying generator, for vectorized
+            draws
+        """
+        return self._generator
+
+    def position(self) -> tuple:
+        """
+            Where the stream is at, changes with
+            every draw
+        """
+        return (
+            self._generator.bit_generator.state["state"]["state"],
+            self._uniform_index,
+            self._normal_index,
+        )
+
+    def checkpoint(self) -> tuple:
+        """
+            State of the stream, to rewind it to
+        """
+        return (
+            self._generator.bit_generator.state,
+            self._uniform_block,
+            self._uniform_index,
+            self._normal_block,
+            self._normal_index,
+        )
+
+    def rewind(self, checkpoint: tuple):
+        """
+            Put the stream back to a checkpoint, the
+            draws made since are drawn again
+        """
+        (
+            state,
+            self._uniform_block,
+            self._uniform_index,
+            self._normal_block,
+            self._normal_index,
+        ) = checkpoint
+        self._generator.bit_generator.state = state
+
+    # ============= User Accessible Public Methods ==============
+
+    def random(self) -> float:
+        """
+            Uniform draw in [0, 1)
+        """
+        index = self._uniform_index
+        if index == len(self._uniform_block):
+            self._uniform_block = self._generator.random(BLOCK_SIZE).tolist()
+            index = 0
+        self._uniform_index = index + 1
+        return self._uniform_block[index]
+
+    def randoms(self, size: int) -> np.ndarray:
+        """
+            The next size uniform draws in [0, 1), same
+            values as calling random size times
+        """
+        values = []
+        while len(values) < size:
+            index = self._uniform_index
+            if index == len(self._uniform_block):
+                self._uniform_block = self._generator.random(
+                    BLOCK_SIZE
+                ).tolist()
+                index = 0
+            end = min(index + size - len(values), len(self._uniform_block))
+            values.extend(self._uniform_block[index:end])
+            self._uniform_index = end
+        return np.array(values, dtype=np.float64)
+
+    def standard_normal(self) -> float:
+        index = self._normal_index
+        if index == len(self._normal_block):
+            self._normal_block = self._generator.standard_normal(
+                BLOCK_SIZE
+            ).tolist()
+            index = 0
+        self._normal_index = index + 1
+        return self._normal_block[index]
+
+    def standard_normals(self, size: int) -> np.ndarray:
+        """
+            The next size standard normal draws, same
+            values as calling standard_normal size times
+        """
+        values = []
+        while len(values) < size:
+            index = self._normal_index
+            if index == len(self._normal_block):
+                self._normal_block = self._generator.standard_normal(
+                    BLOCK_SIZE
+                ).tolist()
+                index = 0
+            end = min(index + size - len(values), len(self._normal_block))
+            values.extend(self._normal_block[index:end])
+            self._normal_index = end
+        return np.array(values, dtype=np.float64)
+
+    def uniform(self, low: float, high: float) -> float:
+        return low + (high - low) * self.random()
+
+    def gauss(self, mu: float, sigma: float) -> float:
+        return mu + sigma * self.standard_normal()
+
+    def normal(self, loc: float = 0.0, scale: float = 1.0) -> float:
+        return loc + scale * self.standard_normal()
+
+    def lognormal(self, mean: float = 0.0, sigma: float = 1.0) -> float:
+        return math.exp(mean + sigma * self.standard_normal())
+
+    def randint(self, low: int, high: int) -> int:
+        """
+            Integer in [low, high], both ends included
+        """
+        return int(self._generator.integers(low, high, endpoint=True))
+
+    def choice(self, population: Sequence) -> Any:
+        return population[int(self.random() * len(population))]
+
+    def choices(
+        self,
+        population: Sequence,
+        weights: Optional[Sequence[float]] = None,
+        k: int = 1
+    ) -> list:
+        if weights is None:
+            return [self.choice(population) for _ in range(k)]
+        cum_weights = list(accumulate(weights))
+        total = cum_weights[-1]
+        last = len(population) - 1
+        return [
+            population[bisect(cum_weights, self.random() * total, 0, last)]
+            for _ in range(k)
+        ]
+
+    def sample(self, population: Sequence, k: int) -> list:
+        indices = self._generator.choice(
+            len(population),
+            size=k,
+            replace=False
+        )
+        return [population[index] for index in indices]
@@ -23,6 +23,13 @@ class SimulationObject(ObjectBase):
         super().__init__(object_type, object_subtype)
         orchestrator.add_object(self)
 
+    @property
+    def tick_count(self) -> int:
+        return get_orchestrator().get_tick_count(self)
+
+    def reschedule(self):
+        get_orchestrator().reschedule_object(self)
+
     def destroy(self):
         """
         """
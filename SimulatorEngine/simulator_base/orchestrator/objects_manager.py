@@ -2,14 +2,147 @@
     ========= Objects Manager =========
     Manages all participating objects
     in the simulation.
+
+    Objects are kept per type in dense
+    lists, removal leaves a tombstone
+    that is compacted away once there
+    are enough of them, and an id index
+    makes lookups constant time. The
+    slots of the live objects are
+    indexed lazily while there are
+    tombstones, and kept up to date
+    in place until compaction.
     ==================================
 """
 
 from ..object_base.object_base import ObjectBase
-from typing import List
+from typing import Callable, Collection, Iterator, List, Optional, Sequence
+from itertools import chain, islice
+from functools import partial
+from array import array
+from bisect import bisect_left
+from operator import attrgetter
 import heapq
 from datetime import datetime
 
+# compact a type's list once it has at least this many
+# tombstones and they make up half of the list
+MIN_TOMBSTONES_TO_COMPACT = 64
+
+
+class RoundRobinView(Sequence):
+    """
+        Read only view of the objects of one type,
+        starting from the round robin offset and
+        wrapping around, without copying the list.
+        Tombstones are skipped, and objects added
+        while iterating are not part of the view.
+
+        When the list has tombstones, get_live_slots
+        gives the slots of the live objects in order,
+        so that indexing is constant time. It is only
+        called once the view is indexed or does not
+        start from the first object.
+    """
+    def __init__(
+        self,
+        objects: List[Optional[ObjectBase]],
+        live_cnt: int,
+        offset: int = 0,
+        get_live_slots: Optional[Callable[[], Sequence[int]]] = None
+    ):
+        self._objects = objects
+        self._size = len(objects)
+        self._live_cnt = live_cnt
+        self._offset = offset % live_cnt if live_cnt > 0 else 0
+        self._get_live_slots = get_live_slots
+
+    def __len__(self) -> int:
+        return self._live_cnt
+
+    def __iter__(self) -> Iterator[ObjectBase]:
+        if self._live_cnt == 0:
+            return iter(())
+        start = self._start_slot()
+        if start == 0:
+            objects = islice(self._objects, 0, self._size)
+        else:
+            objects = chain(
+                islice(self._objects, start, self._size),
+                islice(self._objects, 0, start)
+            )
+        if self._live_cnt == self._size:
+            return objects
+        return (obj for obj in objects if obj is not None)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += self._live_cnt
+        if index < 0 or index >= self._live_cnt:
+            raise IndexError("round robin view index out of range")
+        if self._live_cnt == self._size:
+            return self._objects[(self._offset + index) % self._size]
+        return self._objects[
+            self._get_live_slots()[(self._offset + index) % self._live_cnt]
+        ]
+
+    def _start_slot(self) -> int:
+        """
+            Slot in the backing list of the object
+            at the round robin offset
+        """
+        if self._offset == 0 or self._live_cnt == self._size:
+            return self._offset
+        return self._get_live_slots()[self._offset]
+
+
+class ActiveObjectsView(Collection):
+    """
+        Read only view of the active objects of one
+        type, kept per subtype in schedule order. It
+        merges the subtypes in schedule order, starts
+        from the round robin offset and wraps around,
+        without copying the objects.
+
+        Objects must not be paused, unpaused, added or
+        removed while iterating.
+    """
+    def __init__(
+        self,
+        active_objects: List[dict[str, ObjectBase]],
+        offset: int = 0
+    ):
+        self._active_objects = active_objects
+        self._live_cnt = sum(len(objects) for objects in active_objects)
+        self._offset = offset % self._live_cnt if self._live_cnt > 0 else 0
+
+    def __len__(self) -> int:
+        return self._live_cnt
+
+    def __contains__(self, obj) -> bool:
+        return any(
+            objects.get(getattr(obj, 'id', None)) is obj
+            for objects in self._active_objects
+        )
+
+    def __iter__(self) -> Iterator[ObjectBase]:
+        if self._offset == 0:
+            return self._ordered()
+        return chain(
+            islice(self._ordered(), self._offset, None),
+            islice(self._ordered(), self._offset)
+        )
+
+    def _ordered(self) -> Iterator[ObjectBase]:
+        if len(self._active_objects) == 1:
+            return iter(self._active_objects[0].values())
+        return heapq.merge(
+            *(objects.values() for objects in self._active_objects),
+            key=attrgetter('_schedule_order')
+        )
+
 
 class ObjectsManager:
     def __init__(self):
@@ -20,8 +153,9 @@ class ObjectsManager:
         # executed immediately
         self._scheduled_commands: List[tuple[datetime, callable]] = []
         # this is an ordered list of objects
-        # based on object type
-        self._objects: dict[str, List[ObjectBase]] = {
+        # based on object type, removed objects
+        # are left as None until compaction
+        self._objects: dict[str, List[Optional[ObjectBase]]] = {
             "Environment": [],
             "Event": [],
             "Effect": [],
@@ -41,6 +175,10 @@ class ObjectsManager:
         }
         heapq.heapify(self._scheduled_commands)
         self._internal_round_robin_index = 0
+        # insertion order of the objects, used to order
+        # the objects that are due on the same tick
+        self._next_schedule_order = 0
+        self._setup_index()
         # for rehydration purposes only
         self._total_object_cnt = None
 
@@ -49,13 +187,7 @@ class ObjectsManager:
         """
             Check if any object exists in the manager
         """
-        return len(self._objects["Environment"]) == 0 and \
-            len(self._objects["Event"]) == 0 and \
-            len(self._objects["Effect"]) == 0 and \
-            len(self._objects["Agent"]) == 0 and \
-            len(self._objects["Action"]) == 0 and \
-            len(self._objects["State"]) == 0 and \
-            len(self._objects["Metric"]) == 0
+        return len(self._object_index) == 0
 
     def add_scheduled_command(self, command: tuple[datetime, callable]):
         """
@@ -66,14 +198,47 @@ class ObjectsManager:
     def add_object(self, obj: ObjectBase):
         if obj.object_type == "CommandReader":
             self._command_reader = obj
-        else:
-            self._objects[obj.object_type].append(obj)
+        elif obj.id not in self._object_index:
+            objects = self._objects[obj.object_type]
+            self._object_slots[obj.id] = len(objects)
+            self._object_index[obj.id] = obj
+            live_slots = self._live_slots[obj.object_type]
+            if live_slots is not None:
+                live_slots.append(len(objects))
+            objects.append(obj)
+            if obj.object_type == "Environment" \
+               and obj.object_subtype not in self._environment_index:
+                self._environment_index[obj.object_subtype] = obj
+            # objects re-added upon rehydration keep their order
+            if obj._schedule_order is None:
+                obj._schedule_order = self._next_schedule_order
+                self._next_schedule_order += 1
+            self.update_active(obj)
 
     def remove_object(self, obj: ObjectBase):
-        self._objects[obj.object_type] = [
-                o for o in self._objects[obj.object_type]
-                if o.id != obj.id
-            ]
+        slot = self._object_slots.pop(obj.id, None)
+        if slot is None:
+            return
+        del self._object_index[obj.id]
+        self._remove_active(obj)
+        objects = self._objects[obj.object_type]
+        objects[slot] = None
+        self._tombstone_cnt[obj.object_type] += 1
+        live_slots = self._live_slots[obj.object_type]
+        if live_slots is not None:
+            # slots are in order, deleting shifts the array in place
+            del live_slots[bisect_left(live_slots, slot)]
+        if self._environment_index.get(obj.object_subtype) is obj:
+            del self._environment_index[obj.object_subtype]
+            for environment in objects:
+                if environment is not None \
+                   and environment.object_subtype == obj.object_subtype:
+                    self._environment_index[obj.object_subtype] = environment
+                    break
+        tombstone_cnt = self._tombstone_cnt[obj.object_type]
+        if tombstone_cnt >= MIN_TOMBSTONES_TO_COMPACT \
+           and tombstone_cnt * 2 >= len(objects):
+            self._compact(obj.object_type)
 
     def get_object(self, object_type: str, object_id: str):
         """
@@ -81,15 +246,49 @@ class ObjectsManager:
         """
         if object_type not in self._objects:
             raise Exception(f"Object type {object_type} not found")
-        for obj in self._objects[object_type]:
-            if obj.id == object_id:
-                return obj
-        return None
+        obj = self._object_index.get(object_id)
+        if obj is None or obj.object_type != object_type:
+            return None
+        return obj
+
+    def update_active(self, obj: ObjectBase):
+        """
+            Move the object between the active and the
+            paused objects, called whenever it is paused
+            or unpaused.
+        """
+        if self._object_index.get(obj.id) is not obj:
+            return
+        if obj.paused:
+            self._remove_active(obj)
+        else:
+            self._add_active(obj)
+
+    def get_active_objects(
+        self,
+        object_type: str,
+        object_subtype: Optional[str] = None
+    ) -> ActiveObjectsView:
+        """
+            Objects of the type that are not paused, only of
+            the subtype if provided, in round robin order
+        """
+        if object_subtype is not None:
+            subtypes = [object_subtype]
+        else:
+            subtypes = list(self._active_objects[object_type])
+        return ActiveObjectsView(
+            [
+                self._get_active_subtype(object_type, subtype)
+                for subtype in subtypes
+            ],
+            self._internal_round_robin_index
+        )
 
     def get_round_robin_ordered_objects(
         self,
         object_type
-    ) -> List[ObjectBase]:
+    ) -> RoundRobinView:
         """
             This function returns the objects
             in a round robin fashion, ensuring
@@ -97,12 +296,32 @@ class ObjectsManager:
             earlier objects
         """
         objects = self._objects[object_type]
-        if len(objects) == 0:
-            return []
+        return RoundRobinView(
+            objects,
+            len(objects) - self._tombstone_cnt[object_type],
+            self._internal_round_robin_index,
+            partial(self._get_live_slots, object_type)
+        )
+
+    def get_round_robin_order_key(
+        self,
+        object_type
+    ) -> Callable[[ObjectBase], object]:
+        """
+            Sort key that puts any subset of the objects
+            in the same order as get_round_robin_ordered_objects
+        """
         index = self._internal_round_robin_index
-        object_round_robin_index = index % len(objects)
-        return objects[object_round_robin_index:] + \
-            objects[:object_round_robin_index]
+        live_cnt = len(self._objects[object_type]) \
+            - self._tombstone_cnt[object_type]
+        if live_cnt == 0 or index % live_cnt == 0:
+            return attrgetter('_schedule_order')
+        objects = self.get_round_robin_ordered_objects(object_type)
+        pivot = objects[0]._schedule_order
+        return lambda obj: (
+            obj._schedule_order < pivot,
+            obj._schedule_order
+        )
 
     def get_scheduled_commands(
         self,
@@ -122,73 +341,74 @@ class ObjectsManager:
                 break
         return scheduled_commands
 
+    def get_next_scheduled_command_time(self) -> Optional[datetime]:
+        """
+            Time of the earliest scheduled command,
+            None if there is no scheduled command
+        """
+        if len(self._scheduled_commands) == 0:
+            return None
+        return self._scheduled_commands[0][0]
+
     def get_command_reader(self) -> ObjectBase:
         return self._command_reader
 
     def get_agent(self, agent_id: str) -> ObjectBase:
-        for obj in self._objects["Agent"]:
-            if obj.id == agent_id:
-                return obj
+        return self.get_object("Agent", agent_id)
 
     def get_environment(self, environment_type: str) -> ObjectBase:
-        for obj in self._objects["Environment"]:
-            if obj.object_subtype == environment_type:
-                return obj
+        return self._environment_index.get(environment_type)
 
     def get_environment_with_id(self, environment_id: str) -> ObjectBase:
-        for obj in self._objects["Environment"]:
-            if obj.id == environment_id:
-                return obj
+        return self.get_object("Environment", environment_id)
 
     def get_agent_with_id(self, agent_id: str) -> ObjectBase:
-        for obj in self._objects["Agent"]:
-            if obj.id == agent_id:
-                return obj
+        return self.get_object("Agent", agent_id)
 
-    def get_environment_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_environment_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["Environment"] += 1
         return self.get_round_robin_ordered_objects("Environment")
 
-    def get_event_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_event_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["Event"] += 1
         return self.get_round_robin_ordered_objects("Event")
 
-    def get_effect_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_effect_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["Effect"] += 1
         return self.get_round_robin_ordered_objects("Effect")
 
-    def get_agent_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_agent_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["Agent"] += 1
         return self.get_round_robin_ordered_objects("Agent")
 
-    def get_action_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_action_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["Action"] += 1
         return self.get_round_robin_ordered_objects("Action")
 
-    def get_state_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_state_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["State"] += 1
         return self.get_round_robin_ordered_objects("State")
 
-    def get_metric_objects(self, update_index=False) -> List[ObjectBase]:
+    def get_metric_objects(self, update_index=False) -> RoundRobinView:
         if update_index:
             self._round_robin_index["Metric"] += 1
         return self.get_round_robin_ordered_objects("Metric")
 
-    def get_all_objects(self) -> List[ObjectBase]:
-        return_list = []
-        return_list.extend(self.get_environment_objects())
-        return_list.extend(self.get_effect_objects())
-        return_list.extend(self.get_agent_objects())
-        return_list.extend(self.get_action_objects())
-        return_list.extend(self.get_state_objects())
-        return_list.extend(self.get_metric_objects())
-        return return_list
+    def get_all_objects(self) -> Iterator[ObjectBase]:
+        return chain(
+            self.get_environment_objects(),
+            self.get_effect_objects(),
+            self.get_agent_objects(),
+            self.get_action_objects(),
+            self.get_state_objects(),
+            self.get_metric_objects()
+        )
 
     def clear(self):
         """
@@ -198,8 +418,8 @@ class ObjectsManager:
         self._command_reader = None
         self._scheduled_commands.clear()
         for key in self._objects:
-            for obj in self._objects[key]:
-                del obj
+            self._objects[key] = []
+        self._setup_index()
         self._round_robin_index = {
             "Environment": 0,
             "Event": 0,
@@ -246,19 +466,147 @@ class ObjectsManager:
         # now sort the objects according to the original id order
         # according to how it was saved in __getstate__
         for key in self._objects:
-            temp_list = self._objects[key]
-            for target_id in self._object_ids[key]:
-                for obj in temp_list:
-                    if obj.id == target_id:
-                        temp_list.append(obj)
-                        break
-            self._objects[key] = temp_list
+            object_ids = self._object_ids[key]
+            positions = {
+                target_id: position
+                for position, target_id in enumerate(object_ids)
+            }
+            if self._tombstone_cnt[key] > 0:
+                self._compact(key)
+            # place every object at its saved position, objects
+            # not saved keep their order after them
+            ordered = [None] * len(object_ids)
+            unsaved = []
+            for obj in self._objects[key]:
+                position = positions.get(obj.id)
+                if position is None:
+                    unsaved.append(obj)
+                else:
+                    ordered[position] = obj
+            self._objects[key] = [
+                obj for obj in ordered if obj is not None
+            ] + unsaved
+        self._rebuild_index()
         # now remove the object ids
         self._object_ids = {}
 
+    # ============= Private Helper Methods =============
+
+    def _setup_index(self):
+        # object id -> object, for every type
+        self._object_index: dict[str, ObjectBase] = {}
+        # object id -> position in the list of its type
+        self._object_slots: dict[str, int] = {}
+        # environment subtype -> first environment of the subtype
+        self._environment_index: dict[str, ObjectBase] = {}
+        self._tombstone_cnt: dict[str, int] = {
+            key: 0 for key in self._objects
+        }
+        # per type, slots of the live objects in order, None
+        # until requested after a removal and again after
+        # compaction
+        self._live_slots: dict[str, Optional[array]] = {
+            key: None for key in self._objects
+        }
+        # per type and subtype, object id -> object in schedule
+        # order, for objects that are not paused, so that paused
+        # objects cost nothing
+        self._active_objects: dict[str, dict[str, dict[str, ObjectBase]]] = {
+            key: {} for key in self._objects
+        }
+        # (type, subtype) of the active objects that were unpaused
+        # out of schedule order, sorted again once requested
+        self._unsorted_active: set[tuple[str, str]] = set()
+
+    def _rebuild_index(self):
+        self._setup_index()
+        for key in self._objects:
+            for slot, obj in enumerate(self._objects[key]):
+                self._object_index[obj.id] = obj
+                self._object_slots[obj.id] = slot
+                if not obj.paused:
+                    self._add_active(obj)
+                if key == "Environment" \
+                   and obj.object_subtype not in self._environment_index:
+                    self._environment_index[obj.object_subtype] = obj
+
+    def _add_active(self, obj: ObjectBase):
+        active_objects = self._active_objects[obj.object_type].setdefault(
+            obj.object_subtype,
+            {}
+        )
+        if obj.id in active_objects:
+            return
+        last = next(reversed(active_objects.values()), None)
+        active_objects[obj.id] = obj
+        if last is not None and last._schedule_order > obj._schedule_order:
+            self._unsorted_active.add((obj.object_type, obj.object_subtype))
+
+    def _remove_active(self, obj: ObjectBase):
+        active_objects = self._active_objects[obj.object_type].get(
+            obj.object_subtype
+        )
+        if active_objects is not None:
+            active_objects.pop(obj.id, None)
+
+    def _get_active_subtype(
+        self,
+        object_type: str,
+        object_subtype: str
+    ) -> dict[str, ObjectBase]:
+        active_objects = self._active_objects[object_type]
+        key = (object_type, object_subtype)
+        if key in self._unsorted_active:
+            self._unsorted_active.discard(key)
+            active_objects[object_subtype] = dict(sorted(
+                active_objects[object_subtype].items(),
+                key=lambda item: item[1]._schedule_order
+            ))
+        return active_objects.get(object_subtype, {})
+
+    def _live_objects(self, object_type: str) -> List[ObjectBase]:
+        objects = self._objects[object_type]
+        if self._tombstone_cnt[object_type] == 0:
+            return objects
+        return [obj for obj in objects if obj is not None]
+
+    def _get_live_slots(self, object_type: str) -> array:
+        live_slots = self._live_slots[object_type]
+        if live_slots is None:
+            live_slots = array('q', (
+                slot for slot, obj in enumerate(self._objects[object_type])
+                if obj is not None
+            ))
+            self._live_slots[object_type] = live_slots
+        return live_slots
+
+    def _compact(self, object_type: str):
+        """
+            Drop the tombstones of the type and
+            renumber the slots of the objects left
+        """
+        objects = self._live_objects(object_type)
+        for slot, obj in enumerate(objects):
+            self._object_slots[obj.id] = slot
+        self._objects[object_type] = objects
+        self._tombstone_cnt[object_type] = 0
+        self._live_slots[object_type] = None
+
     def __getstate__(self):
         default_state = self.__dict__.copy()
-        default_state["_objects"] = self.__dict__["_objects"].copy()
+        default_state["_objects"] = {
+            key: self._live_objects(key) for key in self._objects
+        }
+        # the index is rebuilt upon loading
+        default_state["_object_index"] = {}
+        default_state["_object_slots"] = {}
+        default_state["_environment_index"] = {}
+        default_state["_tombstone_cnt"] = {
+            key: 0 for key in self._objects
+        }
+        default_state["_live_slots"] = {}
+        default_state["_active_objects"] = {}
+        default_state["_unsorted_active"] = set()
         default_state["_scheduled_commands"] = []
         default_state["_object_ids"] = {}
         # turn state, action and effects into ids
@@ -294,3 +642,4 @@ class ObjectsManager:
 
     def __setstate__(self, state):
         self.__dict__.update(state)
+        self._rebuild_index()
@@ -12,6 +12,15 @@
     It reconciles the internal concept of a single
     simulation 'tick' with the simulated time, which
     is based on seconds, minutes and etc.
+
+    Objects are only visited on the ticks they are
+    due to simulate, which is tracked by the tick
+    scheduler. In fast forward mode the clock jumps
+    straight over ticks on which nothing is due.
+
+    The clock itself is an integer timestamp, the
+    datetimes handed out to objects are materialized
+    once per tick (and per timezone) and cached.
     ===================================================
 """
 
@@ -21,9 +30,19 @@ from simulator_base.config.global_config import (
     GlobalConfig
 )
 from simulator_base.object_base.id_generator import IDGenerator
+from simulator_base.util.timestamp import (
+    from_timestamp,
+    to_duration,
+    to_timestamp,
+)
 from simulator_base.orchestrator.objects_manager import ObjectsManager
+from simulator_base.orchestrator.tick_scheduler import (
+    PHASE_ORDER,
+    TickScheduler,
+)
 from ..object_base.object_base import ObjectBase
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, tzinfo
+from typing import Optional
 import math
 import time
 import pickle
@@ -47,8 +66,10 @@ class Orchestrator:
             else:
                 cls._instance = super(Orchestrator, cls).__new__(cls)
                 cls._instance._objects_manager = ObjectsManager()
+                cls._instance._scheduler = TickScheduler()
                 cls._instance._id_generator = IDGenerator()
                 cls._instance._current_time = None
+                cls._instance._current_timestamp = None
                 cls._instance._total_ticks = 0
                 cls._instance._is_ticking = False
                 cls._instance._last_save_time = None
@@ -78,13 +99,15 @@ class Orchestrator:
             'automatic_tick',
             True
         )
+        self._fast_forward = sim_config.get('fast_forward', False)
         start_date = global_config.get_start_date()
         tick_interval = global_config.get_tick_interval_seconds()
         self._start_date = start_date
-        self._current_time = start_date
         self._tick_interval = tick_interval
-        if start_date.tzinfo is not None:
-            self._tzinfo = start_date.tzinfo
+        self._tick_interval_duration = to_duration(tick_interval)
+        self._tzinfo = start_date.tzinfo
+        self._current_timestamp = to_timestamp(start_date)
+        self._materialize_time()
 
     def add_object(self, obj: ObjectBase):
         self._objects_manager.add_object(obj)
@@ -106,6 +129,23 @@ class Orchestrator:
 
     def remove_object(self, obj: ObjectBase):
         self._objects_manager.remove_object(obj)
+        self._scheduler.unschedule(obj)
+
+    def reschedule_object(self, obj: ObjectBase):
+        """
+            Move the next due tick of the object after
+            it got paused, unpaused or had its simulation
+            interval changed
+        """
+        self._objects_manager.update_active(obj)
+        self._scheduler.reschedule(obj)
+
+    def get_tick_count(self, obj: ObjectBase) -> int:
+        """
+            Get the number of ticks the object has been
+            active for
+        """
+        return self._scheduler.get_tick_count(obj)
 
     def simulation_loaded(self):
         """
@@ -122,22 +162,34 @@ class Orchestrator:
         for obj in self._objects_manager.get_all_objects():
             obj.destroy()
         self._objects_manager = ObjectsManager()
+        self._scheduler = TickScheduler(self._total_ticks)
 
     def pause_simulation(self):
-        for obj in self._objects_manager.get_all_objects():
-            obj.pause()
+        """
+            No tick is simulated nor counted while the
+            simulation is paused, so the objects keep
+            their own paused state.
+        """
         printer("Simulation paused", "LOG")
         self._is_simulation_paused = True
 
     def unpause_simulation(self):
-        for obj in self._objects_manager.get_all_objects():
-            obj.unpause()
         printer("Simulation resumed", "LOG")
         self._is_simulation_paused = False
 
     def get_all_agents(self, update_index: bool = False):
         return self._objects_manager.get_agent_objects(update_index)
 
+    def get_active_agents(self, agent_subtype: Optional[str] = None):
+        """
+            Agents that are not paused, only of the
+            subtype if provided
+        """
+        return self._objects_manager.get_active_objects(
+            "Agent",
+            agent_subtype
+        )
+
     def get_environment(self, environment_type: str):
         return self._objects_manager.get_environment(environment_type)
 
@@ -159,18 +211,75 @@ class Orchestrator:
             self._end_time is None
             or self._current_time < self._end_time
         ):
+            if self._fast_forward:
+                self.fast_forward(self._end_time)
+                if self._end_time is not None \
+                   and self._current_time >= self._end_time:
+                    break
             self.tick()
 
+    def progress_time(self, time_span: timedelta):
+        """
+            Progress the simulation by the given
+            amount of simulated time
+        """
+        self.progress_until_time(self._current_time + time_span)
+
+    def progress_until_time(self, end_time: datetime):
+        """
+            Progress the simulation until the given
+            time, ticks on which nothing is due are
+            skipped over
+        """
+        while self._current_time < end_time \
+                and not self._is_simulation_paused:
+            self.fast_forward(end_time)
+            if self._current_time >= end_time:
+                break
+            self.tick()
+
+    def fast_forward(self, end_time: Optional[datetime] = None):
+        """
+            Jump the clock to the next tick on which
+            any object, scheduled command or event is
+            due, without going past the end time.
+            Skipped ticks still count towards the
+            lifetime of the objects.
+        """
+        if self._is_simulation_paused or self._is_ticking:
+            return
+        target_tick = self._get_next_active_tick()
+        if end_time is not None:
+            ticks_until_end = math.ceil(
+                (end_time - self._current_time) / self._tick_interval
+            )
+            end_tick = self._total_ticks + max(ticks_until_end, 0)
+            if target_tick is None or end_tick < target_tick:
+                target_tick = end_tick
+        if target_tick is None or target_tick <= self._total_ticks:
+            return
+        skipped_ticks = target_tick - self._total_ticks
+        self._scheduler.advance_to(target_tick)
+        command_reader = self._objects_manager.get_command_reader()
+        if command_reader is not None:
+            command_reader.skip_ticks(skipped_ticks)
+        self._advance_clock(skipped_ticks)
+        self._total_ticks = target_tick
+
     def tick(self):
         """
-            The objects are returned in the order
+            The objects are simulated in the order
             of Environment, Event, Effect, Agent, Action,
-            and lastly State. This is used to
+            State and lastly Metric. This is used to
             represent a hierarchy of changes, of agent
             observing the environment and context
             and decide upon actions that eventually
             changes the state of the agent itself
             and other things.
+
+            Within each phase only the objects that
+            are due on this tick are visited, in round
+            robin order.
         """
         # ================ Command Reader ===============
         # Reading the external command would happen even
@@ -196,15 +305,7 @@ class Orchestrator:
         if self._is_ticking:
             raise RuntimeError("Orchestrator is already ticking")
         self._is_ticking = True
-        global_config = get_config()
-        debug_config = global_config.debug_config
-        time_indicator_print_interval_raw_hr = debug_config.get(
-            'time_indicator_print_interval', 1
-        )
-        print_interval = timedelta(
-            hours=time_indicator_print_interval_raw_hr
-        )
-        ticks_per_print = math.ceil(print_interval / self._tick_interval)
+        ticks_per_print = get_config().frozen.ticks_per_print
         if self._total_ticks % ticks_per_print == 0:
             printer(
                 "==================== "
@@ -212,32 +313,71 @@ class Orchestrator:
                 + "====================",
                 "LOG"
             )
-        environments = self._objects_manager.get_environment_objects(True)
-        for environment in environments:
-            environment.tick()
-        events = self._objects_manager.get_event_objects(True)
-        for event in events:
-            event.tick()
-        effects = self._objects_manager.get_effect_objects(True)
-        for effect in effects:
-            effect.tick()
-        agents = self._objects_manager.get_agent_objects(True)
-        for agent in agents:
-            agent.tick()
-        actions = self._objects_manager.get_action_objects(True)
-        for action in actions:
-            action.tick()
-        states = self._objects_manager.get_state_objects(True)
-        for state in states:
-            state.tick()
-        metrics = self._objects_manager.get_metric_objects(True)
-        for metric in metrics:
-            metric.tick()
-        self._current_time += self._tick_interval
+        scheduler = self._scheduler
+        scheduler.begin_tick(self._total_ticks)
+        for object_type in PHASE_ORDER:
+            scheduler.run_phase(
+                object_type,
+                self._objects_manager.get_round_robin_order_key(object_type)
+            )
+        scheduler.end_tick()
+        self._advance_clock(1)
         self._total_ticks += 1
         self._is_ticking = False
         self.save_simulation()
 
+    def _get_next_active_tick(self) -> Optional[int]:
+        """
+            Earliest tick on which anything is due,
+            None if nothing is scheduled at all
+        """
+        scheduler = self._scheduler
+        due_ticks = [
+            scheduler.next_due_tick(object_type)
+            for object_type in PHASE_ORDER
+            if object_type != "Event"
+        ]
+        # events are only due once they can start
+        for event in self._objects_manager.get_event_objects():
+            due_tick = scheduler.get_due_tick(event)
+            if due_tick is None:
+                continue
+            ticks_until_start = math.ceil(
+                (event.start_time - self.get_current_time(event))
+                / self._tick_interval
+            )
+            due_ticks.append(
+                max(due_tick, self._total_ticks + ticks_until_start)
+            )
+        command_time = self._objects_manager.get_next_scheduled_command_time()
+        if command_time is not None:
+            due_ticks.append(
+                self._total_ticks + math.ceil(
+                    (command_time - self._current_time) / self._tick_interval
+                )
+            )
+        due_ticks = [tick for tick in due_ticks if tick is not None]
+        if len(due_ticks) == 0:
+            return None
+        return max(min(due_ticks), self._total_ticks)
+
+    def _advance_clock(self, tick_cnt: int):
+        self._current_timestamp += self._tick_interval_duration * tick_cnt
+        self._materialize_time()
+
+    def _materialize_time(self):
+        """
+            Build the datetime of the current tick,
+            local times and dates are built lazily
+            and cached until the clock moves
+        """
+        self._current_time = from_timestamp(
+            self._current_timestamp,
+            self._tzinfo
+        )
+        self._local_times = {}
+        self._local_dates = {}
+
     @classmethod
     def get_current_time(cls, object: ObjectBase):
         """
@@ -246,11 +386,60 @@ class Orchestrator:
         """
         if object is None:
             raise RuntimeError("Cannot get relative time without object")
-        if object is not None and object.object_timezone is not None:
-            return cls._instance._current_time.astimezone(
-                object.object_timezone
+        object_timezone = object.object_timezone
+        if object_timezone is None:
+            return cls._instance._current_time
+        local_times = cls._instance._local_times
+        local_time = local_times.get(object_timezone)
+        if local_time is None:
+            local_time = cls._instance._current_time.astimezone(
+                object_timezone
             )
-        return cls._instance._current_time
+            local_times[object_timezone] = local_time
+        return local_time
+
+    @classmethod
+    def get_current_date(cls, object: ObjectBase) -> date:
+        """
+            Get the current date for object based on
+            object's own timezone
+        """
+        if object is None:
+            raise RuntimeError("Cannot get relative time without object")
+        object_timezone = object.object_timezone
+        local_dates = cls._instance._local_dates
+        local_date = local_dates.get(object_timezone)
+        if local_date is None:
+            local_date = cls.get_current_time(object).date()
+            local_dates[object_timezone] = local_date
+        return local_date
+
+    @classmethod
+    def get_timezone(cls, object: ObjectBase) -> Optional[tzinfo]:
+        """
+            Get the timezone of the object's local time,
+            None when it is the naive utc time
+        """
+        if object is None:
+            raise RuntimeError("Cannot get relative time without object")
+        return object.object_timezone or cls._instance._tzinfo
+
+    @classmethod
+    def get_date(cls, object: ObjectBase, timestamp: int) -> date:
+        """
+            Get the date of the timestamp based on object's
+            own timezone, as get_current_date does for the
+            current time
+        """
+        return from_timestamp(timestamp, cls.get_timezone(object)).date()
+
+    @classmethod
+    def get_current_timestamp(cls) -> int:
+        """
+            Get the integer timestamp of the global
+            clock, which is the same for all objects
+        """
+        return cls._instance._current_timestamp
 
     def save_simulation(self):
         """
@@ -319,7 +508,15 @@ class Orchestrator:
             f"{cls._instance._current_time.isoformat()}",
             "LOG"
         )
-        cls._instance._objects_manager.rehydrate()
+        objects_manager = cls._instance._objects_manager
+        objects_manager.rehydrate()
+        cls._instance._scheduler.rebuild(
+            obj
+            for object_type in PHASE_ORDER
+            for obj in objects_manager.get_round_robin_ordered_objects(
+                object_type
+            )
+        )
         printer(
             "Rehydrated simulation state",
             "LOG"
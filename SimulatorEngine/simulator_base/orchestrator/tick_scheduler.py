@@ -0,0 +1,330 @@
+"""
+    ================= Tick Scheduler ====================
+    Keeps every running object keyed on the global tick
+    it is next due to simulate, so that a tick only
+    visits the objects that actually have work to do
+    instead of walking the whole population just to
+    bump their tick counters.
+
+    Objects are kept in per phase buckets indexed by
+    due tick, with a heap of the due ticks on top of
+    them (a bucketed priority queue). Counters on the
+    objects that are not visited are settled lazily
+    whenever the object is paused, removed or has its
+    simulation interval changed.
+    =====================================================
+"""
+
+from ..object_base.object_base import ObjectBase
+from typing import Callable, Iterable, Optional
+import heapq
+
+
+# Order in which phases are simulated within a single tick
+PHASE_ORDER = (
+    "Environment",
+    "Event",
+    "Effect",
+    "Agent",
+    "Action",
+    "State",
+    "Metric",
+)
+PHASE_INDEX = {
+    object_type: index for index, object_type in enumerate(PHASE_ORDER)
+}
+# Marker for objects that are collected for the current phase
+# but not yet visited
+CLAIMED = -1
+
+
+class TickScheduler:
+    def __init__(self, current_tick: int = 0):
+        # per phase, due tick -> objects due at that tick
+        self._buckets: dict[str, dict[int, list[ObjectBase]]] = {
+            object_type: {} for object_type in PHASE_ORDER
+        }
+        # per phase, heap of due ticks that have a bucket
+        self._due_ticks: dict[str, list[int]] = {
+            object_type: [] for object_type in PHASE_ORDER
+        }
+        # index of the tick being (or about to be) simulated
+        self._current_tick = current_tick
+        # index of the phase being simulated, None between ticks
+        self._current_phase: Optional[int] = None
+        # class -> whether it overrides simulate_batch
+        self._batched_classes: dict[type, bool] = {}
+
+    @property
+    def current_tick(self) -> int:
+        return self._current_tick
+
+    # ============= System Accessible Public Methods ==============
+
+    def begin_tick(self, tick: int):
+        self._current_tick = tick
+        self._current_phase = None
+
+    def end_tick(self):
+        self._current_phase = None
+        self._current_tick += 1
+
+    def run_phase(
+        self,
+        object_type: str,
+        order_key: Callable[[ObjectBase], object],
+    ):
+        """
+            Simulate all objects of the phase that are
+            due on the current tick, in the order given
+            by the order key (round robin order of the
+            objects manager).
+        """
+        self._current_phase = PHASE_INDEX[object_type]
+        tick = self._current_tick
+        due_ticks = self._due_ticks[object_type]
+        while due_ticks and due_ticks[0] <= tick:
+            heapq.heappop(due_ticks)
+        bucket = self._buckets[object_type].pop(tick, None)
+        if not bucket:
+            return
+        due_objects = []
+        for obj in bucket:
+            # skip entries that were rescheduled, paused or
+            # already collected through a duplicated entry
+            if obj._due_tick == tick:
+                obj._due_tick = CLAIMED
+                due_objects.append(obj)
+        due_objects.sort(key=order_key)
+        for entry in self._group_batches(due_objects):
+            if type(entry) is list:
+                self._simulate_batch(entry, tick)
+                continue
+            obj = entry
+            # an earlier object of the same phase may have
+            # paused, removed or rescheduled this one
+            if obj._due_tick != CLAIMED:
+                continue
+            # tick counters are only settled when needed
+            obj._last_simulated_tick = tick
+            obj.simulate()
+            obj._simulation_count += 1
+            if obj._due_tick == CLAIMED:
+                self._reschedule_after_visit(obj, tick)
+
+    def next_due_tick(self, object_type: str) -> Optional[int]:
+        """
+            Earliest tick on which an object of the phase
+            is due, None if no object of the phase is
+            scheduled.
+        """
+        due_ticks = self._due_ticks[object_type]
+        buckets = self._buckets[object_type]
+        while due_ticks:
+            due_tick = due_ticks[0]
+            bucket = buckets.get(due_tick)
+            if bucket and any(obj._due_tick == due_tick for obj in bucket):
+                return due_tick
+            # every entry of the bucket has been rescheduled
+            heapq.heappop(due_ticks)
+            buckets.pop(due_tick, None)
+        return None
+
+    def get_due_tick(self, obj: ObjectBase) -> Optional[int]:
+        """
+            Tick the object is next visited on, None
+            if it is not scheduled.
+        """
+        if obj._due_tick is None or obj._due_tick == CLAIMED:
+            return None
+        return obj._due_tick
+
+    def advance_to(self, tick: int):
+        """
+            Skip the ticks before the given one without
+            visiting anything, objects that were due on
+            the skipped ticks are visited on the given
+            tick instead.
+        """
+        for object_type in PHASE_ORDER:
+            due_ticks = self._due_ticks[object_type]
+            buckets = self._buckets[object_type]
+            while due_ticks and due_ticks[0] < tick:
+                due_tick = heapq.heappop(due_ticks)
+                for obj in buckets.pop(due_tick, ()):
+                    if obj._due_tick == due_tick:
+                        obj._due_tick = tick
+                        self._push(obj, tick)
+        self._current_tick = tick
+        self._current_phase = None
+
+    def reschedule(self, obj: ObjectBase):
+        """
+            Called whenever an object is paused, unpaused
+            or has its simulation interval changed.
+        """
+        if obj.object_type not in PHASE_INDEX:
+            return
+        if obj._due_tick is not None:
+            self._settle(obj)
+            obj._due_tick = None
+        elif not obj.paused:
+            # object (re)joins the simulation, ticks while
+            # paused are not counted
+            obj._last_counted_tick = self._next_visit_tick(obj) - 1
+            if obj._last_simulation_tick_count is None \
+               and not obj._simulate_on_first_tick:
+                obj._last_simulation_tick_count = obj._tick_count
+        if not obj.paused:
+            self._schedule(obj)
+
+    def unschedule(self, obj: ObjectBase):
+        """
+            Stop visiting the object, used when it is
+            removed from the simulation.
+        """
+        if obj._due_tick is not None:
+            self._settle(obj)
+            obj._due_tick = None
+
+    def get_tick_count(self, obj: ObjectBase) -> int:
+        """
+            Number of ticks the object has been running
+            for, including ticks it was not visited on.
+        """
+        if obj._due_tick is None:
+            return obj._tick_count
+        if obj._due_tick == CLAIMED:
+            # ticks are counted after the visit
+            counted_through = self._current_tick - 1
+        else:
+            counted_through = self._next_visit_tick(obj) - 1
+        return obj._tick_count + max(
+            counted_through - obj._last_counted_tick,
+            0
+        )
+
+    def rebuild(self, objects: Iterable[ObjectBase]):
+        """
+            Re-create the buckets from the due ticks stored
+            on the objects, used after loading a snapshot.
+        """
+        for object_type in PHASE_ORDER:
+            self._buckets[object_type] = {}
+            self._due_ticks[object_type] = []
+        for obj in objects:
+            if obj._due_tick is not None:
+                self._push(obj, obj._due_tick)
+
+    # ============= Private Helper Methods =============
+
+    def _is_batched(self, cls: type) -> bool:
+        batched = self._batched_classes.get(cls)
+        if batched is None:
+            batched = cls.simulate_batch.__func__ is not \
+                ObjectBase.simulate_batch.__func__
+            self._batched_classes[cls] = batched
+        return batched
+
+    def _group_batches(self, due_objects: list[ObjectBase]) -> list:
+        """
+            Collect the objects of classes that simulate in
+            batches into one list per class, placed where the
+            first object of the class is in the order.
+        """
+        is_batched = self._is_batched
+        entries = []
+        batches: dict[type, list[ObjectBase]] = {}
+        for obj in due_objects:
+            cls = type(obj)
+            if not is_batched(cls):
+                entries.append(obj)
+                continue
+            batch = batches.get(cls)
+            if batch is None:
+                batch = batches[cls] = []
+                entries.append(batch)
+            batch.append(obj)
+        return entries
+
+    def _simulate_batch(self, batch: list[ObjectBase], tick: int):
+        objects = [obj for obj in batch if obj._due_tick == CLAIMED]
+        if not objects:
+            return
+        for obj in objects:
+            obj._last_simulated_tick = tick
+        type(objects[0]).simulate_batch(objects)
+        for obj in objects:
+            obj._simulation_count += 1
+            if obj._due_tick == CLAIMED:
+                self._reschedule_after_visit(obj, tick)
+
+    def _reschedule_after_visit(self, obj: ObjectBase, tick: int):
+        interval_ticks = obj._simulation_interval_ticks
+        due_tick = tick + interval_ticks if interval_ticks > 1 else tick + 1
+        obj._due_tick = due_tick
+        self._push(obj, due_tick)
+
+    def _next_visit_tick(self, obj: ObjectBase) -> int:
+        """
+            The first tick on which the phase of the object
+            has not been simulated yet.
+        """
+        if self._current_phase is None \
+           or PHASE_INDEX[obj.object_type] > self._current_phase:
+            return self._current_tick
+        return self._current_tick + 1
+
+    def _settle(self, obj: ObjectBase):
+        """
+            Count the ticks the object was running for
+            since its counters were last settled.
+        """
+        last_counted_tick = obj._last_counted_tick
+        last_simulated_tick = obj._last_simulated_tick
+        if last_simulated_tick is not None \
+           and last_simulated_tick > last_counted_tick:
+            obj._last_simulation_tick_count = (
+                obj._tick_count + last_simulated_tick - last_counted_tick - 1
+            )
+        if obj._due_tick == CLAIMED \
+           and last_simulated_tick != self._current_tick:
+            # collected but not visited yet on this tick
+            counted_through = self._current_tick - 1
+        else:
+            counted_through = self._next_visit_tick(obj) - 1
+        if counted_through > obj._last_counted_tick:
+            obj._tick_count += counted_through - obj._last_counted_tick
+            obj._last_counted_tick = counted_through
+
+    def _schedule(self, obj: ObjectBase):
+        remaining_ticks = obj.next_simulation_tick_count - obj._tick_count
+        due_tick = obj._last_counted_tick + 1 + max(remaining_ticks, 0)
+        obj._due_tick = due_tick
+        self._push(obj, due_tick)
+
+    def _push(self, obj: ObjectBase, due_tick: int):
+        buckets = self._buckets[obj.object_type]
+        bucket = buckets.get(due_tick)
+        if bucket is None:
+            bucket = buckets[due_tick] = []
+            heapq.heappush(self._due_ticks[obj.object_type], due_tick)
+        bucket.append(obj)
+
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # buckets are rebuilt from the objects upon loading
+        state = self.__dict__.copy()
+        state["_buckets"] = {
+            object_type: {} for object_type in PHASE_ORDER
+        }
+        state["_due_ticks"] = {
+            object_type: [] for object_type in PHASE_ORDER
+        }
+        state.pop("_batched_classes", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._batched_classes = {}
@@ -31,6 +31,8 @@ class PersonalInfoState(PassiveState):
 
     def _randomize_info(self):
         fake = Faker()
+        # keep generated info reproducible
+        fake.seed_instance(self.random_stream.randint(0, 2 ** 32 - 1))
         if not self._gender:
             self._gender = fake.random_element(
                 [GenderType.FEMALE, GenderType.MALE]
@@ -59,7 +61,7 @@ class PersonalInfoState(PassiveState):
 
     @property
     def age(self):
-        today = Orchestrator.get_current_time(self)
+        today = Orchestrator.get_current_date(self)
         age = today.year - self._birth_day.year
         if today.month < self._birth_day.month or (
             today.month == self._birth_day.month and
@@ -0,0 +1,99 @@
+"""
+    Daily ledger of values summed by day, for rollups
+    that are queried over ranges of days. The values
+    are kept in arrays indexed by day along with their
+    prefix sums, so that the sum over a range of days
+    is the difference of two prefix sums.
+"""
+
+import numpy as np
+
+INITIAL_DAY_CNT = 32
+
+
+class DailyLedger:
+    """
+        Days are given as numbers of days since the unix
+        epoch (see timestamp.to_day), and indexed from the
+        first day with a value. Values are mostly added on
+        the latest day, which only updates its own prefix
+        sum.
+    """
+
+    def __init__(self):
+        self._first_day = 0
+        self._day_cnt = 0
+        self._values = np.zeros(INITIAL_DAY_CNT)
+        self._prefix_sums = np.zeros(INITIAL_DAY_CNT)
+
+    # ============= System Accessible Public Methods ==============
+
+    def add(self, day: int, value: float):
+        if self._day_cnt == 0:
+            self._first_day = day
+        elif day < self._first_day:
+            self._prepend_days(self._first_day - day)
+        index = day - self._first_day
+        if index >= self._day_cnt:
+            self._append_days(index + 1 - self._day_cnt)
+        self._values[index] += value
+        self._prefix_sums[index:self._day_cnt] += value
+
+    def get(self, day: int) -> float:
+        index = day - self._first_day
+        if index < 0 or index >= self._day_cnt:
+            return 0
+        return self._values[index].item()
+
+    def get_range(self, start_day: int, end_day: int) -> float:
+        """
+            Sum of the days from the start day up to, but
+            not including, the end day
+        """
+        if end_day <= start_day:
+            return 0
+        return self._get_prefix_sum(end_day - 1) - \
+            self._get_prefix_sum(start_day - 1)
+
+    def get_total(self) -> float:
+        return self._get_prefix_sum(self._first_day + self._day_cnt - 1)
+
+    # ============= Private Helper Methods =============
+
+    def _get_prefix_sum(self, day: int) -> float:
+        """
+            Sum of the days up to and including the day
+        """
+        index = day - self._first_day
+        if index < 0 or self._day_cnt == 0:
+            return 0
+        return self._prefix_sums[min(index, self._day_cnt - 1)].item()
+
+    def _append_days(self, day_cnt: int):
+        new_day_cnt = self._day_cnt + day_cnt
+        if new_day_cnt > len(self._values):
+            capacity = max(new_day_cnt, 2 * len(self._values))
+            self._values = self._resize(self._values, capacity, 0)
+            self._prefix_sums = self._resize(self._prefix_sums, capacity, 0)
+        # days without values carry over the last prefix sum
+        self._prefix_sums[self._day_cnt:new_day_cnt] = \
+            self._prefix_sums[self._day_cnt - 1] if self._day_cnt else 0
+        self._day_cnt = new_day_cnt
+
+    def _prepend_days(self, day_cnt: int):
+        capacity = max(self._day_cnt + day_cnt, len(self._values))
+        self._values = self._resize(self._values, capacity, day_cnt)
+        self._prefix_sums = self._resize(self._prefix_sums, capacity, day_cnt)
+        self._first_day -= day_cnt
+        self._day_cnt += day_cnt
+
+    def _resize(
+        self,
+        values: np.ndarray,
+        capacity: int,
+        offset: int
+    ) -> np.ndarray:
+        resized_values = np.zeros(capacity)
+        resized_values[offset:offset + self._day_cnt] = \
+            values[:self._day_cnt]
+        return resized_values
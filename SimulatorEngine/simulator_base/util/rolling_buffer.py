@@ -0,0 +1,190 @@
+"""
+    Time ordered rolling buffer for histories that are
+    appended in order of time and expire from the front
+    once older than their retention. Expiry and time
+    range queries bisect a running maximum of the times
+    instead of walking the items.
+"""
+
+from .timestamp import to_duration
+from datetime import timedelta
+from typing import Any, Iterator, Optional
+import numpy as np
+
+INITIAL_CAPACITY = 64
+
+
+class RollingBuffer:
+    """
+        Items with their timestamps in an array ring. The
+        room of expired items is reused once they make up
+        half of the array, otherwise the array doubles.
+
+        Items are expected in order of time, but an item
+        may be appended with a time before the latest one.
+        Its own time is kept for range queries, and next
+        to it the latest time up to it, which stays sorted
+        for bisecting. Expiry stops at the first item
+        within the retention by its own time.
+    """
+
+    def __init__(
+        self,
+        retention: Optional[timedelta] = None,
+        dtype=object
+    ):
+        self._retention = retention
+        self._items = np.empty(INITIAL_CAPACITY, dtype=dtype)
+        self._times = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        # running maximum of the times
+        self._latest_times = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._start = 0
+        self._end = 0
+
+    @property
+    def retention(self) -> Optional[timedelta]:
+        return self._retention
+
+    @retention.setter
+    def retention(self, value: Optional[timedelta]):
+        self._retention = value
+
+    @property
+    def items(self) -> np.ndarray:
+        """
+            Items from the oldest to the latest, the array
+            is only valid until the next append
+        """
+        return self._items[self._start:self._end]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[self._start:self._end]
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    # ============= System Accessible Public Methods ==============
+
+    def append(self, time: int, item: Any):
+        if self._end == len(self._items):
+            self._make_room()
+        latest_time = time
+        if self._end > self._start:
+            latest_time = max(time, self._latest_times[self._end - 1])
+        self._items[self._end] = item
+        self._times[self._end] = time
+        self._latest_times[self._end] = latest_time
+        self._end += 1
+
+    def expire(self, current_time: int) -> int:
+        """
+            Drop the items older than the retention, return
+            the number of items dropped
+        """
+        if self._retention is None:
+            return 0
+        return self.expire_before(current_time - to_duration(self._retention))
+
+    def expire_before(self, time: int) -> int:
+        """
+            Drop the items from the front up to the first
+            item at or after the time
+        """
+        expired_cnt = int(np.searchsorted(
+            self._latest_times[self._start:self._end],
+            time,
+            'left'
+        ))
+        self._drop(expired_cnt)
+        return expired_cnt
+
+    def pop_expired(self, current_time: int) -> np.ndarray:
+        """
+            Drop the items older than the retention and
+            return them
+        """
+        if self._retention is None:
+            return self.items[:0].copy()
+        expired_cnt = int(np.searchsorted(
+            self._latest_times[self._start:self._end],
+            current_time - to_duration(self._retention),
+            'left'
+        ))
+        expired_items = self.items[:expired_cnt].copy()
+        self._drop(expired_cnt)
+        return expired_items
+
+    def get_range(
+        self,
+        start_time: int,
+        end_time: Optional[int] = None
+    ) -> np.ndarray:
+        """
+            Items with a time at or after the start time, and
+            before the end time if provided
+        """
+        # the items before have times before the start time
+        start = int(np.searchsorted(
+            self._latest_times[self._start:self._end],
+            start_time,
+            'left'
+        ))
+        times = self.times[start:]
+        in_range = times >= start_time
+        if end_time is not None:
+            in_range &= times < end_time
+        if in_range.all():
+            return self.items[start:]
+        return self.items[start:][in_range]
+
+    # ============= Private Helper Methods =============
+
+    def _drop(self, cnt: int):
+        start = self._start + cnt
+        if cnt and self._items.dtype == object:
+            # release the dropped items
+            self._items[self._start:start] = None
+        self._start = start
+
+    def _make_room(self):
+        size = self._end - self._start
+        if self._start and self._start >= len(self._items) // 2:
+            self._items[:size] = self._items[self._start:self._end]
+            self._times[:size] = self._times[self._start:self._end]
+            self._latest_times[:size] = \
+                self._latest_times[self._start:self._end]
+            if self._items.dtype == object:
+                self._items[size:] = None
+        else:
+            capacity = max(INITIAL_CAPACITY, 2 * len(self._items))
+            items = np.empty(capacity, dtype=self._items.dtype)
+            times = np.zeros(capacity, dtype=np.int64)
+            latest_times = np.zeros(capacity, dtype=np.int64)
+            items[:size] = self._items[self._start:self._end]
+            times[:size] = self._times[self._start:self._end]
+            latest_times[:size] = self._latest_times[self._start:self._end]
+            self._items = items
+            self._times = times
+            self._latest_times = latest_times
+        self._start = 0
+        self._end = size
+
+    # =============== Serialization Methods ================
+
+    def __getstate__(self):
+        # only the items within the retention are saved
+        state = self.__dict__.copy()
+        state['_items'] = self.items.copy()
+        state['_times'] = self.times.copy()
+        state['_latest_times'] = \
+            self._latest_times[self._start:self._end].copy()
+        state['_start'] = 0
+        state['_end'] = len(self)
+        return state
@@ -0,0 +1,46 @@
+"""
+    Conversion between datetimes and the integer
+    timestamps used by the simulation clock and
+    stored event times. Timestamps are int64
+    microseconds since the unix epoch, naive
+    datetimes are taken as utc.
+"""
+
+from datetime import date, datetime, timedelta, timezone, tzinfo
+from typing import Optional
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+SECOND = 1_000_000
+DAY = 86_400 * SECOND
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+
+def to_timestamp(time: datetime) -> int:
+    if time.tzinfo is not None:
+        time = time.astimezone(timezone.utc).replace(tzinfo=None)
+    return (time - EPOCH) // MICROSECOND
+
+
+def from_timestamp(timestamp: int, time_zone: Optional[tzinfo] = None):
+    time = EPOCH + timedelta(microseconds=timestamp)
+    if time_zone is not None:
+        return time.replace(tzinfo=timezone.utc).astimezone(time_zone)
+    return time
+
+
+def to_duration(time_span: timedelta) -> int:
+    """
+        Length of the time span in microseconds
+    """
+    return time_span // MICROSECOND
+
+
+def to_day(time: date) -> int:
+    """
+        Number of days since the unix epoch of the date
+        of the time, the utc day of a timestamp is the
+        timestamp // DAY, daily ledgers are keyed by the
+        local date instead (see Orchestrator.get_date)
+    """
+    return time.toordinal() - EPOCH_ORDINAL
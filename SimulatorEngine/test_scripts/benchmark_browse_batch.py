@@ -0,0 +1,117 @@
+"""
+    Measures the time spent browsing per simulated hour
+    when the browses of a tick are scored and priced in
+    surface batches, compared with browsing one user at
+    a time, with batch pacing on. Both runs simulate the
+    same events, a digest of the ad event log is printed
+    along to compare them. Runs alternate between both
+    ways and the fastest of each is kept.
+
+    Run from the SimulatorEngine directory:
+        python test_scripts/benchmark_browse_batch.py
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+from simulator_base.config.global_config import get_config  # noqa: E402
+from market_simulation.config.market_config import (  # noqa: E402
+    MarketConfig,
+)
+from market_simulation.objects.action.browse_app_action import (  # noqa: E402
+    BrowseAppAction,
+)
+from market_simulation.objects.auction.ad_event_log import (  # noqa: E402
+    get_ad_event_log,
+)
+from market_simulation.objects.types.types import (  # noqa: E402
+    AdEventFields,
+)
+
+PROGRESS_TIME = timedelta(hours=12)
+ADVERTISER_CNTS = (10, 200)
+RUN_CNT = 3
+
+
+def configure(advertiser_cnt: int):
+    setup = MarketConfig.setup
+
+    def configured_setup(market_config: MarketConfig, config_path: str):
+        setup(market_config, config_path)
+        market_config.get_advertiser_config()['advertiser_count'] = \
+            advertiser_cnt
+        delivery_config = market_config.get_delivery_config()
+        delivery_config['pacing_config']['batch_pacing'] = True
+        market_config.compile()
+
+    MarketConfig.setup = configured_setup
+
+
+def run(batched: bool):
+    browse_time = 0
+    simulate_batch = BrowseAppAction.simulate_batch.__func__
+
+    def timed_simulate_batch(cls, actions: list[BrowseAppAction]):
+        nonlocal browse_time
+        start = time.perf_counter()
+        if batched:
+            simulate_batch(cls, actions)
+        else:
+            for action in actions:
+                action.simulate()
+        browse_time += time.perf_counter() - start
+
+    BrowseAppAction.simulate_batch = classmethod(timed_simulate_batch)
+    orchestrator = main.setup()
+    get_config().snapshot_config['should_save'] = False
+    orchestrator.progress_time(PROGRESS_TIME)
+    event_log = get_ad_event_log()
+    digest = hashlib.sha256()
+    for field in AdEventFields:
+        values = event_log.get_column(field)[:len(event_log)].tolist()
+        digest.update(repr([str(value) for value in values]).encode())
+    hours = PROGRESS_TIME / timedelta(hours=1)
+    print(f"{browse_time / hours * 1000:.1f} {digest.hexdigest()}")
+
+
+def main_benchmark():
+    for advertiser_cnt in ADVERTISER_CNTS:
+        times = {False: [], True: []}
+        digests = set()
+        for _ in range(RUN_CNT):
+            for batched in (False, True):
+                output = subprocess.run(
+                    [
+                        sys.executable,
+                        __file__,
+                        str(advertiser_cnt),
+                        str(int(batched)),
+                    ],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout.splitlines()[-1].split()
+                times[batched].append(float(output[0]))
+                digests.add(output[1])
+        serial, batched = min(times[False]), min(times[True])
+        print(
+            f"{advertiser_cnt:>4} advertisers: one at a time "
+            f"{serial:8.1f} ms, batched {batched:8.1f} ms per "
+            f"simulated hour ({serial / batched:.2f}x), "
+            f"same events {len(digests) == 1}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        configure(int(sys.argv[1]))
+        run(bool(int(sys.argv[2])))
+    else:
+        main_benchmark()
@@ -0,0 +1,121 @@
+"""
+    Measures how much memory is allocated per tick
+    when walking every phase through the objects
+    manager, compared with materializing a rotated
+    copy of each phase like the manager used to.
+
+    The first tick is reported apart, as it indexes
+    the live slots of the phases with tombstones.
+    Every following tick removes an agent and adds
+    another one before walking, like a simulation
+    where agents come and go.
+
+    Run from the SimulatorEngine directory:
+        python test_scripts/benchmark_round_robin.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from simulator_base.orchestrator.objects_manager import (  # noqa: E402
+    ObjectsManager,
+)
+
+PHASES = [
+    "Environment", "Event", "Effect", "Agent", "Action", "State", "Metric"
+]
+OBJECTS_PER_PHASE = 20000
+TICKS = 50
+
+
+def make_object(object_type: str, i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=f"{object_type}_{i}",
+        object_type=object_type,
+        object_subtype=object_type,
+        _schedule_order=None,
+        paused=False,
+    )
+
+
+def build_manager() -> ObjectsManager:
+    objects_manager = ObjectsManager()
+    for object_type in PHASES:
+        for i in range(OBJECTS_PER_PHASE):
+            objects_manager.add_object(make_object(object_type, i))
+    # leave some tombstones behind
+    for i in range(0, OBJECTS_PER_PHASE, 500):
+        objects_manager.remove_object(
+            objects_manager.get_object("Agent", f"Agent_{i}")
+        )
+    objects_manager._internal_round_robin_index = 7
+    return objects_manager
+
+
+def walk_views(objects_manager: ObjectsManager):
+    for object_type in PHASES:
+        for _ in objects_manager.get_round_robin_ordered_objects(object_type):
+            pass
+
+
+def walk_copies(objects_manager: ObjectsManager):
+    for object_type in PHASES:
+        objects = [
+            obj for obj in objects_manager._objects[object_type]
+            if obj is not None
+        ]
+        index = objects_manager._internal_round_robin_index % len(objects)
+        for _ in objects[index:] + objects[:index]:
+            pass
+
+
+def churn(objects_manager: ObjectsManager, tick: int):
+    objects_manager.remove_object(
+        objects_manager.get_object("Agent", f"Agent_{tick * 7 + 1}")
+    )
+    objects_manager.add_object(
+        make_object("Agent", OBJECTS_PER_PHASE + tick)
+    )
+
+
+def measure_tick(walk, objects_manager: ObjectsManager) -> tuple[int, float]:
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    walk(objects_manager)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return peak - baseline, elapsed
+
+
+def measure(name: str, walk):
+    objects_manager = build_manager()
+    tracemalloc.start()
+    warm_up_peak, warm_up_elapsed = measure_tick(walk, objects_manager)
+    peak_per_tick = 0
+    elapsed = 0
+    for tick in range(TICKS):
+        churn(objects_manager, tick)
+        peak, tick_elapsed = measure_tick(walk, objects_manager)
+        peak_per_tick = max(peak_per_tick, peak)
+        elapsed += tick_elapsed
+    tracemalloc.stop()
+    print(
+        f"{name:>6}: first tick {warm_up_peak:>8} bytes "
+        f"{warm_up_elapsed * 1000:.2f} ms, then peak allocation per tick "
+        f"{peak_per_tick:>8} bytes, {elapsed / TICKS * 1000:.2f} ms per tick"
+    )
+
+
+def main():
+    measure("copies", walk_copies)
+    measure("views", walk_views)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+    Checks that the batched ranking path of the ranking
+    environment gives exactly the same "true" and
+    "predicted" probabilities as the scalar
+    get_probability, including the model noise drawn
+    from the random stream of the user.
+
+    Progresses the configured simulation for a few hours
+    (snapshots are not saved) and then scores every user
+    on every surface both ways, from the same random
+    stream state. The users x ads batch of every surface
+    is checked against the per user batches the same way,
+    with some ads running out of budget in between, in
+    both pacing modes. The targeting of the ad table is
+    checked against Ad.matches_target, with some ads
+    targeting several countries in one string or in a
+    list.
+
+    Run from the SimulatorEngine directory:
+        python test_scripts/check_ranking_equivalence.py
+"""
+
+import copy
+import os
+import sys
+from datetime import timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+from simulator_base.config.global_config import get_config  # noqa: E402
+from market_simulation.config.market_config import (  # noqa: E402
+    get_config as get_market_config,
+)
+from market_simulation.objects.auction.ad_table import (  # noqa: E402
+    AdTable,
+)
+from market_simulation.objects.types.types import (  # noqa: E402
+    AppSurfaceType,
+    PacingMode,
+    TargetingFilterFields,
+)
+
+PROGRESS_TIME = timedelta(hours=6)
+# every n-th ad runs out of budget between the batch and the browse
+EXHAUSTED_AD_STEP = 3
+THROTTLED_AD_STEP = 2
+# targets given to the first ads, a single country is
+# matched as a substring and a list by membership
+COUNTRY_TARGETS = ("US/CA", "USA", ["CA"], ["US", "CA"], ["U"])
+# countries of the users are checked along with these
+EXTRA_COUNTRIES = ("U", "MX")
+
+
+def set_pacing_mode(pacing_mode: PacingMode):
+    market_config = get_market_config()
+    market_config.get_delivery_config()['pacing_config'][
+        'pacing_mode'
+    ] = pacing_mode.value
+    market_config.compile()
+
+
+def check_surface_batch(ranking_environment, users, surface):
+    ad_table = ranking_environment.ad_table
+    # participation is drawn upon the batch
+    random_streams = [copy.deepcopy(user.random_stream) for user in users]
+    batch_results = ranking_environment.fetch_and_score_all_ads_batch(
+        users,
+        surface
+    )
+    # ads running out of budget after the batch are
+    # dropped upon the browse
+    exhausted_ads = ad_table.ads[::EXHAUSTED_AD_STEP]
+    for ad in exhausted_ads:
+        ad_table.set_eligible(ad.id, False)
+    for user, random_stream, batch_result in zip(
+        users, random_streams, batch_results
+    ):
+        ads, _, true_probabilities, predicted_probabilities = \
+            ranking_environment.predict_scored_ads(user, *batch_result)
+        position = user.random_stream.position()
+        user._random_stream = random_stream
+        expected = ranking_environment.fetch_and_score_all_ads(user, surface)
+        assert user.random_stream.position() == position, (user, surface)
+        assert ads == expected[0], (user, surface)
+        assert (true_probabilities == expected[1]).all(), (user, surface)
+        assert (predicted_probabilities == expected[2]).all(), (
+            user, surface
+        )
+    for ad in exhausted_ads:
+        ad_table.set_eligible(ad.id, True)
+
+
+def check_country_targeting(ads, users) -> int:
+    spec_states = [
+        ad.get_state('AdSpecState') for ad in ads[:len(COUNTRY_TARGETS)]
+    ]
+    countries = [spec_state.country for spec_state in spec_states]
+    for spec_state, target in zip(spec_states, COUNTRY_TARGETS):
+        spec_state._country = target
+    ad_table = AdTable()
+    ad_table.sync(ads, 0)
+    filter_cnt = 0
+    for user in users[:len(users) // 10]:
+        for country in (user.country,) + EXTRA_COUNTRIES:
+            for surface in AppSurfaceType:
+                filters = {
+                    TargetingFilterFields.COUNTRY: country,
+                    TargetingFilterFields.AGE: user.age,
+                    TargetingFilterFields.GENDER: user.gender,
+                    TargetingFilterFields.SURFACE: surface,
+                }
+                expected = [ad for ad in ads if ad.matches_target(filters)]
+                assert ad_table.get_matching_ads(filters) == expected, (
+                    filters
+                )
+                filter_cnt += 1
+    for spec_state, country in zip(spec_states, countries):
+        spec_state._country = country
+    return filter_cnt
+
+
+def main_check():
+    orchestrator = main.setup()
+    get_config().snapshot_config['should_save'] = False
+    orchestrator.progress_time(PROGRESS_TIME)
+    ranking_environment = orchestrator.get_environment('RankingEnvironment')
+    users = [
+        agent for agent in orchestrator.get_all_agents()
+        if agent.object_subtype == "User"
+    ]
+    pair_cnt = 0
+    for user in users:
+        for surface in AppSurfaceType:
+            random_stream = copy.deepcopy(user.random_stream)
+            ads, true_probabilities, predicted_probabilities = \
+                ranking_environment.fetch_and_score_all_ads(user, surface)
+            user._random_stream = random_stream
+            for index, ad in enumerate(ads):
+                true_probability, predicted_probability = \
+                    ranking_environment.get_probability(user, ad, surface)
+                assert true_probabilities[index] == true_probability, (
+                    user, ad, surface,
+                    true_probabilities[index], true_probability
+                )
+                assert predicted_probabilities[index] == \
+                    predicted_probability, (
+                        user, ad, surface,
+                        predicted_probabilities[index], predicted_probability
+                    )
+                pair_cnt += 1
+    print(f"{pair_cnt} user / ad / surface triples scored identically")
+    ad_table = ranking_environment.ad_table
+    for pacing_mode in PacingMode:
+        set_pacing_mode(pacing_mode)
+        # every n-th ad is throttled at half the requests
+        throttled_ads = ad_table.ads[::THROTTLED_AD_STEP]
+        for ad in throttled_ads:
+            ad_table.set_participation_probability(ad.id, 0.5)
+        for surface in AppSurfaceType:
+            check_surface_batch(ranking_environment, users, surface)
+        for ad in throttled_ads:
+            ad_table.set_participation_probability(ad.id, 1.0)
+    set_pacing_mode(PacingMode.BID_SHADING)
+    print(f"{len(users)} users scored identically in surface batches")
+    filter_cnt = check_country_targeting(ad_table.ads, users)
+    print(f"{filter_cnt} targeting filters matched as Ad.matches_target")
+
+
+if __name__ == "__main__":
+    main_check()